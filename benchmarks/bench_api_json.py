@@ -0,0 +1,71 @@
+import argparse
+import os
+
+from benchmarks.comum import criar_tabelas, medir, popular_catalogo, usar_banco_temporario
+
+# Compara a montagem das respostas da API de produtos usando os payloads
+# pré-serializados em cache contra a serialização ingênua com JSONResponse.
+# Uso: python -m benchmarks.bench_api_json --produtos 10000 --duracao 3
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da API JSON de produtos")
+    parser.add_argument("--produtos", type=int, default=10000, help="quantidade de produtos no catálogo")
+    parser.add_argument("--tamanho", type=int, default=12, help="produtos por página")
+    parser.add_argument("--paginas", type=int, default=50, help="quantidade de páginas percorridas em ciclo")
+    parser.add_argument("--duracao", type=float, default=2.0, help="segundos de medição por cenário")
+    args = parser.parse_args()
+
+    # Prepara um banco temporário com o catálogo sintético
+    db_path = usar_banco_temporario()
+    criar_tabelas()
+    popular_catalogo(args.produtos)
+
+    from dataclasses import asdict
+    from fastapi.responses import JSONResponse, Response
+    from repo import produto_repo
+    from util import cache_produtos, catalogo_json
+
+    # Quantidade de produtos distintos consultados individualmente
+    quantidade_ids = min(args.produtos, args.paginas * args.tamanho)
+
+    def lista_ingenua(i: int) -> bytes:
+        # Lê os produtos completos e serializa a página inteira a cada requisição
+        produtos = produto_repo.obter_produtos_por_pagina(1 + i % args.paginas, args.tamanho)
+        return JSONResponse([asdict(produto) for produto in produtos]).body
+
+    def lista_em_cache(i: int) -> bytes:
+        # Concatena os payloads pré-serializados da página
+        conteudo = catalogo_json.obter_pagina_produtos_json(1 + i % args.paginas, args.tamanho)
+        return Response(content=conteudo, media_type="application/json").body
+
+    def produto_ingenuo(i: int) -> bytes:
+        # Lê e serializa o produto a cada requisição
+        produto = produto_repo.obter_produto_por_id(1 + i % quantidade_ids)
+        return JSONResponse(asdict(produto)).body
+
+    def produto_em_cache(i: int) -> bytes:
+        # Devolve o payload pré-serializado do produto
+        conteudo = catalogo_json.obter_produto_json(1 + i % quantidade_ids)
+        return Response(content=conteudo, media_type="application/json").body
+
+    try:
+        # Aquece o cache com as páginas e produtos que serão medidos
+        for i in range(args.paginas):
+            lista_em_cache(i)
+        for i in range(quantidade_ids):
+            produto_em_cache(i)
+        print(f"Catálogo: {args.produtos} produtos | página: {args.tamanho} | ciclo: {args.paginas} páginas")
+        for nome, ingenuo, em_cache in [
+                ("GET /api/produtos", lista_ingenua, lista_em_cache),
+                ("GET /api/produtos/{id}", produto_ingenuo, produto_em_cache)]:
+            ops_ingenuo = medir(ingenuo, args.duracao)
+            ops_cache = medir(em_cache, args.duracao)
+            print(f"{nome:<24} JSONResponse: {ops_ingenuo:>10.0f} ops/s | "
+                  f"pré-serializado: {ops_cache:>10.0f} ops/s | ganho: {ops_cache / ops_ingenuo:.2f}x")
+        print(f"Cache: {cache_produtos.estatisticas()}")
+    finally:
+        # Remove o banco temporário
+        os.unlink(db_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from benchmarks.comum import histograma, percentis, usar_banco_temporario
+
+# Gerador de carga para as rotas do main.py: usuários virtuais concorrentes executam cenários
+# mistos (navegação anônima, compra com sessão logada, cadastro) e o relatório traz a vazão e
+# o histograma de latência de cada rota. Por padrão a aplicação roda no mesmo processo, via ASGI;
+# com --url a carga vai para um servidor real (ex.: python servidor.py).
+# Uso: python -m benchmarks.bench_carga --concorrencia 1 8 32 --duracao 10 --cenarios navegacao=70 compra=25 cadastro=5
+
+# Contador global para gerar CPF, telefone e e-mail únicos nos cadastros
+_sequencia = itertools.count(1)
+_prefixo = time.strftime("%H%M%S")
+
+class Medicoes:
+    # Acumula latências e códigos de status por rota (nome do template da rota)
+    def __init__(self):
+        self.latencias: dict[str, list[float]] = {}
+        self.status: dict[str, dict[str, int]] = {}
+        self.erros: dict[str, int] = {}
+
+    async def requisitar(self, cliente: httpx.AsyncClient, rota: str, metodo: str, url: str, **kwargs) -> httpx.Response:
+        # Cede a vez aos outros usuários virtuais: no modo ASGI, respostas imediatas (ex.: 503) não suspendem a tarefa
+        await asyncio.sleep(0)
+        inicio = time.perf_counter()
+        try:
+            resposta = await cliente.request(metodo, url, **kwargs)
+        except httpx.HTTPError:
+            # Falhas de transporte contam como erro da rota
+            self.erros[rota] = self.erros.get(rota, 0) + 1
+            return None
+        self.latencias.setdefault(rota, []).append(time.perf_counter() - inicio)
+        contagem = self.status.setdefault(rota, {})
+        contagem[str(resposta.status_code)] = contagem.get(str(resposta.status_code), 0) + 1
+        # Respostas 5xx também contam como erro
+        if resposta.status_code >= 500:
+            self.erros[rota] = self.erros.get(rota, 0) + 1
+        return resposta
+
+async def cadastrar_e_entrar(cliente: httpx.AsyncClient, medicoes: Medicoes, entrar: bool = True) -> None:
+    # Cadastra um usuário novo (dados únicos) e, opcionalmente, faz login com ele
+    n = next(_sequencia)
+    email = f"carga{_prefixo}{n}@exemplo.com"
+    await medicoes.requisitar(cliente, "GET /cadastrar", "GET", "/cadastrar")
+    await medicoes.requisitar(cliente, "POST /cadastrar", "POST", "/cadastrar", data={
+        "nome": f"Usuário Carga {n}", "cpf": f"carga-{_prefixo}-{n}", "email": email,
+        "telefone": f"carga-{_prefixo}-{n}", "data_nascimento": "2000-01-01", "senha": "123456", "conf_senha": "123456"})
+    if entrar:
+        await medicoes.requisitar(cliente, "GET /login", "GET", "/login")
+        await medicoes.requisitar(cliente, "POST /login", "POST", "/login", data={"email": email, "senha": "123456"})
+
+async def navegacao(cliente: httpx.AsyncClient, medicoes: Medicoes, gerador: random.Random, ids: list[int]) -> None:
+    # Visitante anônimo: página inicial, alguns produtos e a API do catálogo
+    await medicoes.requisitar(cliente, "GET /", "GET", "/")
+    for _ in range(gerador.randint(1, 3)):
+        await medicoes.requisitar(cliente, "GET /produtos/{id}", "GET", f"/produtos/{gerador.choice(ids)}")
+    await medicoes.requisitar(cliente, "GET /api/produtos", "GET", "/api/produtos",
+                              params={"pagina": gerador.randint(1, 20), "tamanho": 12})
+    await medicoes.requisitar(cliente, "GET /api/produtos/{id}", "GET", f"/api/produtos/{gerador.choice(ids)}")
+
+async def compra(cliente: httpx.AsyncClient, medicoes: Medicoes, gerador: random.Random, ids: list[int]) -> None:
+    # Usuário logado (a sessão é criada na primeira execução do cenário): navega, compra e vê os pedidos
+    if "sessao" not in cliente.cookies:
+        await cadastrar_e_entrar(cliente, medicoes)
+    await medicoes.requisitar(cliente, "GET /", "GET", "/")
+    id_produto = gerador.choice(ids)
+    await medicoes.requisitar(cliente, "GET /produtos/{id}", "GET", f"/produtos/{id_produto}")
+    await medicoes.requisitar(cliente, "POST /pedidos", "POST", "/pedidos",
+                              data={"id_produto": [id_produto], "quantidade": [1]})
+    await medicoes.requisitar(cliente, "GET /pedidos", "GET", "/pedidos")
+    await medicoes.requisitar(cliente, "GET /perfil", "GET", "/perfil")
+
+async def cadastro(cliente: httpx.AsyncClient, medicoes: Medicoes, gerador: random.Random, ids: list[int]) -> None:
+    # Visitante que se cadastra e faz login
+    cliente.cookies.clear()
+    await cadastrar_e_entrar(cliente, medicoes)
+
+CENARIOS = {"navegacao": navegacao, "compra": compra, "cadastro": cadastro}
+
+@asynccontextmanager
+async def abrir_transporte(url: str):
+    # Com URL, usa sockets reais; sem URL, chama a aplicação diretamente via ASGI (com o lifespan)
+    if url:
+        yield None, url
+        return
+    import main
+    async with main.app.router.lifespan_context(main.app):
+        yield httpx.ASGITransport(app=main.app), "http://loja"
+
+async def obter_ids_produtos(transporte, url_base: str, quantidade: int = 500) -> list[int]:
+    # Consulta a API para descobrir os IDs de produtos existentes
+    ids = []
+    async with httpx.AsyncClient(transport=transporte, base_url=url_base) as cliente:
+        for pagina in range(1, quantidade // 100 + 1):
+            produtos = (await cliente.get("/api/produtos", params={"pagina": pagina, "tamanho": 100})).json()
+            ids.extend(produto["id"] for produto in produtos)
+            if len(produtos) < 100:
+                break
+    return ids
+
+async def executar_nivel(transporte, url_base: str, concorrencia: int, duracao: float,
+                         pesos: dict[str, int], ids: list[int]) -> dict:
+    medicoes = Medicoes()
+    fim = time.perf_counter() + duracao
+
+    async def usuario_virtual(indice: int) -> None:
+        # Cada usuário virtual tem seu próprio cliente (e cookies de sessão) e sorteia cenários pelos pesos
+        gerador = random.Random(indice)
+        cenario_fixo = gerador.choices(list(pesos), weights=list(pesos.values()))[0]
+        async with httpx.AsyncClient(transport=transporte, base_url=url_base, timeout=30) as cliente:
+            while time.perf_counter() < fim:
+                # Usuários de compra mantêm a sessão; os demais sorteiam um cenário a cada volta
+                cenario = cenario_fixo if cenario_fixo == "compra" else \
+                    gerador.choices(list(pesos), weights=list(pesos.values()))[0]
+                await CENARIOS[cenario](cliente, medicoes, gerador, ids)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(usuario_virtual(i) for i in range(concorrencia)))
+    decorrido = time.perf_counter() - inicio
+    # Monta o relatório por rota
+    rotas = {}
+    for rota in sorted(set(medicoes.latencias) | set(medicoes.erros)):
+        latencias = medicoes.latencias.get(rota, [])
+        rotas[rota] = {"requisicoes": len(latencias), "req_por_segundo": len(latencias) / decorrido,
+                       "erros": medicoes.erros.get(rota, 0), "status": medicoes.status.get(rota, {}),
+                       **percentis(latencias), "histograma": histograma(latencias)}
+    total = sum(rota["requisicoes"] for rota in rotas.values())
+    return {"concorrencia": concorrencia, "duracao": decorrido, "requisicoes": total,
+            "req_por_segundo": total / decorrido, "rotas": rotas}
+
+def imprimir_nivel(resultado: dict) -> None:
+    # Imprime a vazão total e, por rota, percentis e histograma
+    print(f"\nConcorrência {resultado['concorrencia']}: {resultado['requisicoes']} requisições em "
+          f"{resultado['duracao']:.1f} s ({resultado['req_por_segundo']:.0f} req/s)")
+    for rota, medicao in resultado["rotas"].items():
+        status = " ".join(f"{codigo}:{quantidade}" for codigo, quantidade in sorted(medicao["status"].items()))
+        print(f"  {rota:<24} {medicao['req_por_segundo']:7.0f} req/s | p50 {medicao['p50']:7.2f} | "
+              f"p95 {medicao['p95']:7.2f} | p99 {medicao['p99']:7.2f} ms | erros {medicao['erros']} | {status}")
+        faixas = " ".join(f"{faixa}:{quantidade}" for faixa, quantidade in medicao["histograma"].items() if quantidade)
+        print(f"  {'':<24} {faixas}")
+
+async def executar(args: argparse.Namespace, pesos: dict[str, int]) -> list[dict]:
+    async with abrir_transporte(args.url) as (transporte, url_base):
+        ids = await obter_ids_produtos(transporte, url_base)
+        if not ids:
+            raise SystemExit("Nenhum produto encontrado no catálogo")
+        resultados = []
+        for concorrencia in args.concorrencia:
+            resultado = await executar_nivel(transporte, url_base, concorrencia, args.duracao, pesos, ids)
+            imprimir_nivel(resultado)
+            resultados.append(resultado)
+        return resultados
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga das rotas da aplicação")
+    parser.add_argument("--url", help="URL de um servidor em execução (padrão: aplicação no mesmo processo)")
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 8, 32], help="usuários virtuais simultâneos")
+    parser.add_argument("--duracao", type=float, default=5.0, help="segundos de carga por nível de concorrência")
+    parser.add_argument("--cenarios", nargs="+", default=["navegacao=70", "compra=25", "cadastro=5"],
+                        help="pesos dos cenários no formato nome=peso")
+    parser.add_argument("--produtos", type=int, default=10000, help="produtos do banco temporário (sem --url)")
+    parser.add_argument("--saida", help="arquivo JSON onde o resultado é gravado")
+    args = parser.parse_args(argv)
+    pesos = {nome: int(peso) for nome, peso in (cenario.split("=") for cenario in args.cenarios)}
+    if set(pesos) - set(CENARIOS):
+        parser.error(f"cenários válidos: {', '.join(CENARIOS)}")
+
+    db_path = None
+    if not args.url:
+        # Sem servidor externo, usa um banco temporário com catálogo sintético
+        db_path = usar_banco_temporario()
+        from util import gerador_dados
+        gerador_dados.gerar_e_carregar(categorias=max(1, args.produtos // 100), produtos=args.produtos,
+                                       usuarios=0, enderecos_por_usuario=0, relatar=lambda mensagem: None)
+    try:
+        resultados = asyncio.run(executar(args, pesos))
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as arquivo:
+                json.dump({"cenarios": pesos, "niveis": resultados}, arquivo, ensure_ascii=False, indent=2)
+    finally:
+        # Remove o banco temporário
+        if db_path:
+            os.unlink(db_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from benchmarks.comum import criar_tabelas, popular_catalogo, usar_banco_temporario
+
+# Dispara compras concorrentes contra o mesmo produto e verifica se houve venda acima do estoque.
+# Compara a reserva atômica (UPDATE condicional) com a leitura seguida de atualizar_produto.
+# Uso: python -m benchmarks.bench_estoque_concorrente --threads 32 --estoque 2000
+
+def executar_cenario(nome: str, comprar, threads: int, estoque: int) -> None:
+    from repo import produto_repo
+    from util.database import obter_conexao
+    # Reinicia o estoque dos produtos usados no cenário
+    with obter_conexao() as conexao:
+        conexao.execute("UPDATE Produto SET estoque = ? WHERE id IN (1, 2)", (estoque,))
+    vendas = [0] * threads
+    erros = [0] * threads
+
+    def cliente(indice: int) -> None:
+        # Cada cliente compra uma unidade por vez até o estoque acabar
+        while True:
+            try:
+                if not comprar():
+                    return
+                vendas[indice] += 1
+            except sqlite3.OperationalError:
+                # Conta bloqueios que excederam o timeout do SQLite
+                erros[indice] += 1
+                if erros[indice] > 100:
+                    return
+
+    trabalhadores = [threading.Thread(target=cliente, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    duracao = time.perf_counter() - inicio
+    # Confere o estoque final contra a quantidade vendida
+    total_vendas = sum(vendas)
+    estoque_final = produto_repo.obter_produto_por_id(1).estoque
+    vendido_acima = total_vendas - (estoque - estoque_final)
+    situacao = "OK" if vendido_acima == 0 and estoque_final >= 0 else "INCONSISTENTE"
+    print(f"{nome:<10} vendas: {total_vendas:>6} | estoque final: {estoque_final:>6} | "
+          f"vendas sem baixa: {vendido_acima:>5} | erros: {sum(erros):>4} | "
+          f"{total_vendas / duracao:>8.0f} vendas/s | {situacao}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de reserva de estoque concorrente")
+    parser.add_argument("--threads", type=int, default=16, help="quantidade de compradores simultâneos")
+    parser.add_argument("--estoque", type=int, default=1000, help="estoque inicial do produto disputado")
+    args = parser.parse_args()
+
+    # Prepara um banco temporário com alguns produtos
+    db_path = usar_banco_temporario()
+    criar_tabelas()
+    popular_catalogo(10)
+
+    from repo import produto_repo
+
+    def compra_atomica() -> bool:
+        # Reserva com UPDATE ... WHERE estoque >= ?
+        return produto_repo.reservar_estoque(1, 1)
+
+    def compra_carrinho() -> bool:
+        # Reserva um carrinho com dois produtos na mesma transação
+        return produto_repo.reservar_estoque_carrinho([(1, 1), (2, 1)])
+
+    def compra_ingenua() -> bool:
+        # Lê o produto e regrava todas as colunas com o estoque decrementado
+        produto = produto_repo.obter_produto_por_id(1)
+        if produto.estoque < 1:
+            return False
+        produto.estoque -= 1
+        return produto_repo.atualizar_produto(produto)
+
+    try:
+        print(f"Compradores: {args.threads} | estoque inicial: {args.estoque}")
+        executar_cenario("atômica", compra_atomica, args.threads, args.estoque)
+        executar_cenario("carrinho", compra_carrinho, args.threads, args.estoque)
+        executar_cenario("ingênua", compra_ingenua, args.threads, args.estoque)
+    finally:
+        # Remove o banco temporário
+        os.unlink(db_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import threading
+import time
+
+from benchmarks.comum import criar_tabelas, percentis, popular_catalogo, popular_usuarios, usar_banco_temporario
+
+# Mede a vazão de pedidos com vários checkouts simultâneos e confere a consistência do estoque.
+# Uso: python -m benchmarks.bench_pedidos --threads 16 --pedidos 200
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de registro de pedidos concorrentes")
+    parser.add_argument("--threads", type=int, default=16, help="quantidade de checkouts simultâneos")
+    parser.add_argument("--pedidos", type=int, default=100, help="pedidos registrados por thread")
+    parser.add_argument("--produtos", type=int, default=50, help="quantidade de produtos disputados")
+    parser.add_argument("--itens", type=int, default=3, help="máximo de itens por pedido")
+    args = parser.parse_args()
+
+    # Prepara um banco temporário com usuários e produtos
+    db_path = usar_banco_temporario()
+    criar_tabelas()
+    popular_catalogo(args.produtos)
+    popular_usuarios(args.threads)
+
+    from repo import pedido_repo
+    from util.database import obter_conexao
+
+    with obter_conexao() as conexao:
+        estoque_inicial = conexao.execute("SELECT SUM(estoque) FROM Produto").fetchone()[0]
+    latencias = [[] for _ in range(args.threads)]
+    recusados = [0] * args.threads
+
+    def checkout(indice: int) -> None:
+        # Cada thread representa um usuário registrando pedidos aleatórios (semente fixa)
+        gerador = random.Random(indice)
+        for _ in range(args.pedidos):
+            itens = [(gerador.randint(1, args.produtos), gerador.randint(1, 2))
+                     for _ in range(gerador.randint(1, args.itens))]
+            inicio = time.perf_counter()
+            id_pedido = pedido_repo.inserir_pedido(indice + 1, itens)
+            latencias[indice].append(time.perf_counter() - inicio)
+            if id_pedido is None:
+                recusados[indice] += 1
+
+    try:
+        trabalhadores = [threading.Thread(target=checkout, args=(i,)) for i in range(args.threads)]
+        inicio = time.perf_counter()
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        duracao = time.perf_counter() - inicio
+
+        # Confere se a baixa de estoque corresponde exatamente aos itens vendidos
+        with obter_conexao() as conexao:
+            estoque_final = conexao.execute("SELECT SUM(estoque) FROM Produto").fetchone()[0]
+            negativos = conexao.execute("SELECT COUNT(*) FROM Produto WHERE estoque < 0").fetchone()[0]
+            vendidos = conexao.execute("SELECT COALESCE(SUM(quantidade), 0) FROM ItemPedido").fetchone()[0]
+            pedidos = conexao.execute("SELECT COUNT(*) FROM Pedido").fetchone()[0]
+        consistente = negativos == 0 and estoque_inicial - estoque_final == vendidos
+        todas = [latencia for lista in latencias for latencia in lista]
+        p = percentis(todas)
+        print(f"Checkouts: {args.threads} threads x {args.pedidos} tentativas | produtos: {args.produtos}")
+        print(f"Pedidos registrados: {pedidos} | recusados por estoque: {sum(recusados)} | "
+              f"vazão: {len(todas) / duracao:.0f} checkouts/s ({pedidos / duracao:.0f} pedidos/s)")
+        print(f"Latência (ms): p50 {p['p50']:.2f} | p95 {p['p95']:.2f} | p99 {p['p99']:.2f}")
+        print(f"Estoque: {estoque_inicial} -> {estoque_final} | itens vendidos: {vendidos} | "
+              f"{'consistente' if consistente else 'INCONSISTENTE'}")
+    finally:
+        # Remove o banco temporário
+        os.unlink(db_path)
+
+if __name__ == "__main__":
+    main()
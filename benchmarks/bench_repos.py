@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+from datetime import date, datetime
+
+from benchmarks.comum import medir_latencias, percentis, usar_banco_temporario
+
+# Mede cada função dos repositórios (p50/p95/p99 e operações por segundo) em bancos de
+# tamanhos diferentes, grava o resultado em JSON e compara com uma linha de base salva.
+# Os bancos semeados ficam guardados em --bancos, para não gerar 1 milhão de linhas a cada execução.
+# Uso: python -m benchmarks.bench_repos --escalas 1000 100000 --saida atual.json --baseline base.json
+
+def preparar_banco(escala: int, diretorio_bancos: str) -> str:
+    # Reaproveita o banco semeado da escala, gerando-o apenas na primeira vez
+    os.makedirs(diretorio_bancos, exist_ok=True)
+    caminho_semente = os.path.join(diretorio_bancos, f"repos_{escala}.db")
+    if not os.path.exists(caminho_semente):
+        os.environ['TEST_DATABASE_PATH'] = caminho_semente
+        from util import gerador_dados
+        gerador_dados.gerar_e_carregar(categorias=max(10, escala // 1000), produtos=escala, usuarios=escala,
+                                       enderecos_por_usuario=1, relatar=lambda mensagem: None)
+        # Registra alguns pedidos para as consultas de pedidos
+        from repo import pedido_repo
+        gerador = random.Random(1)
+        for id_usuario in range(1, min(escala, 1000) + 1):
+            pedido_repo.inserir_pedido(id_usuario, [(gerador.randint(1, escala), 1)])
+    # Trabalha sobre uma cópia, pois as funções de escrita alteram o banco
+    caminho = usar_banco_temporario()
+    shutil.copyfile(caminho_semente, caminho)
+    return caminho
+
+def amostrar(consulta: str, quantidade: int = 1000) -> list:
+    from util.database import obter_conexao
+    # Sorteia valores existentes no banco para usar como parâmetros
+    with obter_conexao() as conexao:
+        return [linha[0] for linha in conexao.execute(f"{consulta} ORDER BY random() LIMIT ?", (quantidade,))]
+
+def criar_casos(escala: int) -> list[tuple]:
+    from repo import categoria_repo, endereco_repo, pedido_repo, produto_repo, usuario_repo
+    from models.categoria import Categoria
+    from models.endereco import Endereco
+    from models.produto import Produto
+    from models.usuario import Usuario
+    # Valores existentes usados como parâmetros das consultas
+    ids_produto = amostrar("SELECT id FROM Produto")
+    ids_usuario = amostrar("SELECT id FROM Usuario")
+    emails = amostrar("SELECT email FROM Usuario")
+    ids_categoria = amostrar("SELECT id FROM Categoria")
+    ids_endereco = amostrar("SELECT id FROM Endereco")
+    ids_pedido = amostrar("SELECT id FROM Pedido")
+    usuarios_com_pedido = amostrar("SELECT DISTINCT id_usuario FROM Pedido")
+    # Última página de cada listagem, para medir o custo do OFFSET em páginas profundas
+    ultima_pagina_produtos = max(escala // 12, 1)
+    ultima_pagina_usuarios = max(escala // 12, 1)
+    # IDs criados pelas funções de inserção, consumidos pelas funções de exclusão
+    produtos_inseridos = []
+    sufixo = datetime.now().strftime("%H%M%S%f")
+
+    def escolher(lista: list, i: int):
+        return lista[i % len(lista)]
+
+    def inserir_produto(i: int) -> None:
+        produtos_inseridos.append(produto_repo.inserir_produto(
+            Produto(0, f"Produto Bench {i}", "Descrição do produto de benchmark.", 10.0, 100, "bench.jpg", escolher(ids_categoria, i))))
+
+    def atualizar_produto(i: int) -> None:
+        produto_repo.atualizar_produto(
+            Produto(escolher(ids_produto, i), f"Produto Atualizado {i}", "Descrição atualizada.", 20.0, 100, "bench.jpg", escolher(ids_categoria, i)))
+
+    def reservar_e_liberar_estoque(i: int) -> None:
+        id_produto = escolher(ids_produto, i)
+        if produto_repo.reservar_estoque(id_produto, 1):
+            produto_repo.liberar_estoque(id_produto, 1)
+
+    def inserir_usuario(i: int) -> None:
+        usuario_repo.inserir_usuario(Usuario(0, f"Usuário Bench {i}", f"bench-{sufixo}-{i}", f"bench-{sufixo}-{i}",
+                                             f"bench{sufixo}{i}@exemplo.com", date(2000, 1, 1), "x"))
+
+    def atualizar_usuario(i: int) -> None:
+        usuario = usuario_repo.obter_usuario_por_id(escolher(ids_usuario, i))
+        usuario.nome = f"Usuário Atualizado {i}"
+        usuario_repo.atualizar_usuario(usuario)
+
+    # Casos (nome, função) na ordem de execução: leituras primeiro, depois as escritas
+    casos = [
+        ("produto.obter_produto_por_id", lambda i: produto_repo.obter_produto_por_id(escolher(ids_produto, i))),
+        ("produto.obter_produtos_por_pagina(primeira)", lambda i: produto_repo.obter_produtos_por_pagina(1, 12)),
+        ("produto.obter_produtos_por_pagina(ultima)", lambda i: produto_repo.obter_produtos_por_pagina(ultima_pagina_produtos, 12)),
+        ("produto.obter_produtos_resumo_por_pagina(ultima)", lambda i: produto_repo.obter_produtos_resumo_por_pagina(ultima_pagina_produtos, 12)),
+        ("produto.obter_ids_produtos_por_pagina", lambda i: produto_repo.obter_ids_produtos_por_pagina(1 + i % 100, 12)),
+        ("produto.obter_produtos_por_ids", lambda i: produto_repo.obter_produtos_por_ids(ids_produto[i % 900:i % 900 + 12])),
+        ("usuario.obter_usuario_por_id", lambda i: usuario_repo.obter_usuario_por_id(escolher(ids_usuario, i))),
+        ("usuario.obter_usuario_por_email", lambda i: usuario_repo.obter_usuario_por_email(escolher(emails, i))),
+        ("usuario.obter_usuarios_por_pagina(primeira)", lambda i: usuario_repo.obter_usuarios_por_pagina(1, 12)),
+        ("usuario.obter_usuarios_por_pagina(ultima)", lambda i: usuario_repo.obter_usuarios_por_pagina(ultima_pagina_usuarios, 12)),
+        ("usuario.obter_usuarios_resumo_por_pagina(ultima)", lambda i: usuario_repo.obter_usuarios_resumo_por_pagina(ultima_pagina_usuarios, 12)),
+        ("categoria.obter_categoria_por_id", lambda i: categoria_repo.obter_categoria_por_id(escolher(ids_categoria, i))),
+        ("categoria.obter_categorias_por_pagina", lambda i: categoria_repo.obter_categorias_por_pagina(1, 12)),
+        ("endereco.obter_endereco_por_id", lambda i: endereco_repo.obter_endereco_por_id(escolher(ids_endereco, i))),
+        ("endereco.obter_enderecos_por_usuario", lambda i: endereco_repo.obter_enderecos_por_usuario(escolher(ids_usuario, i))),
+        ("pedido.obter_pedido_por_id", lambda i: pedido_repo.obter_pedido_por_id(escolher(ids_pedido, i))),
+        ("pedido.obter_pedidos_por_usuario", lambda i: pedido_repo.obter_pedidos_por_usuario(escolher(usuarios_com_pedido, i), 1, 10)),
+        ("produto.inserir_produto", inserir_produto),
+        ("produto.atualizar_produto", atualizar_produto),
+        ("produto.reservar_e_liberar_estoque", reservar_e_liberar_estoque),
+        ("produto.excluir_produto", lambda i: produto_repo.excluir_produto(produtos_inseridos.pop())),
+        ("usuario.inserir_usuario", inserir_usuario),
+        ("usuario.atualizar_usuario", atualizar_usuario),
+        ("categoria.inserir_categoria", lambda i: categoria_repo.inserir_categoria(Categoria(0, f"Categoria Bench {sufixo} {i}"))),
+        ("endereco.inserir_endereco", lambda i: endereco_repo.inserir_endereco(
+            Endereco(0, "Rua Bench", str(i), "", "Centro", "Vitória", "ES", "29000-000", escolher(ids_usuario, i)))),
+        ("pedido.inserir_pedido", lambda i: pedido_repo.inserir_pedido(escolher(ids_usuario, i), [(escolher(ids_produto, i), 1)])),
+    ]
+    # A exclusão só pode ser medida enquanto houver produtos inseridos pelo caso anterior
+    limites = {"produto.excluir_produto": lambda: len(produtos_inseridos)}
+    return [(nome, funcao, limites.get(nome)) for nome, funcao in casos]
+
+def executar_escala(escala: int, args: argparse.Namespace) -> dict:
+    # Prepara a cópia do banco semeado e mede cada caso
+    caminho = preparar_banco(escala, args.bancos)
+    resultados = {}
+    try:
+        for nome, funcao, limite in criar_casos(escala):
+            if args.filtro and args.filtro not in nome:
+                continue
+            max_iteracoes = min(args.max_iteracoes, limite()) if limite else args.max_iteracoes
+            if max_iteracoes == 0:
+                continue
+            latencias, duracao = medir_latencias(funcao, args.duracao, max_iteracoes)
+            resultados[nome] = {**percentis(latencias), "ops_por_segundo": len(latencias) / duracao,
+                                "iteracoes": len(latencias)}
+            p = resultados[nome]
+            print(f"{escala:>9} {nome:<46} p50 {p['p50']:8.3f} | p95 {p['p95']:8.3f} | "
+                  f"p99 {p['p99']:8.3f} ms | {p['ops_por_segundo']:10.0f} ops/s")
+    finally:
+        # Remove a cópia usada nas medições
+        os.unlink(caminho)
+    return resultados
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[str]:
+    # Aponta os casos cujo p50 ou p95 pioraram mais que a tolerância em relação à linha de base
+    regressoes = []
+    for escala, casos in atual["resultados"].items():
+        for nome, medicao in casos.items():
+            base = baseline.get("resultados", {}).get(escala, {}).get(nome)
+            if not base:
+                continue
+            for metrica in ("p50", "p95"):
+                if base[metrica] > 0 and medicao[metrica] > base[metrica] * (1 + tolerancia):
+                    regressoes.append(f"{escala} {nome}: {metrica} {base[metrica]:.3f} -> {medicao[metrica]:.3f} ms "
+                                      f"(+{(medicao[metrica] / base[metrica] - 1) * 100:.0f}%)")
+    return regressoes
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark das funções dos repositórios em várias escalas")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1000, 100000],
+                        help="quantidades de produtos e usuários de cada banco (ex.: 1000 100000 1000000)")
+    parser.add_argument("--duracao", type=float, default=1.0, help="segundos de medição por função")
+    parser.add_argument("--max-iteracoes", type=int, default=5000, help="máximo de chamadas por função")
+    parser.add_argument("--filtro", help="mede apenas as funções cujo nome contém o texto")
+    parser.add_argument("--bancos", default=os.path.join("benchmarks", "bancos"), help="diretório dos bancos semeados")
+    parser.add_argument("--saida", help="arquivo JSON onde o resultado é gravado")
+    parser.add_argument("--baseline", help="arquivo JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa tolerada (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    atual = {
+        "metadados": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+        },
+        "resultados": {str(escala): executar_escala(escala, args) for escala in args.escalas},
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+    # Compara com a linha de base e termina com erro se houver regressões (útil em CI)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            regressoes = comparar(atual, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressões acima de {args.tolerancia:.0%}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"\nNenhuma regressão acima de {args.tolerancia:.0%} em relação a {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+from typing import Callable
+
+def usar_banco_temporario() -> str:
+    # Cria um arquivo temporário para o banco de dados do benchmark
+    db_fd, db_path = tempfile.mkstemp(suffix='.db', prefix='bench_')
+    os.close(db_fd)
+    # Configura a variável de ambiente para que os repositórios usem o banco temporário
+    os.environ['TEST_DATABASE_PATH'] = db_path
+    # Retorna o caminho do banco temporário
+    return db_path
+
+def criar_tabelas() -> None:
+    # Importa o inicializador apenas depois de configurar o banco temporário
+    from util import initializer
+    # Cria todas as tabelas da aplicação, sem os dados iniciais
+    initializer.inicializar_banco(inserir_dados=False)
+
+def popular_catalogo(quantidade_produtos: int, quantidade_categorias: int = 20) -> None:
+    from util.database import obter_conexao
+    # Insere categorias e produtos em lote, em uma única transação
+    with obter_conexao() as conexao:
+        conexao.executemany(
+            "INSERT INTO Categoria (nome) VALUES (?)",
+            [(f"Categoria {i:03d}",) for i in range(1, quantidade_categorias + 1)])
+        conexao.executemany(
+            "INSERT INTO Produto (nome, descricao, preco, estoque, imagem, id_categoria) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"Produto {i:07d}", f"Descrição do produto {i:07d} - produto de alta qualidade.",
+              10.0 + i % 1000, 100, f"https://picsum.photos/200/200?random={i}", 1 + i % quantidade_categorias)
+             for i in range(1, quantidade_produtos + 1)])
+
+def popular_usuarios(quantidade: int) -> None:
+    from util.database import obter_conexao
+    # Insere usuários sintéticos em lote, em uma única transação
+    with obter_conexao() as conexao:
+        conexao.executemany(
+            "INSERT INTO Usuario (nome, cpf, telefone, email, data_nascimento, senha_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"Usuário {i:07d}", f"{i:011d}", f"(28) {i:09d}", f"usuario{i}@email.com", "2000-01-01", "x")
+             for i in range(1, quantidade + 1)])
+
+def percentis(latencias: list[float]) -> dict:
+    # Calcula p50, p95 e p99 (em milissegundos) de uma lista de latências em segundos
+    ordenadas = sorted(latencias)
+    if not ordenadas:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    def percentil(p: float) -> float:
+        return ordenadas[min(len(ordenadas) - 1, int(p * len(ordenadas)))] * 1000
+    return {"p50": percentil(0.50), "p95": percentil(0.95), "p99": percentil(0.99)}
+
+def medir(funcao: Callable[[int], object], duracao: float = 2.0) -> float:
+    # Executa a função repetidamente durante o tempo indicado, passando o número da iteração
+    iteracoes = 0
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    while time.perf_counter() < fim:
+        funcao(iteracoes)
+        iteracoes += 1
+    # Retorna a quantidade de operações por segundo
+    return iteracoes / (time.perf_counter() - inicio)
+
+def medir_latencias(funcao: Callable[[int], object], duracao: float = 1.0, max_iteracoes: int = None) -> tuple[list[float], float]:
+    # Executa a função durante o tempo indicado (ou até max_iteracoes), medindo cada chamada
+    latencias = []
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    while time.perf_counter() < fim and (max_iteracoes is None or len(latencias) < max_iteracoes):
+        inicio_chamada = time.perf_counter()
+        funcao(len(latencias))
+        latencias.append(time.perf_counter() - inicio_chamada)
+    # Retorna as latências (em segundos) e a duração total
+    return latencias, time.perf_counter() - inicio
+
+# Limites (em milissegundos) das faixas dos histogramas de latência
+FAIXAS_HISTOGRAMA = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+def histograma(latencias: list[float], faixas: list[float] = FAIXAS_HISTOGRAMA) -> dict[str, int]:
+    # Conta as latências (em segundos) em cada faixa "<= limite ms", com uma faixa final para o restante
+    contagens = {f"<={limite}ms": 0 for limite in faixas}
+    contagens[f">{faixas[-1]}ms"] = 0
+    for latencia in latencias:
+        ms = latencia * 1000
+        faixa = next((f"<={limite}ms" for limite in faixas if ms <= limite), f">{faixas[-1]}ms")
+        contagens[faixa] += 1
+    return contagens
@@ -1,48 +1,159 @@
-from fastapi.responses import RedirectResponse
-import uvicorn
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+import json
+import logging
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi import FastAPI, Form, HTTPException, Request
+from starlette.datastructures import UploadFile
 from fastapi.templating import Jinja2Templates
-from babel.numbers import format_currency
-from starlette.middleware.sessions import SessionMiddleware
 
 from models.categoria import Categoria
 from models.usuario import Usuario
-from repo import usuario_repo, endereco_repo, categoria_repo, produto_repo
-from util import initializer
-from util.auth import SECRET_KEY, autenticar_usuario, hash_senha
+from repo import usuario_repo, endereco_repo, categoria_repo, produto_repo, pedido_repo
+from util import admissao, autocomplete, catalogo_json, exclusao_lotes, importacao_csv, initializer, metricas, perfil_requisicao, rastreamento, sessao, sincronizacao, sitemap, visualizacoes
+from util.auth import autenticar_usuario, hash_senha
+from util.database import MiddlewareLoja, todas_as_lojas, transacao, usar_loja
 
-# Cria as tabelas no banco de dados se não existirem
-initializer.criar_tabelas()
-# Insere dados iniciais no banco de dados
-initializer.inserir_dados_iniciais()
+# Configura o log da aplicação (o uvicorn configura apenas os próprios loggers)
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(name)s - %(message)s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for loja in todas_as_lojas():
+        with usar_loja(loja):
+            # Cria/atualiza o schema de cada loja e insere os dados iniciais uma única vez, antes de aceitar requisições
+            initializer.inicializar_banco()
+            # Registra o ponto de partida das alterações e só então monta o índice de autocompletar,
+            # para que nenhuma alteração feita entre os dois passos seja perdida
+            sincronizacao.sincronizar()
+            autocomplete.construir()
+    yield
+    # Grava as visualizações de produtos ainda pendentes em memória
+    visualizacoes.parar()
+    # Fecha a conexão usada para acompanhar as alterações feitas por outros processos
+    sincronizacao.fechar()
 
 # Cria a instância do FastAPI para a aplicacão web
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+# Usa rotas que podem ser executadas sob o perfilador quando um administrador pedir
+app.router.route_class = perfil_requisicao.RotaPerfilavel
 # Configura o Jinja2 para renderizar templates HTML
 templates = Jinja2Templates(directory="templates")
-# Adiciona o middleware de sessão para gerenciar sessões de usuário
-app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
+# Adiciona o middleware de perfil sob demanda antes da sessão, para que ele a encontre no scope
+app.add_middleware(perfil_requisicao.MiddlewarePerfil)
+# Adiciona o middleware de sessão (dados no servidor, apenas o identificador no cookie)
+app.add_middleware(sessao.MiddlewareSessao)
+# Adiciona o middleware que mantém os caches coerentes entre processos (workers), antes de carregar a sessão
+app.add_middleware(sincronizacao.MiddlewareSincronizacao)
+# Adiciona o rastreamento de SQL por requisição, se ativado (RASTREAMENTO_SQL=1)
+if rastreamento.ATIVO:
+    app.add_middleware(rastreamento.MiddlewareRastreamento)
+# Adiciona o controle de admissão, que rejeita com 503 as requisições acima dos limites de cada classe de rota
+app.add_middleware(admissao.MiddlewareAdmissao)
+# Adiciona a resolução da loja (banco) pelo host ou prefixo do caminho, usada por todos os middlewares internos
+app.add_middleware(MiddlewareLoja)
+# Adiciona o middleware que mede as requisições por rota (o último adicionado é o mais externo)
+app.add_middleware(metricas.MiddlewareMetricas)
 
 # Filtro para formatar valores monetários em reais (BRL) usando Babel
 def format_currency_br(value, currency='BRL', locale='pt_BR'):
+    # Importa o Babel apenas no primeiro uso, para não atrasar a inicialização da aplicação
+    from babel.numbers import format_currency
     return format_currency(value, currency, locale=locale)
 
 # Registra o filtro de formatação de moeda brasileira no Jinja2
 templates.env.filters['format_currency_br'] = format_currency_br
 
+def redirecionar(request: Request, caminho: str) -> RedirectResponse:
+    # Redireciona dentro da loja da requisição (lojas por prefixo recebem o prefixo em root_path)
+    return RedirectResponse(url=request.scope.get("root_path", "") + caminho, status_code=303)
+
 @app.get("/")
-def read_root(request: Request):
-    # Obtém os primeiros 12 produtos do banco de dados
-    produtos = produto_repo.obter_produtos_por_pagina(1, 12)
+def read_root(request: Request, ordem: str = "nome"):
+    # Obtém os 12 produtos mais vistos (ranking em memória) ou os 12 primeiros em ordem alfabética
+    produtos = visualizacoes.mais_vistos(12) if ordem == "mais_vistos" else []
+    # Sem visualizações registradas ainda, usa a ordem alfabética
+    if not produtos:
+        ordem = "nome"
+        produtos = produto_repo.obter_produtos_resumo_por_pagina(1, 12)
     # Cria uma página inicial com os produtos capturados
-    response = templates.TemplateResponse("index.html", {"request": request, "produtos": produtos })
+    response = templates.TemplateResponse("index.html", {"request": request, "produtos": produtos, "ordem": ordem})
     # Retorna a página inicial com os produtos
     return response
 
+# As rotas de importação vêm antes de /produtos/{id}, que também casaria com /produtos/importar
+@app.get("/produtos/importar")
+def read_importar_produtos(request: Request):
+    # Somente administradores podem importar preços e estoques
+    usuario_json = request.session.get("usuario")
+    if not usuario_json or usuario_json["tipo"] != "admin":
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    # Retorna a página com o formulário de envio do CSV
+    return templates.TemplateResponse("importar_produtos.html", {"request": request, "progresso": None})
+
+@app.post("/produtos/importar")
+async def importar_produtos(request: Request):
+    # Verifica o administrador antes de receber o corpo da requisição (o arquivo pode ser grande)
+    usuario_json = request.session.get("usuario")
+    if not usuario_json or usuario_json["tipo"] != "admin":
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    # Recebe o multipart em partes; o arquivo vai para um temporário em disco a partir de 1 MB
+    formulario = await request.form(max_files=1, max_fields=10)
+    try:
+        arquivo = formulario.get("arquivo")
+        # Se o arquivo não foi enviado, retorna erro 400
+        if not isinstance(arquivo, UploadFile):
+            raise HTTPException(status_code=400, detail="Arquivo CSV é obrigatório")
+        # Convenção de decimais do arquivo; vazio deixa a importação decidir pelo delimitador
+        decimal = formulario.get("decimal") or None
+        if decimal is not None and decimal not in importacao_csv.FORMATOS_NUMERO:
+            raise HTTPException(status_code=400, detail="Separador decimal inválido")
+        # Registra a importação e guarda uma cópia do arquivo, fora do loop de eventos
+        progresso = importacao_csv.criar(arquivo.filename or "", decimal)
+        await run_in_threadpool(importacao_csv.receber_arquivo, progresso["id"], arquivo.file)
+    finally:
+        await formulario.close()
+    # Aplica o CSV em lotes em segundo plano; o progresso fica disponível em /produtos/importar/{id}
+    importacao_csv.importar_em_segundo_plano(progresso["id"])
+    # Retorna a página com o ID da importação e o link para acompanhá-la
+    return templates.TemplateResponse("importar_produtos.html", {"request": request, "progresso": progresso})
+
+@app.get("/produtos/importar/{id}")
+def read_progresso_importacao(request: Request, id: str):
+    # Somente administradores podem acompanhar as importações
+    usuario_json = request.session.get("usuario")
+    if not usuario_json or usuario_json["tipo"] != "admin":
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    # Lê o progresso gravado pelo worker que está executando a importação
+    progresso = importacao_csv.obter_progresso(id)
+    # Se não encontrou a importação, retorna erro 404
+    if not progresso:
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    # Retorna o progresso em JSON
+    return JSONResponse(progresso)
+
+@app.get("/produtos/importar/{id}/erros")
+def read_erros_importacao(request: Request, id: str):
+    # Somente administradores podem baixar os erros das importações
+    usuario_json = request.session.get("usuario")
+    if not usuario_json or usuario_json["tipo"] != "admin":
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    # Se a importação não existe ou não teve erros, retorna erro 404
+    progresso = importacao_csv.obter_progresso(id)
+    if not progresso or not progresso["arquivo_erros"]:
+        raise HTTPException(status_code=404, detail="Arquivo de erros não encontrado")
+    # Envia o CSV com as linhas rejeitadas
+    return FileResponse(importacao_csv.caminho_erros(id), media_type="text/csv", filename=progresso["arquivo_erros"])
+
 @app.get("/produtos/{id}")
 def read_produto(request: Request, id: int):
     # Obtém um produto específico do banco de dados pelo ID
     produto = produto_repo.obter_produto_por_id(id)
+    # Conta a visualização em memória (gravada em lote no banco periodicamente)
+    if produto:
+        visualizacoes.registrar(id)
     # Cria uma página com o produto capturado
     response = templates.TemplateResponse("produto.html", {"request": request, "produto": produto})
     # Retorna a página com o produto
@@ -51,7 +162,7 @@ def read_produto(request: Request, id: int):
 @app.get("/usuarios")
 def read_usuarios(request: Request):
     # Obtém os primeiros 12 usuários do banco de dados
-    usuarios = usuario_repo.obter_usuarios_por_pagina(1, 12)
+    usuarios = usuario_repo.obter_usuarios_resumo_por_pagina(1, 12)
     # Cria uma página com os usuários capturados
     response = templates.TemplateResponse("usuarios.html", {"request": request, "usuarios": usuarios})
     # Retorna a página com os usuários
@@ -60,7 +171,7 @@ def read_usuarios(request: Request):
 @app.get("/produtos")
 def read_produtos(request: Request):
     # Obtém os primeiros 12 produtos do banco de dados
-    produtos = produto_repo.obter_produtos_por_pagina(1, 12)
+    produtos = produto_repo.obter_produtos_resumo_por_pagina(1, 12)
     # Cria uma página com os produtos capturados
     response = templates.TemplateResponse("produtos.html", {"request": request, "produtos": produtos})
     # Retorna a página com os produtos
@@ -68,8 +179,8 @@ def read_produtos(request: Request):
 
 @app.get("/categorias")
 def read_categorias(request: Request):
-    # Obtém as primeiras 12 categorias do banco de dados
-    categorias = categoria_repo.obter_categorias_por_pagina(1, 12)
+    # Obtém as primeiras 12 categorias com contagens e faixas de preço já agregadas (sem GROUP BY por requisição)
+    categorias = categoria_repo.obter_agregados_categorias_por_pagina(1, 12)
     # Cria uma página com as categorias capturadas
     response = templates.TemplateResponse("categorias.html", {"request": request, "categorias": categorias})
     # Retorna a página com as categorias
@@ -120,7 +231,7 @@ async def cadastrar_usuario(
     if not usuario:
         raise HTTPException(status_code=400, detail="Erro ao cadastrar usuário")
     # Se conseguiu inserir o usuário, redireciona para a página de login
-    return RedirectResponse(url="/login", status_code=303)
+    return redirecionar(request, "/login")
 
 @app.get("/login")
 def read_login(request: Request):
@@ -147,14 +258,14 @@ async def login(
     # Armazena os dados do usuário na sessão
     request.session["usuario"] = usuario_json
     # Redireciona para a página inicial
-    return RedirectResponse(url="/", status_code=303)
+    return redirecionar(request, "/")
 
 @app.get("/logout")
 async def logout(request: Request):
     # Limpa a sessão do usuário
     request.session.clear()
     # Redireciona para a página inicial
-    return RedirectResponse(url="/", status_code=303)
+    return redirecionar(request, "/")
 
 @app.get("/usuarios/promover/{id}")
 async def promover_usuario(request: Request, id: int):
@@ -166,7 +277,7 @@ async def promover_usuario(request: Request, id: int):
     # Promove o usuário para tipo 1 (administrador)
     usuario_repo.atualizar_tipo_usuario(id, 1)
     # Redireciona para a lista de usuários
-    return RedirectResponse(url="/usuarios", status_code=303)
+    return redirecionar(request, "/usuarios")
 
 @app.get("/usuarios/rebaixar/{id}")
 async def promover_usuario(request: Request, id: int):
@@ -178,7 +289,42 @@ async def promover_usuario(request: Request, id: int):
     # Rebaixa o usuário para tipo 0 (usuário comum)
     usuario_repo.atualizar_tipo_usuario(id, 0)
     # Redireciona para a lista de usuários
-    return RedirectResponse(url="/usuarios", status_code=303)
+    return redirecionar(request, "/usuarios")
+
+@app.post("/usuarios/excluir/{id}")
+def excluir_usuario(request: Request, id: int):
+    # Somente administradores podem excluir usuários
+    usuario_json = request.session.get("usuario")
+    if not usuario_json or usuario_json["tipo"] != "admin":
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    # Se não encontrou o usuário, retorna erro 404
+    if not usuario_repo.obter_usuario_por_id(id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    # Exclui as sessões e os endereços do usuário em lotes e então o usuário
+    try:
+        progresso = exclusao_lotes.excluir_usuario(id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Se o banco impediu a exclusão (ex.: novos dependentes), retorna conflito com o motivo
+    if progresso["situacao"] == "cancelada":
+        raise HTTPException(status_code=409, detail=progresso["erro"])
+    # Se a operação foi interrompida, repetir a requisição continua de onde parou
+    if progresso["situacao"] != "concluida":
+        raise HTTPException(status_code=503, detail=f"Exclusão interrompida, repita para continuar: {progresso['erro']}")
+    # Redireciona para a lista de usuários
+    return redirecionar(request, "/usuarios")
+
+@app.get("/usuarios/excluir/{id}/progresso")
+def read_progresso_exclusao_usuario(request: Request, id: int):
+    # Somente administradores podem acompanhar as exclusões de usuários
+    usuario_json = request.session.get("usuario")
+    if not usuario_json or usuario_json["tipo"] != "admin":
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    # Retorna o progresso da exclusão em lotes do usuário (de qualquer worker)
+    progresso = exclusao_lotes.obter_progresso(exclusao_lotes.id_operacao("usuario", id))
+    if progresso is None:
+        raise HTTPException(status_code=404, detail="Exclusão não encontrada")
+    return JSONResponse(progresso)
 
 @app.get("/perfil")
 async def perfil_usuario(request: Request):
@@ -208,19 +354,21 @@ async def atualizar_perfil(
     # Se não encontrou um usuário, retorna erro 401
     if not usuario_json:
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
-    # Busca os dados do usuário no repositório
-    usuario = usuario_repo.obter_usuario_por_id(usuario_json["id"])
-    # Se não encontrou o usuário, retorna erro 404
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    # Atualiza os dados do usuário
-    usuario.nome = nome
-    usuario.telefone = telefone
-    usuario.email = email
-    usuario.data_nascimento = data_nascimento
-    # Atualiza o usuário no repositório
-    if not usuario_repo.atualizar_usuario(usuario):
-        raise HTTPException(status_code=400, detail="Erro ao atualizar perfil")
+    # Lê e grava o usuário na mesma transação (uma única conexão e um único commit)
+    with transacao():
+        # Busca os dados do usuário no repositório
+        usuario = usuario_repo.obter_usuario_por_id(usuario_json["id"])
+        # Se não encontrou o usuário, retorna erro 404
+        if not usuario:
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+        # Atualiza os dados do usuário
+        usuario.nome = nome
+        usuario.telefone = telefone
+        usuario.email = email
+        usuario.data_nascimento = data_nascimento
+        # Atualiza o usuário no repositório
+        if not usuario_repo.atualizar_usuario(usuario):
+            raise HTTPException(status_code=400, detail="Erro ao atualizar perfil")
     # Atualiza os dados do usuário na sessão
     usuario_json = {
         "id": usuario.id,
@@ -230,7 +378,7 @@ async def atualizar_perfil(
     }
     request.session["usuario"] = usuario_json
     # Redireciona para a página de perfil
-    return RedirectResponse(url="/perfil", status_code=303)
+    return redirecionar(request, "/perfil")
 
 @app.get("/senha")
 async def senha_usuario(request: Request):
@@ -258,19 +406,25 @@ async def atualizar_senha(
     # Se não encontrou um usuário, retorna erro 401
     if not usuario_json:
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
-    # Busca os dados do usuário no repositório
-    usuario = usuario_repo.obter_usuario_por_id(usuario_json["id"])
-    # Se não encontrou o usuário, retorna erro 404
-    if not usuario:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
     # Verifica se as senhas conferem
     if nova_senha != conf_nova_senha:
         raise HTTPException(status_code=400, detail="As senhas não conferem")
-    # Atualiza a senha do usuário
-    if not usuario_repo.atualizar_senha_usuario(usuario.id, hash_senha(nova_senha)):
-        raise HTTPException(status_code=400, detail="Erro ao atualizar senha")
+    # Calcula o hash antes de abrir a transação, para não segurar a escrita durante o cálculo
+    senha_hash = hash_senha(nova_senha)
+    # Lê o usuário e grava a nova senha (revogando as sessões) na mesma transação
+    with transacao():
+        # Busca os dados do usuário no repositório
+        usuario = usuario_repo.obter_usuario_por_id(usuario_json["id"])
+        # Se não encontrou o usuário, retorna erro 404
+        if not usuario:
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+        # Atualiza a senha do usuário
+        if not usuario_repo.atualizar_senha_usuario(usuario.id, senha_hash):
+            raise HTTPException(status_code=400, detail="Erro ao atualizar senha")
+    # As sessões do usuário foram revogadas: mantém este navegador logado com um novo identificador
+    request.session.regenerar()
     # Redireciona para a página de perfil
-    return RedirectResponse(url="/perfil", status_code=303)
+    return redirecionar(request, "/perfil")
 
 @app.get("/categorias/inserir")
 async def inserir_categoria(request: Request):
@@ -291,7 +445,7 @@ async def inserir_categoria_post(
     if not categoria_repo.inserir_categoria(categoria):
         raise HTTPException(status_code=400, detail="Erro ao inserir categoria")
     # Redireciona para a lista de categorias
-    return RedirectResponse(url="/categorias", status_code=303)
+    return redirecionar(request, "/categorias")
 
 @app.get("/categorias/alterar/{id}")
 async def alterar_categoria(request: Request, id: int):
@@ -318,20 +472,157 @@ async def alterar_categoria_post(
     if not categoria_repo.atualizar_categoria(categoria):
         raise HTTPException(status_code=400, detail="Erro ao atualizar categoria")
     # Redireciona para a lista de categorias
-    return RedirectResponse(url="/categorias", status_code=303)
+    return redirecionar(request, "/categorias")
 
 @app.get("/categorias/excluir/{id}")
-async def excluir_categoria(request: Request, id: int):
+def excluir_categoria(request: Request, id: int, produtos: str = "", destino: Optional[int] = None):
     # Busca a categoria pelo ID
     categoria = categoria_repo.obter_categoria_por_id(id)
     # Se não encontrou a categoria, retorna erro 404
     if not categoria:
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
-    # Retorna a página de confirmação de exclusão de categoria
-    if not categoria_repo.excluir_categoria(id):
-        raise HTTPException(status_code=400, detail="Erro ao excluir categoria")
+    # Move os produtos para "destino" ou os exclui (produtos=excluir) em lotes e então exclui a categoria
+    try:
+        progresso = exclusao_lotes.excluir_categoria(id, destino, excluir_produtos=produtos == "excluir")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Se o banco impediu a exclusão (ex.: novos dependentes), retorna conflito com o motivo
+    if progresso["situacao"] == "cancelada":
+        raise HTTPException(status_code=409, detail=progresso["erro"])
+    # Se a operação foi interrompida, repetir a requisição continua de onde parou
+    if progresso["situacao"] != "concluida":
+        raise HTTPException(status_code=503, detail=f"Exclusão interrompida, repita para continuar: {progresso['erro']}")
     # Redireciona para a lista de categorias
-    return RedirectResponse(url="/categorias", status_code=303)
+    return redirecionar(request, "/categorias")
+
+@app.get("/categorias/excluir/{id}/progresso")
+def read_progresso_exclusao_categoria(request: Request, id: int):
+    # Retorna o progresso da exclusão em lotes da categoria (de qualquer worker)
+    progresso = exclusao_lotes.obter_progresso(exclusao_lotes.id_operacao("categoria", id))
+    if progresso is None:
+        raise HTTPException(status_code=404, detail="Exclusão não encontrada")
+    return JSONResponse(progresso)
+
+@app.post("/pedidos")
+def realizar_pedido(
+    request: Request,
+    id_produto: list[int] = Form(),
+    quantidade: list[int] = Form()
+):
+    # Captura os dados do usuário da sessão (logado)
+    usuario_json = request.session.get("usuario")
+    # Se não encontrou um usuário, retorna erro 401
+    if not usuario_json:
+        raise HTTPException(status_code=401, detail="Usuário não autenticado")
+    # Se as listas de produtos e quantidades não correspondem, retorna erro 400
+    if len(id_produto) != len(quantidade):
+        raise HTTPException(status_code=400, detail="Itens do pedido inválidos")
+    # Tenta registrar o pedido (baixa de estoque, itens e total na mesma transação)
+    id_pedido = pedido_repo.inserir_pedido(usuario_json["id"], list(zip(id_produto, quantidade)))
+    # Se não conseguiu registrar o pedido, retorna erro 409
+    if not id_pedido:
+        raise HTTPException(status_code=409, detail="Estoque insuficiente para o pedido")
+    # Redireciona para a página do pedido
+    return redirecionar(request, f"/pedidos/{id_pedido}")
+
+@app.get("/pedidos")
+def read_pedidos(request: Request):
+    # Captura os dados do usuário da sessão (logado)
+    usuario_json = request.session.get("usuario")
+    # Se não encontrou um usuário, retorna erro 401
+    if not usuario_json:
+        raise HTTPException(status_code=401, detail="Usuário não autenticado")
+    # Obtém os 12 pedidos mais recentes do usuário
+    pedidos = pedido_repo.obter_pedidos_por_usuario(usuario_json["id"], 1, 12)
+    # Retorna a página com os pedidos do usuário
+    return templates.TemplateResponse("pedidos.html", {"request": request, "pedidos": pedidos})
+
+@app.get("/pedidos/{id}")
+def read_pedido(request: Request, id: int):
+    # Captura os dados do usuário da sessão (logado)
+    usuario_json = request.session.get("usuario")
+    # Se não encontrou um usuário, retorna erro 401
+    if not usuario_json:
+        raise HTTPException(status_code=401, detail="Usuário não autenticado")
+    # Busca o pedido com seus itens
+    pedido = pedido_repo.obter_pedido_por_id(id)
+    # Se não encontrou o pedido ou ele pertence a outro usuário (e não é admin), retorna erro 404
+    if not pedido or (pedido.id_usuario != usuario_json["id"] and usuario_json["tipo"] != "admin"):
+        raise HTTPException(status_code=404, detail="Pedido não encontrado")
+    # Retorna a página com os detalhes do pedido
+    return templates.TemplateResponse("pedido.html", {"request": request, "pedido": pedido})
+
+@app.get("/metrics")
+def read_metrics():
+    # Retorna as métricas deste processo no formato texto do Prometheus
+    return Response(content=metricas.gerar_texto(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/produtos")
+def api_produtos(pagina: int = 1, tamanho: int = 12):
+    # Se a página ou o tamanho forem inválidos, retorna erro 400
+    if pagina < 1 or not 1 <= tamanho <= 100:
+        raise HTTPException(status_code=400, detail="Paginação inválida")
+    # Monta a lista concatenando os payloads JSON já serializados de cada produto
+    conteudo = catalogo_json.obter_pagina_produtos_json(pagina, tamanho)
+    # Retorna os bytes diretamente, sem nova serialização
+    return Response(content=conteudo, media_type="application/json")
+
+@app.get("/api/produtos/{id}")
+def api_produto(id: int):
+    # Obtém o payload JSON do produto (do cache ou do banco de dados)
+    conteudo = catalogo_json.obter_produto_json(id)
+    # Se não encontrou o produto, retorna erro 404
+    if conteudo is None:
+        raise HTTPException(status_code=404, detail="Produto não encontrado")
+    # Retorna os bytes diretamente, sem nova serialização
+    return Response(content=conteudo, media_type="application/json")
+
+@app.get("/api/categorias")
+def api_categorias(pagina: int = 1, tamanho: int = 100):
+    # Se a página ou o tamanho forem inválidos, retorna erro 400
+    if pagina < 1 or not 1 <= tamanho <= 100:
+        raise HTTPException(status_code=400, detail="Paginação inválida")
+    # Obtém as categorias da página solicitada
+    categorias = categoria_repo.obter_categorias_por_pagina(pagina, tamanho)
+    # Retorna as categorias em JSON
+    return JSONResponse([asdict(categoria) for categoria in categorias])
+
+@app.get("/api/autocomplete")
+def api_autocomplete(q: str = "", limite: int = 10):
+    # Se o limite for inválido, retorna erro 400
+    if not 1 <= limite <= 50:
+        raise HTTPException(status_code=400, detail="Limite inválido")
+    # Busca os produtos cujo nome (ou uma palavra dele) começa pelo texto digitado, no índice em memória
+    produtos = autocomplete.buscar(q, limite)
+    # Serializa diretamente, sem validação de modelo de resposta
+    return Response(content=json.dumps(produtos, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                    media_type="application/json")
+
+def enviar_arquivo_sitemap(request: Request, nome: str) -> StreamingResponse:
+    # Obtém o arquivo da versão atual do catálogo (gerado na primeira requisição após uma alteração)
+    caminho = sitemap.obter_caminho(nome)
+    # Se o arquivo não existe (ex.: parte além da última), retorna erro 404
+    if caminho is None:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    # Envia o arquivo em blocos, com os links montados para o endereço da requisição
+    return StreamingResponse(sitemap.ler(caminho, str(request.base_url)), media_type="application/xml")
+
+@app.get("/sitemap.xml")
+def read_sitemap(request: Request):
+    # Sitemap com as páginas e todos os produtos (ou o índice das partes, acima de 50.000 URLs)
+    return enviar_arquivo_sitemap(request, sitemap.ARQUIVO_SITEMAP)
+
+@app.get("/sitemaps/{nome}")
+def read_parte_sitemap(request: Request, nome: str):
+    # Parte do sitemap referenciada pelo índice (sitemap-1.xml, sitemap-2.xml...)
+    return enviar_arquivo_sitemap(request, nome)
+
+@app.get("/feed/produtos.xml")
+def read_feed_produtos(request: Request):
+    # Feed de produtos (RSS 2.0 com os campos do Google Merchant Center) para buscadores e marketplaces
+    return enviar_arquivo_sitemap(request, sitemap.ARQUIVO_FEED)
 
 if __name__ == "__main__":
+    # Importa o uvicorn apenas quando o arquivo é executado diretamente
+    import uvicorn
     uvicorn.run(app=app, port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CategoriaAgregado:
+    id: int
+    nome: str
+    quantidade_produtos: int = 0
+    quantidade_em_estoque: int = 0
+    preco_minimo: Optional[float] = None
+    preco_maximo: Optional[float] = None
+    preco_medio: Optional[float] = None
+    valor_estoque: float = 0.0
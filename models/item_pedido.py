@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ItemPedido:
+    id: int
+    id_pedido: int
+    id_produto: Optional[int]
+    nome_produto: str
+    preco_unitario: float
+    quantidade: int
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+import datetime
+from typing import Optional
+
+from models.item_pedido import ItemPedido
+
+
+@dataclass
+class Pedido:
+    id: int
+    id_usuario: int
+    data_hora: datetime
+    valor_total: float
+    status: str = "realizado"
+    itens: Optional[list[ItemPedido]] = None
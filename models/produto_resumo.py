@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ProdutoResumo:
+    id: int
+    nome: str
+    descricao_resumida: str
+    preco: float
+    estoque: int
+    imagem: str
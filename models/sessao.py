@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Sessao:
+    id: str
+    id_usuario: Optional[int]
+    dados: dict
+    expira_em: float
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class UsuarioResumo:
+    id: int
+    nome: str
+    cpf: str
+    telefone: str
+    email: str
+    data_nascimento: str
+    tipo: int
@@ -1,9 +1,12 @@
 import os
 from sqlite3 import Connection, Cursor
 from typing import Optional
-from util.database import obter_conexao
+from util.database import apos_commit, obter_conexao
+from util import cache_produtos
 from sql.categoria_sql import *
+from sql.alteracao_sql import *
 from models.categoria import Categoria
+from models.categoria_agregado import CategoriaAgregado
 
 def criar_tabela_categorias() -> bool:
     try:
@@ -13,6 +16,15 @@ def criar_tabela_categorias() -> bool:
             cursor = conexao.cursor()
             # Executa comando SQL para criar tabela de categorias
             cursor.execute(CREATE_TABLE_CATEGORIA)
+            # Cria a tabela de agregados por categoria e o trigger que inicia os agregados de cada categoria nova
+            cursor.execute(CREATE_TABLE_CATEGORIA_AGREGADO)
+            cursor.execute(CREATE_TRIGGER_CATEGORIA_AGREGADO_INSERT)
+            # Cria o registro de alterações e os triggers que alimentam a invalidação entre processos
+            cursor.execute(CREATE_TABLE_ALTERACAO)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_PODA)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_CATEGORIA_INSERT)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_CATEGORIA_UPDATE)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_CATEGORIA_DELETE)
             # Retorna True indicando sucesso
             return True
     except Exception as e:
@@ -40,8 +52,12 @@ def atualizar_categoria(categoria: Categoria) -> bool:
         # Executa comando SQL para atualizar nome da categoria pelo ID
         cursor.execute(UPDATE_CATEGORIA, 
             (categoria.nome, categoria.id))
-        # Retorna True se alguma linha foi afetada
-        return (cursor.rowcount > 0)
+        # Verifica se alguma linha foi afetada
+        alterado = (cursor.rowcount > 0)
+    # Após o commit, descarta os payloads JSON em cache, que incluem o nome da categoria
+    apos_commit(cache_produtos.limpar)
+    # Retorna True se alguma linha foi afetada
+    return alterado
 
 def excluir_categoria(id: int) -> bool:
     # Obtém conexão com o banco de dados
@@ -89,18 +105,52 @@ def obter_categorias_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list
             id=resultado["id"],
             nome=resultado["nome"])
             for resultado in resultados]
-    
-def inserir_dados_iniciais(conexao: Connection) -> None:
-    # Verifica se já existem categorias na tabela
-    lista = obter_categorias_por_pagina(1, 5)
-    # Se já houver categorias, não faz nada
-    if lista: 
-        return
-    # Constrói caminho para arquivo SQL com dados iniciais
-    caminho_arquivo_sql = os.path.join(os.path.dirname(__file__), '../data/insert_categorias.sql')
-    # Abre arquivo SQL para leitura
-    with open(caminho_arquivo_sql, 'r', encoding='utf-8') as arquivo:
-        # Lê conteúdo do arquivo SQL
-        sql_inserts = arquivo.read()
-        # Executa comandos SQL de inserção
-        conexao.execute(sql_inserts)
+
+def criar_agregado(resultado) -> CategoriaAgregado:
+    # Cria objeto CategoriaAgregado a partir de uma linha da consulta de agregados
+    return CategoriaAgregado(
+        id=resultado["id"],
+        nome=resultado["nome"],
+        quantidade_produtos=resultado["quantidade_produtos"],
+        quantidade_em_estoque=resultado["quantidade_em_estoque"],
+        preco_minimo=resultado["preco_minimo"],
+        preco_maximo=resultado["preco_maximo"],
+        preco_medio=resultado["preco_medio"],
+        valor_estoque=resultado["valor_estoque"])
+
+def obter_agregado_categoria(id: int) -> Optional[CategoriaAgregado]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar a categoria com seus agregados (leitura por chave primária)
+        cursor.execute(GET_CATEGORIA_AGREGADO_BY_ID, (id,))
+        # Obtém primeiro resultado da consulta
+        resultado = cursor.fetchone()
+        # Retorna o agregado ou None se não encontrou a categoria
+        return criar_agregado(resultado) if resultado else None
+
+def obter_agregados_categorias_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list[CategoriaAgregado]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Define limite de registros por página
+        limite = tamanho_pagina
+        # Calcula offset baseado no número da página
+        offset = (numero_pagina - 1) * tamanho_pagina
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar as categorias da página com seus agregados já calculados
+        cursor.execute(GET_CATEGORIAS_AGREGADOS_BY_PAGE, (limite, offset))
+        # Cria lista de objetos CategoriaAgregado a partir dos resultados
+        return [criar_agregado(resultado) for resultado in cursor.fetchall()]
+
+def reconstruir_agregados_categorias() -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Remove todos os agregados e os recalcula a partir de Produto na mesma transação
+        cursor.execute(DELETE_CATEGORIA_AGREGADO)
+        cursor.execute(POPULAR_CATEGORIA_AGREGADO)
+        # Retorna a quantidade de categorias recalculadas
+        return cursor.rowcount
@@ -1,4 +1,3 @@
-import os
 from sqlite3 import Connection, Cursor
 from typing import Optional
 from util.database import obter_conexao
@@ -13,6 +12,7 @@ def criar_tabela_enderecos() -> bool:
             cursor = conexao.cursor()
             # Executa comando SQL para criar tabela de endereços
             cursor.execute(CREATE_TABLE_ENDERECO)
+            cursor.execute(CREATE_INDEX_ENDERECO_USUARIO)
             # Retorna True indicando sucesso
             return True
     except Exception as e:
@@ -113,19 +113,13 @@ def obter_enderecos_por_usuario(id_usuario: int) -> list[Endereco]:
             cep=resultado["cep"],
             id_usuario=resultado["id_usuario"]
         ) for resultado in resultados]
-    
-def inserir_dados_iniciais(conexao: Connection) -> None:
-    # Verifica se já existem endereços na tabela
-    lista = obter_enderecos_por_usuario(1)
-    # Se já houver endereços, não faz nada
-    if lista: 
-        return
-    # Constrói caminho para arquivo SQL com dados iniciais
-    caminho_arquivo_sql = os.path.join(os.path.dirname(__file__), '../data/insert_enderecos.sql')
-    # Abre arquivo SQL para leitura
-    with open(caminho_arquivo_sql, 'r', encoding='utf-8') as arquivo:
-        # Lê conteúdo do arquivo SQL
-        sql_inserts = arquivo.read()
-        # Executa comandos SQL de inserção
-        conexao.execute(sql_inserts)
-        
\ No newline at end of file
+
+def excluir_enderecos_usuario_lote(id_usuario: int, tamanho_lote: int) -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Exclui no máximo "tamanho_lote" endereços do usuário em uma transação curta
+        cursor.execute(DELETE_ENDERECOS_BY_USUARIO_LOTE, (id_usuario, tamanho_lote))
+        # Retorna a quantidade de endereços excluídos (0 quando não restar nenhum)
+        return cursor.rowcount
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Optional
+from util.database import apos_commit, obter_conexao
+from util import cache_produtos
+from sql.pedido_sql import *
+from sql.produto_sql import RESERVAR_ESTOQUE, LIBERAR_ESTOQUE
+from models.pedido import Pedido
+from models.item_pedido import ItemPedido
+from repo.produto_repo import agrupar_itens
+
+def criar_tabela_pedidos() -> bool:
+    try:
+        # Obtém conexão com o banco de dados
+        with obter_conexao() as conexao:
+            # Cria cursor para executar comandos SQL
+            cursor = conexao.cursor()
+            # Executa comandos SQL para criar as tabelas de pedidos e itens com seus índices
+            cursor.execute(CREATE_TABLE_PEDIDO)
+            cursor.execute(CREATE_INDEX_PEDIDO_USUARIO)
+            cursor.execute(CREATE_TABLE_ITEM_PEDIDO)
+            cursor.execute(CREATE_INDEX_ITEM_PEDIDO_PEDIDO)
+            cursor.execute(CREATE_INDEX_ITEM_PEDIDO_PRODUTO)
+            # Retorna True indicando sucesso
+            return True
+    except Exception as e:
+        # Imprime mensagem de erro caso ocorra exceção
+        print(f"Erro ao criar tabelas de pedidos: {e}")
+        # Retorna False indicando falha
+        return False
+
+def inserir_pedido(id_usuario: int, itens: list[tuple[int, int]]) -> Optional[int]:
+    # Agrupa os itens (id_produto, quantidade), ordenados por ID do produto
+    itens = agrupar_itens(itens)
+    # Pedidos vazios ou com quantidades não positivas não são aceitos
+    if not itens or any(quantidade <= 0 for _, quantidade in itens):
+        return None
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Baixa o estoque de todos os itens com UPDATEs condicionais (a transação de escrita começa aqui)
+        cursor.executemany(RESERVAR_ESTOQUE,
+            [(quantidade, id_produto, quantidade) for id_produto, quantidade in itens])
+        # Se algum item não tinha estoque suficiente, desfaz tudo e não cria o pedido
+        if cursor.rowcount != len(itens):
+            conexao.rollback()
+            return None
+        # Insere o cabeçalho do pedido
+        cursor.execute(INSERT_PEDIDO, (id_usuario, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        id_pedido = cursor.lastrowid
+        # Insere todos os itens de uma vez, copiando nome e preço atuais de cada produto
+        cursor.executemany(INSERT_ITEM_PEDIDO,
+            [(id_pedido, quantidade, id_produto) for id_produto, quantidade in itens])
+        # Calcula o valor total a partir dos preços copiados para os itens
+        cursor.execute(UPDATE_VALOR_TOTAL_PEDIDO, (id_pedido,))
+    # Após o commit, remove os payloads JSON dos produtos do cache (o estoque mudou)
+    for id_produto, _ in itens:
+        apos_commit(cache_produtos.invalidar, id_produto)
+    # Retorna o ID do pedido inserido
+    return id_pedido
+
+def cancelar_pedido(id: int) -> bool:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Marca o pedido como cancelado apenas se ele ainda estiver realizado
+        cursor.execute(UPDATE_STATUS_PEDIDO, ("cancelado", id, "realizado"))
+        # Se o pedido não existe ou já foi cancelado, não faz nada
+        if cursor.rowcount == 0:
+            return False
+        # Busca os itens do pedido para devolver o estoque
+        cursor.execute(GET_ITENS_BY_PEDIDO, (id,))
+        itens = [(resultado["quantidade"], resultado["id_produto"])
+            for resultado in cursor.fetchall()
+            if resultado["id_produto"] is not None]
+        # Devolve o estoque de todos os itens na mesma transação
+        cursor.executemany(LIBERAR_ESTOQUE, itens)
+    # Após o commit, remove os payloads JSON dos produtos do cache
+    for _, id_produto in itens:
+        apos_commit(cache_produtos.invalidar, id_produto)
+    # Retorna True indicando que o pedido foi cancelado
+    return True
+
+def obter_pedido_por_id(id: int) -> Optional[Pedido]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar o pedido pelo ID
+        cursor.execute(GET_PEDIDO_BY_ID, (id,))
+        # Obtém primeiro resultado da consulta
+        resultado = cursor.fetchone()
+        # Se não encontrou o pedido, retorna None
+        if not resultado:
+            return None
+        # Cria objeto Pedido com dados do banco
+        pedido = Pedido(
+            id=resultado["id"],
+            id_usuario=resultado["id_usuario"],
+            # Converte string de data e hora para objeto datetime
+            data_hora=datetime.strptime(resultado["data_hora"], "%Y-%m-%d %H:%M:%S"),
+            valor_total=resultado["valor_total"],
+            status=resultado["status"])
+        # Executa comando SQL para buscar os itens do pedido
+        cursor.execute(GET_ITENS_BY_PEDIDO, (id,))
+        # Cria lista de objetos ItemPedido a partir dos resultados
+        pedido.itens = [ItemPedido(
+            id=item["id"],
+            id_pedido=item["id_pedido"],
+            id_produto=item["id_produto"],
+            nome_produto=item["nome_produto"],
+            preco_unitario=item["preco_unitario"],
+            quantidade=item["quantidade"]
+        ) for item in cursor.fetchall()]
+        # Retorna o pedido com seus itens
+        return pedido
+
+def obter_pedidos_por_usuario(id_usuario: int, numero_pagina: int, tamanho_pagina: int) -> list[Pedido]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Define limite de registros por página
+        limite = tamanho_pagina
+        # Calcula offset baseado no número da página
+        offset = (numero_pagina - 1) * tamanho_pagina
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar os pedidos do usuário, do mais recente para o mais antigo
+        cursor.execute(GET_PEDIDOS_BY_USUARIO, (id_usuario, limite, offset))
+        # Obtém todos os resultados da consulta
+        resultados = cursor.fetchall()
+        # Cria lista de objetos Pedido (sem itens) a partir dos resultados
+        return [Pedido(
+            id=resultado["id"],
+            id_usuario=resultado["id_usuario"],
+            # Converte string de data e hora para objeto datetime
+            data_hora=datetime.strptime(resultado["data_hora"], "%Y-%m-%d %H:%M:%S"),
+            valor_total=resultado["valor_total"],
+            status=resultado["status"]
+        ) for resultado in resultados]
+
+def usuario_possui_pedidos(id_usuario: int) -> bool:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Verifica se existe ao menos um pedido do usuário (resolvido pelo índice de usuário)
+        cursor.execute(EXISTE_PEDIDO_BY_USUARIO, (id_usuario,))
+        # Retorna True se encontrou algum pedido
+        return cursor.fetchone() is not None
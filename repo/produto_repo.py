@@ -1,10 +1,15 @@
 import os
 from sqlite3 import Connection, Cursor
-from typing import Optional
-from util.database import obter_conexao
+from typing import Iterator, Optional
+from util.database import apos_commit, obter_conexao
+from util import cache_produtos
 from models.categoria import Categoria
 from sql.produto_sql import *
+from sql.categoria_sql import CREATE_TRIGGER_PRODUTO_AGREGADO_INSERT, CREATE_TRIGGER_PRODUTO_AGREGADO_UPDATE, \
+    CREATE_TRIGGER_PRODUTO_AGREGADO_ESTOQUE, CREATE_TRIGGER_PRODUTO_AGREGADO_DELETE, POPULAR_CATEGORIA_AGREGADO_SE_VAZIA
+from sql.alteracao_sql import *
 from models.produto import Produto
+from models.produto_resumo import ProdutoResumo
 
 def criar_tabela_produtos() -> bool:
     try:
@@ -14,6 +19,34 @@ def criar_tabela_produtos() -> bool:
             cursor = conexao.cursor()
             # Executa comando SQL para criar tabela de produtos
             cursor.execute(CREATE_TABLE_PRODUTO)
+            cursor.execute(CREATE_INDEX_PRODUTO_CATEGORIA_PRECO)
+            # Cria a tabela de listagem desnormalizada e seus índices
+            cursor.execute(CREATE_TABLE_PRODUTO_LISTAGEM)
+            cursor.execute(CREATE_INDEX_PRODUTO_LISTAGEM_NOME)
+            cursor.execute(CREATE_INDEX_PRODUTO_LISTAGEM_CATEGORIA)
+            # Cria os triggers que mantêm a tabela de listagem consistente
+            cursor.execute(CREATE_TRIGGER_PRODUTO_LISTAGEM_INSERT)
+            cursor.execute(CREATE_TRIGGER_PRODUTO_LISTAGEM_UPDATE)
+            cursor.execute(CREATE_TRIGGER_PRODUTO_LISTAGEM_ESTOQUE)
+            cursor.execute(CREATE_TRIGGER_PRODUTO_LISTAGEM_DELETE)
+            cursor.execute(CREATE_TRIGGER_CATEGORIA_LISTAGEM_UPDATE)
+            # Preenche a listagem caso o banco já tivesse produtos antes dela existir
+            cursor.execute(POPULAR_PRODUTO_LISTAGEM_SE_VAZIA)
+            # Cria os triggers que mantêm os agregados por categoria e os preenche se estiverem vazios
+            cursor.execute(CREATE_TRIGGER_PRODUTO_AGREGADO_INSERT)
+            cursor.execute(CREATE_TRIGGER_PRODUTO_AGREGADO_UPDATE)
+            cursor.execute(CREATE_TRIGGER_PRODUTO_AGREGADO_ESTOQUE)
+            cursor.execute(CREATE_TRIGGER_PRODUTO_AGREGADO_DELETE)
+            cursor.execute(POPULAR_CATEGORIA_AGREGADO_SE_VAZIA)
+            # Cria a tabela de contadores de visualizações e o índice usado no ranking dos mais vistos
+            cursor.execute(CREATE_TABLE_PRODUTO_ESTATISTICA)
+            cursor.execute(CREATE_INDEX_PRODUTO_ESTATISTICA_VISUALIZACOES)
+            # Cria o registro de alterações e os triggers que alimentam a invalidação entre processos
+            cursor.execute(CREATE_TABLE_ALTERACAO)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_PODA)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_PRODUTO_INSERT)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_PRODUTO_UPDATE)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_PRODUTO_DELETE)
             # Retorna True indicando sucesso
             return True
     except Exception as e:
@@ -22,6 +55,24 @@ def criar_tabela_produtos() -> bool:
         # Retorna False indicando falha
         return False
     
+def reconstruir_listagem_produtos() -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Remove todas as linhas da tabela de listagem
+        cursor.execute(DELETE_PRODUTO_LISTAGEM)
+        # Recria a listagem a partir das tabelas Produto e Categoria na mesma transação
+        cursor.execute(POPULAR_PRODUTO_LISTAGEM)
+        # Guarda a quantidade de produtos reconstruídos
+        quantidade = cursor.rowcount
+        # Avisa os outros processos para descartarem todos os payloads de produtos
+        cursor.execute(INSERT_ALTERACAO, ("produto", None))
+    # Após o commit, descarta os payloads JSON em cache, pois podem estar desatualizados
+    apos_commit(cache_produtos.limpar)
+    # Retorna a quantidade de produtos reconstruídos
+    return quantidade
+
 def inserir_produto(produto: Produto) -> Optional[int]:
     # Obtém conexão com o banco de dados
     with obter_conexao() as conexao:
@@ -41,8 +92,12 @@ def atualizar_produto(produto: Produto) -> bool:
         # Executa comando SQL para atualizar todos os campos do produto pelo ID
         cursor.execute(UPDATE_PRODUTO, 
             (produto.nome, produto.descricao, produto.preco, produto.estoque, produto.imagem, produto.id_categoria, produto.id))
-        # Retorna True se alguma linha foi afetada
-        return (cursor.rowcount > 0)
+        # Verifica se alguma linha foi afetada
+        alterado = (cursor.rowcount > 0)
+    # Após o commit, remove o payload JSON do produto alterado do cache
+    apos_commit(cache_produtos.invalidar, produto.id)
+    # Retorna True se alguma linha foi afetada
+    return alterado
 
 def excluir_produto(id: int) -> bool:
     # Obtém conexão com o banco de dados
@@ -51,8 +106,79 @@ def excluir_produto(id: int) -> bool:
         cursor = conexao.cursor()
         # Executa comando SQL para deletar produto pelo ID
         cursor.execute(DELETE_PRODUTO, (id,))
-        # Retorna True se alguma linha foi afetada
-        return (cursor.rowcount > 0)
+        # Verifica se alguma linha foi afetada
+        excluido = (cursor.rowcount > 0)
+    # Após o commit, remove o payload JSON do produto excluído do cache
+    apos_commit(cache_produtos.invalidar, id)
+    # Retorna True se alguma linha foi afetada
+    return excluido
+
+def reservar_estoque(id: int, quantidade: int) -> bool:
+    # Quantidades não positivas não são reservadas
+    if quantidade <= 0:
+        return False
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Decrementa o estoque apenas se houver quantidade suficiente (sem ler antes)
+        cursor.execute(RESERVAR_ESTOQUE, (quantidade, id, quantidade))
+        # Verifica se a reserva foi feita
+        reservado = (cursor.rowcount > 0)
+    # Após o commit, remove o payload JSON do produto do cache
+    if reservado:
+        apos_commit(cache_produtos.invalidar, id)
+    # Retorna True se havia estoque suficiente
+    return reservado
+
+def liberar_estoque(id: int, quantidade: int) -> bool:
+    # Quantidades não positivas não são liberadas
+    if quantidade <= 0:
+        return False
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Devolve a quantidade ao estoque com um incremento atômico
+        cursor.execute(LIBERAR_ESTOQUE, (quantidade, id))
+        # Verifica se o produto existia
+        liberado = (cursor.rowcount > 0)
+    # Após o commit, remove o payload JSON do produto do cache
+    if liberado:
+        apos_commit(cache_produtos.invalidar, id)
+    # Retorna True se o estoque foi devolvido
+    return liberado
+
+def agrupar_itens(itens: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    # Soma as quantidades de itens repetidos do mesmo produto
+    quantidades: dict[int, int] = {}
+    for id_produto, quantidade in itens:
+        quantidades[id_produto] = quantidades.get(id_produto, 0) + quantidade
+    # Retorna os itens ordenados por ID, para que as transações travem as linhas sempre na mesma ordem
+    return sorted(quantidades.items())
+
+def reservar_estoque_carrinho(itens: list[tuple[int, int]]) -> bool:
+    # Agrupa os itens (id_produto, quantidade) do carrinho
+    itens = agrupar_itens(itens)
+    # Carrinhos vazios ou com quantidades não positivas não são reservados
+    if not itens or any(quantidade <= 0 for _, quantidade in itens):
+        return False
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa as reservas condicionais de todos os itens na mesma transação
+        cursor.executemany(RESERVAR_ESTOQUE,
+            [(quantidade, id_produto, quantidade) for id_produto, quantidade in itens])
+        # Se algum item não tinha estoque suficiente, desfaz todas as reservas
+        if cursor.rowcount != len(itens):
+            conexao.rollback()
+            return False
+    # Após o commit, remove os payloads JSON dos produtos do cache
+    for id_produto, _ in itens:
+        apos_commit(cache_produtos.invalidar, id_produto)
+    # Retorna True indicando que o carrinho inteiro foi reservado
+    return True
 
 def obter_produto_por_id(id: int) -> Optional[Produto]:
     # Obtém conexão com o banco de dados
@@ -112,17 +238,191 @@ def obter_produtos_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list[P
             )
         ) for resultado in resultados]
     
-def inserir_dados_iniciais(conexao: Connection) -> None:
-    # Verifica se já existem produtos na tabela
-    lista = obter_produtos_por_pagina(1, 5)
-    # Se já houver produtos, não faz nada
-    if lista: 
+def criar_produto_resumo(resultado) -> ProdutoResumo:
+    # Cria objeto ProdutoResumo a partir de uma linha das consultas de listagem
+    return ProdutoResumo(
+        id=resultado["id"],
+        nome=resultado["nome"],
+        descricao_resumida=resultado["descricao_resumida"],
+        preco=resultado["preco"],
+        estoque=resultado["estoque"],
+        imagem=resultado["imagem"])
+
+def obter_produtos_resumo_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list[ProdutoResumo]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Calcula offset baseado no número da página
+        offset = (numero_pagina - 1) * tamanho_pagina
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar só as colunas exibidas nas listagens (sem a descrição completa)
+        cursor.execute(GET_PRODUTOS_RESUMO_BY_PAGE, (tamanho_pagina, offset))
+        # Cria lista de resumos a partir dos resultados
+        return [criar_produto_resumo(resultado) for resultado in cursor.fetchall()]
+
+def obter_ids_produtos_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list[int]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Define limite de registros por página
+        limite = tamanho_pagina
+        # Calcula offset baseado no número da página
+        offset = (numero_pagina - 1) * tamanho_pagina
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar apenas os IDs da página (resolvido pelo índice de nome)
+        cursor.execute(GET_IDS_PRODUTOS_BY_PAGE, (limite, offset))
+        # Retorna a lista de IDs na ordem da listagem
+        return [resultado["id"] for resultado in cursor.fetchall()]
+
+def obter_produtos_por_ids(ids: list[int]) -> list[Produto]:
+    # Se não houver IDs, não precisa consultar o banco
+    if not ids:
+        return []
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Monta um marcador de parâmetro para cada ID informado
+        sql = GET_PRODUTOS_BY_IDS.format(marcadores=", ".join("?" * len(ids)))
+        # Executa comando SQL para buscar os produtos pelos IDs
+        cursor.execute(sql, ids)
+        # Obtém todos os resultados da consulta
+        resultados = cursor.fetchall()
+        # Cria lista de objetos Produto a partir dos resultados (sem ordem garantida)
+        return [Produto(
+            id=resultado["id"],
+            nome=resultado["nome"],
+            descricao=resultado["descricao"],
+            preco=resultado["preco"],
+            estoque=resultado["estoque"],
+            imagem=resultado["imagem"],
+            id_categoria=resultado["id_categoria"],
+            # Cria objeto Categoria associado a cada produto
+            categoria=Categoria(
+                id=resultado["id_categoria"],
+                nome=resultado["nome_categoria"]
+            )
+        ) for resultado in resultados]
+
+def obter_nomes_produtos(ids: Optional[list[int]] = None) -> list[tuple[int, str]]:
+    # Se a lista de IDs foi informada vazia, não precisa consultar o banco
+    if ids is not None and not ids:
+        return []
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Busca os nomes de todos os produtos ou apenas dos IDs informados
+        if ids is None:
+            cursor.execute(GET_NOMES_PRODUTOS)
+        else:
+            cursor.execute(GET_NOMES_PRODUTOS_BY_IDS.format(marcadores=", ".join("?" * len(ids))), ids)
+        # Retorna pares (id, nome), sem ordem garantida
+        return [(resultado["id"], resultado["nome"]) for resultado in cursor.fetchall()]
+
+def atualizar_precos_estoques(itens: list[tuple[int, Optional[float], Optional[int]]]) -> tuple[int, set[int]]:
+    # Se não houver itens, não precisa consultar o banco
+    if not itens:
+        return 0, set()
+    ids = list({id for id, _, _ in itens})
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Verifica quais produtos do lote existem
+        cursor.execute(GET_IDS_PRODUTOS_EXISTENTES.format(marcadores=", ".join("?" * len(ids))), ids)
+        existentes = {resultado["id"] for resultado in cursor.fetchall()}
+        # Atualiza apenas preço e/ou estoque de todos os produtos do lote em uma única transação
+        cursor.executemany(UPDATE_PRECO_ESTOQUE_PRODUTO,
+            [{"id": id, "preco": preco, "estoque": estoque} for id, preco, estoque in itens if id in existentes])
+        alterados = cursor.rowcount
+    # Após o commit, remove os payloads JSON dos produtos do cache
+    for id in existentes:
+        apos_commit(cache_produtos.invalidar, id)
+    # Retorna a quantidade de produtos alterados e os IDs que não existem
+    return alterados, set(ids) - existentes
+
+def registrar_visualizacoes(contagens: dict[int, int]) -> None:
+    # Se não houver visualizações acumuladas, não precisa acessar o banco
+    if not contagens:
         return
-    # Constrói caminho para arquivo SQL com dados iniciais
-    caminho_arquivo_sql = os.path.join(os.path.dirname(__file__), '../data/insert_produtos.sql')
-    # Abre arquivo SQL para leitura
-    with open(caminho_arquivo_sql, 'r', encoding='utf-8') as arquivo:
-        # Lê conteúdo do arquivo SQL
-        sql_inserts = arquivo.read()
-        # Executa comandos SQL de inserção
-        conexao.execute(sql_inserts)
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Soma as visualizações de todos os produtos em uma única transação
+        cursor.executemany(UPSERT_VISUALIZACOES_PRODUTO,
+            [{"id": id, "quantidade": quantidade} for id, quantidade in contagens.items()])
+
+def obter_mais_vistos(quantidade: int) -> list[ProdutoResumo]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar os produtos com mais visualizações (percorrendo o índice)
+        cursor.execute(GET_PRODUTOS_MAIS_VISTOS, (quantidade,))
+        # Cria lista de resumos na ordem do ranking
+        return [criar_produto_resumo(resultado) for resultado in cursor.fetchall()]
+
+def excluir_produtos_categoria_lote(id_categoria: int, tamanho_lote: int) -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Exclui no máximo "tamanho_lote" produtos da categoria em uma transação curta
+        cursor.execute(DELETE_PRODUTOS_BY_CATEGORIA_LOTE, (id_categoria, tamanho_lote))
+        ids = [resultado["id"] for resultado in cursor.fetchall()]
+    # Após o commit, remove os payloads JSON dos produtos excluídos do cache
+    for id in ids:
+        apos_commit(cache_produtos.invalidar, id)
+    # Retorna a quantidade de produtos excluídos (0 quando não restar nenhum)
+    return len(ids)
+
+def mover_produtos_categoria_lote(id_categoria: int, id_destino: int, tamanho_lote: int) -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Move no máximo "tamanho_lote" produtos para a categoria de destino em uma transação curta
+        cursor.execute(UPDATE_CATEGORIA_PRODUTOS_LOTE, (id_destino, id_categoria, tamanho_lote))
+        ids = [resultado["id"] for resultado in cursor.fetchall()]
+    # Após o commit, remove os payloads JSON dos produtos movidos do cache (incluem o nome da categoria)
+    for id in ids:
+        apos_commit(cache_produtos.invalidar, id)
+    # Retorna a quantidade de produtos movidos (0 quando não restar nenhum)
+    return len(ids)
+
+def obter_versao_catalogo() -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Busca a última alteração de produtos ou categorias registrada pelos triggers
+        cursor.execute(GET_VERSAO_CATALOGO)
+        # Retorna o número da alteração (muda sempre que o catálogo muda)
+        return cursor.fetchone()[0]
+
+def iterar_produtos_feed(tamanho_lote: int = 1000) -> Iterator[Produto]:
+    # Obtém conexão com o banco de dados, mantida aberta enquanto os produtos são percorridos
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa uma única consulta, que lê um retrato consistente do catálogo
+        cursor.execute(GET_PRODUTOS_FEED)
+        # Busca os resultados em partes, sem carregar o catálogo inteiro em memória
+        while resultados := cursor.fetchmany(tamanho_lote):
+            for resultado in resultados:
+                yield Produto(
+                    id=resultado["id"],
+                    nome=resultado["nome"],
+                    descricao=resultado["descricao"],
+                    preco=resultado["preco"],
+                    estoque=resultado["estoque"],
+                    imagem=resultado["imagem"],
+                    id_categoria=resultado["id_categoria"],
+                    # Cria objeto Categoria associado a cada produto
+                    categoria=Categoria(
+                        id=resultado["id_categoria"],
+                        nome=resultado["nome_categoria"]
+                    )
+                )
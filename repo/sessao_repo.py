@@ -0,0 +1,87 @@
+import json
+from typing import Optional
+from util.database import obter_conexao
+from sql.sessao_sql import *
+from sql.alteracao_sql import *
+from models.sessao import Sessao
+
+def criar_tabela_sessoes() -> bool:
+    try:
+        # Obtém conexão com o banco de dados
+        with obter_conexao() as conexao:
+            # Cria cursor para executar comandos SQL
+            cursor = conexao.cursor()
+            # Executa comandos SQL para criar a tabela de sessões e seus índices
+            cursor.execute(CREATE_TABLE_SESSAO)
+            cursor.execute(CREATE_INDEX_SESSAO_USUARIO)
+            cursor.execute(CREATE_INDEX_SESSAO_EXPIRACAO)
+            # Cria o registro de alterações e os triggers que avisam os outros processos (logout, revogação)
+            cursor.execute(CREATE_TABLE_ALTERACAO)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_PODA)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_SESSAO_UPDATE)
+            cursor.execute(CREATE_TRIGGER_ALTERACAO_SESSAO_DELETE)
+            # Retorna True indicando sucesso
+            return True
+    except Exception as e:
+        # Imprime mensagem de erro caso ocorra exceção
+        print(f"Erro ao criar tabela de sessões: {e}")
+        # Retorna False indicando falha
+        return False
+
+def gravar_sessao(sessao: Sessao) -> None:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Insere a sessão ou substitui os dados e a expiração de uma sessão existente
+        cursor.execute(INSERT_SESSAO,
+            (sessao.id, sessao.id_usuario, json.dumps(sessao.dados, separators=(",", ":")), sessao.expira_em))
+
+def obter_sessao(id: str, agora: float) -> Optional[Sessao]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar a sessão pelo ID, se ainda não expirou
+        cursor.execute(GET_SESSAO_BY_ID, (id, agora))
+        # Obtém primeiro resultado da consulta
+        resultado = cursor.fetchone()
+        # Se não encontrou a sessão (ou ela expirou), retorna None
+        if not resultado:
+            return None
+        # Cria e retorna objeto Sessao com os dados desserializados
+        return Sessao(
+            id=resultado["id"],
+            id_usuario=resultado["id_usuario"],
+            dados=json.loads(resultado["dados"]),
+            expira_em=resultado["expira_em"])
+
+def excluir_sessao(id: str) -> bool:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para deletar a sessão pelo ID
+        cursor.execute(DELETE_SESSAO, (id,))
+        # Retorna True se alguma linha foi afetada
+        return (cursor.rowcount > 0)
+
+def excluir_sessoes_expiradas(agora: float) -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para deletar as sessões vencidas (usa o índice de expiração)
+        cursor.execute(DELETE_SESSOES_EXPIRADAS, (agora,))
+        # Retorna a quantidade de sessões removidas
+        return cursor.rowcount
+
+def excluir_sessoes_usuario_lote(id_usuario: int, tamanho_lote: int) -> int:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Exclui no máximo "tamanho_lote" sessões do usuário em uma transação curta
+        cursor.execute(DELETE_SESSOES_BY_USUARIO_LOTE, (id_usuario, tamanho_lote))
+        # Retorna a quantidade de sessões excluídas (0 quando não restar nenhuma)
+        return cursor.rowcount
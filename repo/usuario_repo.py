@@ -1,10 +1,13 @@
 from datetime import datetime
-import os
 from sqlite3 import Connection, Cursor
 from typing import Optional
-from util.database import obter_conexao
+from util.database import apos_commit, obter_conexao
 from sql.usuario_sql import *
+from sql.sessao_sql import DELETE_SESSOES_BY_USUARIO
+from repo import sessao_repo
+from util import sessao
 from models.usuario import Usuario
+from models.usuario_resumo import UsuarioResumo
 
 def criar_tabela_usuarios() -> bool:
     try:
@@ -14,8 +17,12 @@ def criar_tabela_usuarios() -> bool:
             cursor = conexao.cursor()
             # Executa comando SQL para criar tabela de usuários
             cursor.execute(CREATE_TABLE_USUARIO)
-            # Retorna True indicando sucesso
-            return True
+            cursor.execute(CREATE_INDEX_USUARIO_NOME)
+        # Cria a tabela de sessões, que referencia os usuários e é usada para revogá-las
+        if not sessao_repo.criar_tabela_sessoes():
+            return False
+        # Retorna True indicando sucesso
+        return True
     except Exception as e:
         # Imprime mensagem de erro caso ocorra exceção
         print(f"Erro ao criar tabela de usuários: {e}")
@@ -51,8 +58,15 @@ def atualizar_tipo_usuario(id: int, tipo: int) -> bool:
         cursor = conexao.cursor()
         # Executa comando SQL para atualizar tipo do usuário (0=comum, 1=admin)
         cursor.execute(UPDATE_TIPO_USUARIO, (tipo, id))
-        # Retorna True se alguma linha foi afetada
-        return (cursor.rowcount > 0)
+        alterado = cursor.rowcount > 0
+        # Revoga as sessões do usuário na mesma transação (os triggers avisam os outros processos)
+        if alterado:
+            cursor.execute(DELETE_SESSOES_BY_USUARIO, (id,))
+    # Após o commit, remove as sessões do usuário do cache deste processo
+    if alterado:
+        apos_commit(sessao.revogar_cache_usuario, id)
+    # Retorna True se alguma linha foi afetada
+    return alterado
     
 def atualizar_senha_usuario(id: int, senha_hash: str) -> bool:
     # Obtém conexão com o banco de dados
@@ -61,8 +75,15 @@ def atualizar_senha_usuario(id: int, senha_hash: str) -> bool:
         cursor = conexao.cursor()
         # Executa comando SQL para atualizar senha hash do usuário
         cursor.execute(UPDATE_SENHA_USUARIO, (senha_hash, id))
-        # Retorna True se alguma linha foi afetada
-        return (cursor.rowcount > 0)
+        alterado = cursor.rowcount > 0
+        # Revoga as sessões do usuário na mesma transação (os triggers avisam os outros processos)
+        if alterado:
+            cursor.execute(DELETE_SESSOES_BY_USUARIO, (id,))
+    # Após o commit, remove as sessões do usuário do cache deste processo
+    if alterado:
+        apos_commit(sessao.revogar_cache_usuario, id)
+    # Retorna True se alguma linha foi afetada
+    return alterado
 
 def excluir_usuario(id: int) -> bool:
     # Obtém conexão com o banco de dados
@@ -71,8 +92,12 @@ def excluir_usuario(id: int) -> bool:
         cursor = conexao.cursor()
         # Executa comando SQL para deletar usuário pelo ID
         cursor.execute(DELETE_USUARIO, (id,))
-        # Retorna True se alguma linha foi afetada
-        return (cursor.rowcount > 0)    
+        excluido = cursor.rowcount > 0
+    # Após o commit, remove do cache as sessões do usuário (no banco, foram excluídas em cascata)
+    if excluido:
+        apos_commit(sessao.revogar_cache_usuario, id)
+    # Retorna True se alguma linha foi afetada
+    return excluido
 
 def obter_usuario_por_id(id: int) -> Optional[Usuario]:
     # Obtém conexão com o banco de dados
@@ -148,18 +173,23 @@ def obter_usuarios_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list[U
             data_nascimento=datetime.strptime(resultado["data_nascimento"], "%Y-%m-%d").date(),
             tipo=resultado["tipo"]
         ) for resultado in resultados]
-    
-def inserir_dados_iniciais(conexao: Connection) -> None:
-    # Verifica se já existem usuários na tabela
-    lista = obter_usuarios_por_pagina(1, 5)
-    # Se já houver usuários, não faz nada
-    if lista: 
-        return
-    # Constrói caminho para arquivo SQL com dados iniciais
-    caminho_arquivo_sql = os.path.join(os.path.dirname(__file__), '../data/insert_usuarios.sql')
-    # Abre arquivo SQL para leitura
-    with open(caminho_arquivo_sql, 'r', encoding='utf-8') as arquivo:
-        # Lê conteúdo do arquivo SQL
-        sql_inserts = arquivo.read()
-        # Executa comandos SQL de inserção
-        conexao.execute(sql_inserts)
\ No newline at end of file
+
+def obter_usuarios_resumo_por_pagina(numero_pagina: int, tamanho_pagina: int) -> list[UsuarioResumo]:
+    # Obtém conexão com o banco de dados
+    with obter_conexao() as conexao:
+        # Calcula offset baseado no número da página
+        offset = (numero_pagina - 1) * tamanho_pagina
+        # Cria cursor para executar comandos SQL
+        cursor = conexao.cursor()
+        # Executa comando SQL para buscar os usuários da página com a data já formatada pelo banco
+        cursor.execute(GET_USUARIOS_RESUMO_BY_PAGE, (tamanho_pagina, offset))
+        # Cria lista de resumos a partir dos resultados (sem converter datas)
+        return [UsuarioResumo(
+            id=resultado["id"],
+            nome=resultado["nome"],
+            cpf=resultado["cpf"],
+            telefone=resultado["telefone"],
+            email=resultado["email"],
+            data_nascimento=resultado["data_nascimento"],
+            tipo=resultado["tipo"]
+        ) for resultado in cursor.fetchall()]
@@ -0,0 +1,35 @@
+import argparse
+import importlib.util
+import os
+
+# Inicia a aplicação em produção com vários processos (workers) do uvicorn.
+# Cada worker tem seus próprios caches em memória, mantidos coerentes pelo registro de
+# alterações do banco (ver util/sincronizacao.py), sem depender de um serviço externo.
+# Uso: python servidor.py --workers 4 --porta 8000
+
+def modulo_disponivel(nome: str) -> bool:
+    # Verifica se um pacote opcional está instalado sem importá-lo
+    return importlib.util.find_spec(nome) is not None
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor de produção da Loja Virtual")
+    parser.add_argument("--host", default="0.0.0.0", help="endereço de escuta")
+    parser.add_argument("--porta", type=int, default=8000, help="porta de escuta")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="quantidade de processos")
+    parser.add_argument("--encerramento", type=int, default=30,
+                        help="segundos aguardados para concluir as requisições em andamento ao encerrar")
+    parser.add_argument("--backlog", type=int, default=2048, help="tamanho da fila de conexões do socket")
+    args = parser.parse_args(argv)
+    # Cria/atualiza o schema uma única vez, antes de iniciar os workers (no worker, só confere a versão)
+    from util import initializer
+    initializer.inicializar_banco()
+    # Usa uvloop e httptools quando instalados (uvicorn[standard]); senão, as implementações padrão
+    loop = "uvloop" if modulo_disponivel("uvloop") else "asyncio"
+    http = "httptools" if modulo_disponivel("httptools") else "h11"
+    import uvicorn
+    # SIGTERM/SIGINT param de aceitar conexões e aguardam as requisições em andamento até o limite
+    uvicorn.run("main:app", host=args.host, port=args.porta, workers=args.workers, loop=loop, http=http,
+                backlog=args.backlog, timeout_graceful_shutdown=args.encerramento, proxy_headers=True)
+
+if __name__ == "__main__":
+    main()
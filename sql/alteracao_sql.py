@@ -0,0 +1,112 @@
+# Registro de alterações do catálogo, alimentado por triggers.
+# Cada processo (worker) lê as linhas novas para invalidar seus caches em memória.
+CREATE_TABLE_ALTERACAO = """
+CREATE TABLE IF NOT EXISTS Alteracao (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    escopo TEXT NOT NULL,
+    chave INTEGER);
+"""
+
+# Mantém apenas as 10.000 alterações mais recentes, podando a cada 1.000 inserções
+CREATE_TRIGGER_ALTERACAO_PODA = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_poda
+AFTER INSERT ON Alteracao
+WHEN NEW.seq % 1000 = 0
+BEGIN
+    DELETE FROM Alteracao
+    WHERE seq <= NEW.seq - 10000;
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_PRODUTO_INSERT = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_produto_insert
+AFTER INSERT ON Produto
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('produto', NEW.id);
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_PRODUTO_UPDATE = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_produto_update
+AFTER UPDATE ON Produto
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('produto', NEW.id);
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_PRODUTO_DELETE = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_produto_delete
+AFTER DELETE ON Produto
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('produto', OLD.id);
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_CATEGORIA_INSERT = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_categoria_insert
+AFTER INSERT ON Categoria
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('categoria', NEW.id);
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_CATEGORIA_UPDATE = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_categoria_update
+AFTER UPDATE ON Categoria
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('categoria', NEW.id);
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_CATEGORIA_DELETE = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_categoria_delete
+AFTER DELETE ON Categoria
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('categoria', OLD.id);
+END;
+"""
+
+# Sessões alteradas ou removidas (logout, revogação) saem do cache dos outros processos.
+# Renovações (só a expiração muda) e remoções de sessões já vencidas não precisam ser avisadas.
+CREATE_TRIGGER_ALTERACAO_SESSAO_UPDATE = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_sessao_update
+AFTER UPDATE OF id_usuario, dados ON Sessao
+WHEN OLD.dados IS NOT NEW.dados OR OLD.id_usuario IS NOT NEW.id_usuario
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('sessao', OLD.id_usuario);
+END;
+"""
+
+CREATE_TRIGGER_ALTERACAO_SESSAO_DELETE = """
+CREATE TRIGGER IF NOT EXISTS trg_alteracao_sessao_delete
+AFTER DELETE ON Sessao
+WHEN OLD.expira_em > (julianday('now') - 2440587.5) * 86400.0
+BEGIN
+    INSERT INTO Alteracao (escopo, chave) VALUES ('sessao', OLD.id_usuario);
+END;
+"""
+
+# Alteração que invalida todos os caches (ex.: cargas em lote feitas com os triggers desligados)
+INSERT_ALTERACAO = """
+INSERT INTO Alteracao (escopo, chave)
+VALUES (?, ?);
+"""
+
+GET_ALTERACOES_APOS = """
+SELECT seq, escopo, chave
+FROM Alteracao
+WHERE seq > ?
+ORDER BY seq ASC;
+"""
+
+GET_ULTIMA_ALTERACAO = """
+SELECT COALESCE(MAX(seq), 0)
+FROM Alteracao;
+"""
+
+# Versão do catálogo: última alteração de produtos ou categorias (as de sessões não mudam o catálogo)
+GET_VERSAO_CATALOGO = """
+SELECT COALESCE(MAX(seq), 0)
+FROM Alteracao
+WHERE escopo IN ('produto', 'categoria', 'tudo');
+"""
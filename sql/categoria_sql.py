@@ -31,4 +31,135 @@ SELECT id, nome
 FROM Categoria
 ORDER BY nome ASC
 LIMIT ? OFFSET ?;
-"""
\ No newline at end of file
+"""
+
+# Agregados do catálogo por categoria (contagens, faixa de preço, valor em estoque).
+# São mantidos incrementalmente pelos triggers abaixo, evitando GROUP BY sobre Produto a cada leitura.
+CREATE_TABLE_CATEGORIA_AGREGADO = """
+CREATE TABLE IF NOT EXISTS CategoriaAgregado (
+    id_categoria INTEGER PRIMARY KEY,
+    quantidade_produtos INTEGER NOT NULL DEFAULT 0,
+    quantidade_em_estoque INTEGER NOT NULL DEFAULT 0,
+    soma_precos REAL NOT NULL DEFAULT 0,
+    preco_minimo REAL,
+    preco_maximo REAL,
+    valor_estoque REAL NOT NULL DEFAULT 0,
+    FOREIGN KEY (id_categoria) REFERENCES Categoria(id) ON DELETE CASCADE);
+"""
+
+CREATE_TRIGGER_CATEGORIA_AGREGADO_INSERT = """
+CREATE TRIGGER IF NOT EXISTS trg_categoria_agregado_insert
+AFTER INSERT ON Categoria
+BEGIN
+    INSERT OR IGNORE INTO CategoriaAgregado (id_categoria) VALUES (NEW.id);
+END;
+"""
+
+# Soma o produto NEW aos agregados da sua categoria
+SOMAR_PRODUTO_AGREGADO = """
+    UPDATE CategoriaAgregado
+    SET quantidade_produtos = quantidade_produtos + 1,
+        quantidade_em_estoque = quantidade_em_estoque + (NEW.estoque > 0),
+        soma_precos = soma_precos + NEW.preco,
+        preco_minimo = CASE WHEN preco_minimo IS NULL OR NEW.preco < preco_minimo THEN NEW.preco ELSE preco_minimo END,
+        preco_maximo = CASE WHEN preco_maximo IS NULL OR NEW.preco > preco_maximo THEN NEW.preco ELSE preco_maximo END,
+        valor_estoque = valor_estoque + NEW.preco * NEW.estoque
+    WHERE id_categoria = NEW.id_categoria;"""
+
+# Subtrai o produto OLD dos agregados da sua categoria. Mínimo e máximo só são recalculados
+# quando o preço removido era o extremo (busca única no índice de Produto por categoria e preço);
+# com a categoria vazia, as somas voltam a zero exato, sem resíduo de ponto flutuante.
+SUBTRAIR_PRODUTO_AGREGADO = """
+    UPDATE CategoriaAgregado
+    SET quantidade_produtos = quantidade_produtos - 1,
+        quantidade_em_estoque = quantidade_em_estoque - (OLD.estoque > 0),
+        soma_precos = CASE WHEN quantidade_produtos <= 1 THEN 0 ELSE soma_precos - OLD.preco END,
+        preco_minimo = CASE WHEN OLD.preco <= preco_minimo
+            THEN (SELECT MIN(preco) FROM Produto WHERE id_categoria = OLD.id_categoria)
+            ELSE preco_minimo END,
+        preco_maximo = CASE WHEN OLD.preco >= preco_maximo
+            THEN (SELECT MAX(preco) FROM Produto WHERE id_categoria = OLD.id_categoria)
+            ELSE preco_maximo END,
+        valor_estoque = CASE WHEN quantidade_produtos <= 1 THEN 0 ELSE valor_estoque - OLD.preco * OLD.estoque END
+    WHERE id_categoria = OLD.id_categoria;"""
+
+CREATE_TRIGGER_PRODUTO_AGREGADO_INSERT = f"""
+CREATE TRIGGER IF NOT EXISTS trg_produto_agregado_insert
+AFTER INSERT ON Produto
+BEGIN{SOMAR_PRODUTO_AGREGADO}
+END;
+"""
+
+# Mudança de preço ou de categoria: retira o valor antigo e soma o novo
+CREATE_TRIGGER_PRODUTO_AGREGADO_UPDATE = f"""
+CREATE TRIGGER IF NOT EXISTS trg_produto_agregado_update
+AFTER UPDATE OF preco, estoque, id_categoria ON Produto
+WHEN OLD.preco IS NOT NEW.preco OR OLD.id_categoria IS NOT NEW.id_categoria
+BEGIN{SUBTRAIR_PRODUTO_AGREGADO}{SOMAR_PRODUTO_AGREGADO}
+END;
+"""
+
+# Alterações apenas de estoque (reservas de pedidos) são as mais frequentes: ajusta só as colunas afetadas
+CREATE_TRIGGER_PRODUTO_AGREGADO_ESTOQUE = """
+CREATE TRIGGER IF NOT EXISTS trg_produto_agregado_estoque
+AFTER UPDATE OF estoque ON Produto
+WHEN OLD.preco IS NEW.preco AND OLD.id_categoria IS NEW.id_categoria AND OLD.estoque IS NOT NEW.estoque
+BEGIN
+    UPDATE CategoriaAgregado
+    SET quantidade_em_estoque = quantidade_em_estoque + (NEW.estoque > 0) - (OLD.estoque > 0),
+        valor_estoque = valor_estoque + NEW.preco * (NEW.estoque - OLD.estoque)
+    WHERE id_categoria = NEW.id_categoria;
+END;
+"""
+
+CREATE_TRIGGER_PRODUTO_AGREGADO_DELETE = f"""
+CREATE TRIGGER IF NOT EXISTS trg_produto_agregado_delete
+AFTER DELETE ON Produto
+BEGIN{SUBTRAIR_PRODUTO_AGREGADO}
+END;
+"""
+
+SELECT_CATEGORIA_AGREGADO_COMPLETO = """
+SELECT c.id, COUNT(p.id), COALESCE(SUM(p.estoque > 0), 0), COALESCE(SUM(p.preco), 0),
+    MIN(p.preco), MAX(p.preco), COALESCE(SUM(p.preco * p.estoque), 0)
+FROM Categoria c
+LEFT JOIN Produto p ON p.id_categoria = c.id"""
+
+# Preenche os agregados apenas quando a tabela ainda está vazia (bancos criados antes dela existir)
+POPULAR_CATEGORIA_AGREGADO_SE_VAZIA = f"""
+INSERT INTO CategoriaAgregado (id_categoria, quantidade_produtos, quantidade_em_estoque, soma_precos, preco_minimo, preco_maximo, valor_estoque)
+{SELECT_CATEGORIA_AGREGADO_COMPLETO}
+WHERE NOT EXISTS (SELECT 1 FROM CategoriaAgregado)
+GROUP BY c.id;
+"""
+
+DELETE_CATEGORIA_AGREGADO = """
+DELETE FROM CategoriaAgregado;
+"""
+
+POPULAR_CATEGORIA_AGREGADO = f"""
+INSERT INTO CategoriaAgregado (id_categoria, quantidade_produtos, quantidade_em_estoque, soma_precos, preco_minimo, preco_maximo, valor_estoque)
+{SELECT_CATEGORIA_AGREGADO_COMPLETO}
+GROUP BY c.id;
+"""
+
+SELECT_CATEGORIA_COM_AGREGADO = """
+SELECT c.id, c.nome,
+    COALESCE(a.quantidade_produtos, 0) AS quantidade_produtos,
+    COALESCE(a.quantidade_em_estoque, 0) AS quantidade_em_estoque,
+    a.preco_minimo, a.preco_maximo,
+    CASE WHEN a.quantidade_produtos > 0 THEN a.soma_precos / a.quantidade_produtos END AS preco_medio,
+    COALESCE(a.valor_estoque, 0) AS valor_estoque
+FROM Categoria c
+LEFT JOIN CategoriaAgregado a ON a.id_categoria = c.id"""
+
+GET_CATEGORIA_AGREGADO_BY_ID = f"""
+{SELECT_CATEGORIA_COM_AGREGADO}
+WHERE c.id = ?;
+"""
+
+GET_CATEGORIAS_AGREGADOS_BY_PAGE = f"""
+{SELECT_CATEGORIA_COM_AGREGADO}
+ORDER BY c.nome ASC
+LIMIT ? OFFSET ?;
+"""
@@ -13,6 +13,12 @@ CREATE TABLE IF NOT EXISTS Endereco (
 );
 """
 
+# Índice por usuário: listagem dos endereços e exclusão em lotes (e em cascata) ao excluir o usuário
+CREATE_INDEX_ENDERECO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_endereco_usuario
+ON Endereco (id_usuario);
+"""
+
 INSERT_ENDERECO = """
 INSERT INTO Endereco (logradouro, numero, complemento, bairro, cidade, estado, cep, id_usuario)
 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -39,4 +45,9 @@ GET_ENDERECOS_BY_ID_USUARIO = """
 SELECT id, logradouro, numero, complemento, bairro, cidade, estado, cep, id_usuario
 FROM Endereco
 WHERE id_usuario = ?
-"""
\ No newline at end of file
+"""
+
+DELETE_ENDERECOS_BY_USUARIO_LOTE = """
+DELETE FROM Endereco
+WHERE id IN (SELECT id FROM Endereco WHERE id_usuario = ? LIMIT ?);
+"""
@@ -0,0 +1,96 @@
+CREATE_TABLE_PEDIDO = """
+CREATE TABLE IF NOT EXISTS Pedido (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_usuario INTEGER NOT NULL,
+    data_hora TEXT NOT NULL,
+    valor_total REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'realizado',
+    FOREIGN KEY (id_usuario) REFERENCES Usuario(id)
+);
+"""
+
+CREATE_INDEX_PEDIDO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_pedido_usuario
+ON Pedido (id_usuario, id);
+"""
+
+# Os itens guardam nome e preço do produto no momento da compra.
+# Se o produto for excluído, o item continua existindo com id_produto nulo.
+CREATE_TABLE_ITEM_PEDIDO = """
+CREATE TABLE IF NOT EXISTS ItemPedido (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_pedido INTEGER NOT NULL,
+    id_produto INTEGER,
+    nome_produto TEXT NOT NULL,
+    preco_unitario REAL NOT NULL,
+    quantidade INTEGER NOT NULL,
+    FOREIGN KEY (id_pedido) REFERENCES Pedido(id) ON DELETE CASCADE,
+    FOREIGN KEY (id_produto) REFERENCES Produto(id) ON DELETE SET NULL
+);
+"""
+
+CREATE_INDEX_ITEM_PEDIDO_PEDIDO = """
+CREATE INDEX IF NOT EXISTS idx_item_pedido_pedido
+ON ItemPedido (id_pedido);
+"""
+
+CREATE_INDEX_ITEM_PEDIDO_PRODUTO = """
+CREATE INDEX IF NOT EXISTS idx_item_pedido_produto
+ON ItemPedido (id_produto);
+"""
+
+INSERT_PEDIDO = """
+INSERT INTO Pedido (id_usuario, data_hora, valor_total)
+VALUES (?, ?, 0);
+"""
+
+# Copia nome e preço atuais do produto para o item, sem precisar lê-los antes
+INSERT_ITEM_PEDIDO = """
+INSERT INTO ItemPedido (id_pedido, id_produto, nome_produto, preco_unitario, quantidade)
+SELECT ?, id, nome, preco, ?
+FROM Produto
+WHERE id = ?;
+"""
+
+UPDATE_VALOR_TOTAL_PEDIDO = """
+UPDATE Pedido
+SET valor_total = (
+    SELECT COALESCE(SUM(preco_unitario * quantidade), 0)
+    FROM ItemPedido
+    WHERE id_pedido = Pedido.id)
+WHERE id = ?;
+"""
+
+UPDATE_STATUS_PEDIDO = """
+UPDATE Pedido
+SET status = ?
+WHERE id = ? AND status = ?;
+"""
+
+GET_PEDIDO_BY_ID = """
+SELECT id, id_usuario, data_hora, valor_total, status
+FROM Pedido
+WHERE id = ?;
+"""
+
+GET_PEDIDOS_BY_USUARIO = """
+SELECT id, id_usuario, data_hora, valor_total, status
+FROM Pedido
+WHERE id_usuario = ?
+ORDER BY id DESC
+LIMIT ? OFFSET ?;
+"""
+
+GET_ITENS_BY_PEDIDO = """
+SELECT id, id_pedido, id_produto, nome_produto, preco_unitario, quantidade
+FROM ItemPedido
+WHERE id_pedido = ?
+ORDER BY id ASC;
+"""
+
+EXISTE_PEDIDO_BY_USUARIO = """
+SELECT 1
+FROM Pedido
+WHERE id_usuario = ?
+LIMIT 1;
+"""
@@ -11,6 +11,12 @@ CREATE TABLE IF NOT EXISTS Produto (
 );
 """
 
+# Índice por categoria e preço: resolve o mínimo/máximo de uma categoria com uma única busca
+CREATE_INDEX_PRODUTO_CATEGORIA_PRECO = """
+CREATE INDEX IF NOT EXISTS idx_produto_categoria_preco
+ON Produto (id_categoria, preco);
+"""
+
 INSERT_PRODUTO = """
 INSERT INTO Produto (nome, descricao, preco, estoque, imagem, id_categoria) 
 VALUES (?, ?, ?, ?, ?, ?);
@@ -28,32 +34,236 @@ WHERE id = ?;
 """
 
 GET_PRODUTO_BY_ID = """
-SELECT 
-    p.id, 
-    p.nome, 
-    p.descricao, 
-    p.preco, 
-    p.estoque, 
-    p.imagem, 
-    p.id_categoria, 
-    c.nome AS nome_categoria
-FROM Produto p
-INNER JOIN Categoria c ON p.id_categoria = c.id
-WHERE p.id = ?;
+SELECT id, nome, descricao, preco, estoque, imagem, id_categoria, nome_categoria
+FROM ProdutoListagem
+WHERE id = ?;
 """
 
 GET_PRODUTOS_BY_PAGE = """
-SELECT 
-    p.id, 
-    p.nome, 
-    p.descricao, 
-    p.preco, 
-    p.estoque, 
-    p.imagem, 
-    p.id_categoria, 
-    c.nome AS nome_categoria
+SELECT id, nome, descricao, preco, estoque, imagem, id_categoria, nome_categoria
+FROM ProdutoListagem
+ORDER BY nome ASC
+LIMIT ? OFFSET ?;
+"""
+
+# Projeção das listagens (cards e tabelas): apenas as colunas exibidas, com a descrição já resumida
+GET_PRODUTOS_RESUMO_BY_PAGE = """
+SELECT id, nome, descricao_resumida, preco, estoque, imagem
+FROM ProdutoListagem
+ORDER BY nome ASC
+LIMIT ? OFFSET ?;
+"""
+
+# Tabela de leitura desnormalizada usada nas listagens de produtos.
+# É mantida pelos triggers abaixo, evitando o JOIN com Categoria a cada leitura.
+CREATE_TABLE_PRODUTO_LISTAGEM = """
+CREATE TABLE IF NOT EXISTS ProdutoListagem (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    descricao TEXT NOT NULL,
+    descricao_resumida TEXT NOT NULL,
+    preco REAL NOT NULL,
+    estoque INTEGER NOT NULL,
+    em_estoque INTEGER NOT NULL,
+    imagem TEXT NOT NULL,
+    id_categoria INTEGER NOT NULL,
+    nome_categoria TEXT NOT NULL);
+"""
+
+CREATE_INDEX_PRODUTO_LISTAGEM_NOME = """
+CREATE INDEX IF NOT EXISTS idx_produto_listagem_nome
+ON ProdutoListagem (nome);
+"""
+
+CREATE_INDEX_PRODUTO_LISTAGEM_CATEGORIA = """
+CREATE INDEX IF NOT EXISTS idx_produto_listagem_categoria
+ON ProdutoListagem (id_categoria);
+"""
+
+# Expressão que gera a descrição resumida exibida nos cards das listagens
+RESUMO_DESCRICAO = """
+CASE WHEN length({coluna}) > 120
+    THEN rtrim(substr({coluna}, 1, 117)) || '...'
+    ELSE {coluna}
+END"""
+
+CREATE_TRIGGER_PRODUTO_LISTAGEM_INSERT = f"""
+CREATE TRIGGER IF NOT EXISTS trg_produto_listagem_insert
+AFTER INSERT ON Produto
+BEGIN
+    INSERT INTO ProdutoListagem (id, nome, descricao, descricao_resumida, preco, estoque, em_estoque, imagem, id_categoria, nome_categoria)
+    SELECT NEW.id, NEW.nome, NEW.descricao, {RESUMO_DESCRICAO.format(coluna="NEW.descricao")},
+        NEW.preco, NEW.estoque, NEW.estoque > 0, NEW.imagem, NEW.id_categoria, c.nome
+    FROM Categoria c
+    WHERE c.id = NEW.id_categoria;
+END;
+"""
+
+CREATE_TRIGGER_PRODUTO_LISTAGEM_UPDATE = f"""
+CREATE TRIGGER IF NOT EXISTS trg_produto_listagem_update
+AFTER UPDATE OF id, nome, descricao, preco, imagem, id_categoria ON Produto
+BEGIN
+    DELETE FROM ProdutoListagem
+    WHERE id = OLD.id AND OLD.id <> NEW.id;
+    INSERT OR REPLACE INTO ProdutoListagem (id, nome, descricao, descricao_resumida, preco, estoque, em_estoque, imagem, id_categoria, nome_categoria)
+    SELECT NEW.id, NEW.nome, NEW.descricao, {RESUMO_DESCRICAO.format(coluna="NEW.descricao")},
+        NEW.preco, NEW.estoque, NEW.estoque > 0, NEW.imagem, NEW.id_categoria, c.nome
+    FROM Categoria c
+    WHERE c.id = NEW.id_categoria;
+END;
+"""
+
+# Alterações apenas de estoque são as mais frequentes, então atualizam só as colunas afetadas
+CREATE_TRIGGER_PRODUTO_LISTAGEM_ESTOQUE = """
+CREATE TRIGGER IF NOT EXISTS trg_produto_listagem_estoque
+AFTER UPDATE OF estoque ON Produto
+BEGIN
+    UPDATE ProdutoListagem
+    SET estoque = NEW.estoque, em_estoque = NEW.estoque > 0
+    WHERE id = NEW.id;
+END;
+"""
+
+CREATE_TRIGGER_PRODUTO_LISTAGEM_DELETE = """
+CREATE TRIGGER IF NOT EXISTS trg_produto_listagem_delete
+AFTER DELETE ON Produto
+BEGIN
+    DELETE FROM ProdutoListagem
+    WHERE id = OLD.id;
+END;
+"""
+
+CREATE_TRIGGER_CATEGORIA_LISTAGEM_UPDATE = """
+CREATE TRIGGER IF NOT EXISTS trg_categoria_listagem_update
+AFTER UPDATE OF nome ON Categoria
+BEGIN
+    UPDATE ProdutoListagem
+    SET nome_categoria = NEW.nome
+    WHERE id_categoria = NEW.id;
+END;
+"""
+
+SELECT_PRODUTO_LISTAGEM_COMPLETA = f"""
+SELECT p.id, p.nome, p.descricao, {RESUMO_DESCRICAO.format(coluna="p.descricao")},
+    p.preco, p.estoque, p.estoque > 0, p.imagem, p.id_categoria, c.nome
 FROM Produto p
-INNER JOIN Categoria c ON p.id_categoria = c.id
-ORDER BY p.nome ASC
+INNER JOIN Categoria c ON p.id_categoria = c.id"""
+
+# Preenche a tabela de listagem apenas quando ela ainda está vazia (bancos criados antes dela existir)
+POPULAR_PRODUTO_LISTAGEM_SE_VAZIA = f"""
+INSERT INTO ProdutoListagem (id, nome, descricao, descricao_resumida, preco, estoque, em_estoque, imagem, id_categoria, nome_categoria)
+{SELECT_PRODUTO_LISTAGEM_COMPLETA}
+WHERE NOT EXISTS (SELECT 1 FROM ProdutoListagem);
+"""
+
+DELETE_PRODUTO_LISTAGEM = """
+DELETE FROM ProdutoListagem;
+"""
+
+POPULAR_PRODUTO_LISTAGEM = f"""
+INSERT INTO ProdutoListagem (id, nome, descricao, descricao_resumida, preco, estoque, em_estoque, imagem, id_categoria, nome_categoria)
+{SELECT_PRODUTO_LISTAGEM_COMPLETA};
+"""
+
+GET_IDS_PRODUTOS_BY_PAGE = """
+SELECT id
+FROM ProdutoListagem
+ORDER BY nome ASC
 LIMIT ? OFFSET ?;
-"""
\ No newline at end of file
+"""
+
+GET_PRODUTOS_BY_IDS = """
+SELECT id, nome, descricao, preco, estoque, imagem, id_categoria, nome_categoria
+FROM ProdutoListagem
+WHERE id IN ({marcadores});
+"""
+
+# Nomes usados pelo índice de autocompletar em memória
+GET_NOMES_PRODUTOS = """
+SELECT id, nome
+FROM Produto;
+"""
+
+GET_NOMES_PRODUTOS_BY_IDS = """
+SELECT id, nome
+FROM Produto
+WHERE id IN ({marcadores});
+"""
+
+# Atualização parcial de preço e/ou estoque (None mantém o valor atual); linhas sem mudança não são escritas
+UPDATE_PRECO_ESTOQUE_PRODUTO = """
+UPDATE Produto
+SET preco = COALESCE(:preco, preco), estoque = COALESCE(:estoque, estoque)
+WHERE id = :id AND (preco IS NOT COALESCE(:preco, preco) OR estoque IS NOT COALESCE(:estoque, estoque));
+"""
+
+GET_IDS_PRODUTOS_EXISTENTES = """
+SELECT id
+FROM Produto
+WHERE id IN ({marcadores});
+"""
+
+# Reserva condicional: só decrementa se houver estoque suficiente, em um único comando atômico
+RESERVAR_ESTOQUE = """
+UPDATE Produto
+SET estoque = estoque - ?
+WHERE id = ? AND estoque >= ?;
+"""
+
+LIBERAR_ESTOQUE = """
+UPDATE Produto
+SET estoque = estoque + ?
+WHERE id = ?;
+"""
+
+# Contadores de visualizações por produto, gravados em lote pelo util/visualizacoes (nunca a cada acesso).
+# Ficam fora de Produto para que os incrementos não disparem os triggers de listagem, agregados e alterações.
+CREATE_TABLE_PRODUTO_ESTATISTICA = """
+CREATE TABLE IF NOT EXISTS ProdutoEstatistica (
+    id_produto INTEGER PRIMARY KEY,
+    visualizacoes INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (id_produto) REFERENCES Produto(id) ON DELETE CASCADE);
+"""
+
+# Índice por visualizações: o ranking dos mais vistos lê apenas as primeiras entradas
+CREATE_INDEX_PRODUTO_ESTATISTICA_VISUALIZACOES = """
+CREATE INDEX IF NOT EXISTS idx_produto_estatistica_visualizacoes
+ON ProdutoEstatistica (visualizacoes);
+"""
+
+# Soma as visualizações acumuladas em memória (ignora produtos excluídos enquanto aguardavam a gravação)
+UPSERT_VISUALIZACOES_PRODUTO = """
+INSERT INTO ProdutoEstatistica (id_produto, visualizacoes)
+SELECT id, :quantidade FROM Produto WHERE id = :id
+ON CONFLICT (id_produto) DO UPDATE SET visualizacoes = visualizacoes + excluded.visualizacoes;
+"""
+
+GET_PRODUTOS_MAIS_VISTOS = """
+SELECT l.id, l.nome, l.descricao_resumida, l.preco, l.estoque, l.imagem
+FROM ProdutoEstatistica e
+INNER JOIN ProdutoListagem l ON l.id = e.id_produto
+ORDER BY e.visualizacoes DESC
+LIMIT ?;
+"""
+
+# Lotes da exclusão/remanejamento de uma categoria: cada comando trata no máximo "limite" produtos
+# e retorna os IDs afetados (para invalidar o cache), mantendo as transações curtas
+DELETE_PRODUTOS_BY_CATEGORIA_LOTE = """
+DELETE FROM Produto
+WHERE id IN (SELECT id FROM Produto WHERE id_categoria = ? LIMIT ?)
+RETURNING id;
+"""
+
+UPDATE_CATEGORIA_PRODUTOS_LOTE = """
+UPDATE Produto
+SET id_categoria = ?
+WHERE id IN (SELECT id FROM Produto WHERE id_categoria = ? LIMIT ?)
+RETURNING id;
+"""
+
+# Todos os produtos em ordem de ID para o sitemap e o feed, lidos em partes pelo cursor
+GET_PRODUTOS_FEED = """
+SELECT id, nome, descricao, preco, estoque, imagem, id_categoria, nome_categoria
+FROM ProdutoListagem
+ORDER BY id;
+"""
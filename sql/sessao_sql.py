@@ -0,0 +1,54 @@
+# Sessões mantidas no servidor; o cookie carrega apenas um identificador opaco,
+# e o banco guarda o hash SHA256 desse identificador (não o próprio valor do cookie).
+CREATE_TABLE_SESSAO = """
+CREATE TABLE IF NOT EXISTS Sessao (
+    id TEXT PRIMARY KEY,
+    id_usuario INTEGER,
+    dados TEXT NOT NULL,
+    expira_em REAL NOT NULL,
+    FOREIGN KEY (id_usuario) REFERENCES Usuario(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+CREATE_INDEX_SESSAO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_sessao_usuario
+ON Sessao (id_usuario);
+"""
+
+CREATE_INDEX_SESSAO_EXPIRACAO = """
+CREATE INDEX IF NOT EXISTS idx_sessao_expiracao
+ON Sessao (expira_em);
+"""
+
+INSERT_SESSAO = """
+INSERT INTO Sessao (id, id_usuario, dados, expira_em)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE
+SET id_usuario = excluded.id_usuario, dados = excluded.dados, expira_em = excluded.expira_em;
+"""
+
+GET_SESSAO_BY_ID = """
+SELECT id, id_usuario, dados, expira_em
+FROM Sessao
+WHERE id = ? AND expira_em > ?;
+"""
+
+DELETE_SESSAO = """
+DELETE FROM Sessao
+WHERE id = ?;
+"""
+
+DELETE_SESSOES_BY_USUARIO = """
+DELETE FROM Sessao
+WHERE id_usuario = ?;
+"""
+
+DELETE_SESSOES_EXPIRADAS = """
+DELETE FROM Sessao
+WHERE expira_em <= ?;
+"""
+
+DELETE_SESSOES_BY_USUARIO_LOTE = """
+DELETE FROM Sessao
+WHERE id IN (SELECT id FROM Sessao WHERE id_usuario = ? LIMIT ?);
+"""
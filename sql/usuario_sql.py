@@ -10,6 +10,12 @@ CREATE TABLE IF NOT EXISTS Usuario (
     tipo INTEGER NOT NULL DEFAULT 0);
 """
 
+# Índice por nome: as listagens percorrem o índice em vez de ordenar a tabela inteira a cada página
+CREATE_INDEX_USUARIO_NOME = """
+CREATE INDEX IF NOT EXISTS idx_usuario_nome
+ON Usuario (nome);
+"""
+
 INSERT_USUARIO = """
 INSERT INTO Usuario (nome, cpf, telefone, email, data_nascimento, senha_hash)
 VALUES (?, ?, ?, ?, ?, ?);
@@ -55,4 +61,16 @@ SELECT id, nome, cpf, telefone, email, data_nascimento, tipo
 FROM Usuario
 ORDER BY nome ASC
 LIMIT ? OFFSET ?;
+"""
+
+# Projeção da listagem de usuários: sem a senha e com a data já formatada para exibição (dd/mm/aaaa).
+# A formatação fica fora da subconsulta para ser calculada apenas nas linhas da página.
+GET_USUARIOS_RESUMO_BY_PAGE = """
+SELECT id, nome, cpf, telefone, email, strftime('%d/%m/%Y', data_nascimento) AS data_nascimento, tipo
+FROM (
+    SELECT id, nome, cpf, telefone, email, data_nascimento, tipo
+    FROM Usuario
+    ORDER BY nome ASC
+    LIMIT ? OFFSET ?)
+ORDER BY nome ASC;
 """
\ No newline at end of file
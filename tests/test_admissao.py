@@ -0,0 +1,97 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from util import admissao
+
+def criar_app(liberar: asyncio.Event) -> FastAPI:
+    # Cria uma aplicação cuja rota do catálogo fica ocupada até o evento ser liberado
+    app = FastAPI()
+    @app.get("/produtos")
+    async def produtos():
+        await liberar.wait()
+        return {"ok": True}
+    app.add_middleware(admissao.MiddlewareAdmissao)
+    return app
+
+@pytest.fixture
+def orcamento_catalogo(monkeypatch):
+    # Substitui o orçamento do catálogo por um com uma vaga, para facilitar a saturação
+    def configurar(simultaneas: int, fila: int) -> admissao.Orcamento:
+        orcamento = admissao.Orcamento(simultaneas, fila)
+        monkeypatch.setitem(admissao.ORCAMENTOS, "catalogo", orcamento)
+        return orcamento
+    return configurar
+
+async def requisitar_concorrente(app: FastAPI, liberar: asyncio.Event, atraso: float = 0.05) -> tuple:
+    # Faz duas requisições simultâneas e libera a rota depois do atraso indicado
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://loja") as cliente:
+        primeira = asyncio.create_task(cliente.get("/produtos"))
+        await asyncio.sleep(0.01)
+        segunda = asyncio.create_task(cliente.get("/produtos"))
+        await asyncio.sleep(atraso)
+        liberar.set()
+        return await primeira, await segunda
+
+class TestAdmissao:
+    def test_classificar(self):
+        # Act / Assert: verifica a classe de algumas rotas
+        assert admissao.classificar("GET", "/") == "catalogo", "A página inicial é do catálogo"
+        assert admissao.classificar("GET", "/api/produtos/1") == "catalogo", "A API de produtos é do catálogo"
+        assert admissao.classificar("POST", "/login") == "auth", "O login é de autenticação"
+        assert admissao.classificar("POST", "/categorias/alterar/1") == "admin", "Alterar categoria é administração"
+        assert admissao.classificar("POST", "/pedidos") == "geral", "Pedidos ficam na classe geral"
+        assert admissao.classificar("GET", "/metrics") is None, "As métricas não têm limite"
+
+    def test_caminho_da_rota_sem_prefixo_da_loja(self):
+        # Act
+        com_prefixo = admissao.caminho_da_rota({"path": "/casa/login", "root_path": "/casa"})
+        so_prefixo = admissao.caminho_da_rota({"path": "/casa", "root_path": "/casa"})
+        mesmo_inicio = admissao.caminho_da_rota({"path": "/casados", "root_path": "/casa"})
+        sem_prefixo = admissao.caminho_da_rota({"path": "/login", "root_path": ""})
+        # Assert
+        assert com_prefixo == "/login", "O prefixo da loja deveria ser removido do caminho"
+        assert so_prefixo == "/", "Só o prefixo deveria ser a página inicial da loja"
+        assert mesmo_inicio == "/casados", "Caminhos que só começam com o mesmo texto deveriam ficar inteiros"
+        assert sem_prefixo == "/login", "Sem root_path, o caminho deveria ficar inteiro"
+
+    def test_fila_cheia_rejeita_com_503(self, orcamento_catalogo):
+        # Arrange: uma vaga e nenhuma posição na fila
+        orcamento = orcamento_catalogo(1, 0)
+        async def cenario():
+            liberar = asyncio.Event()
+            return await requisitar_concorrente(criar_app(liberar), liberar)
+        # Act: faz duas requisições simultâneas
+        primeira, segunda = asyncio.run(cenario())
+        # Assert: a segunda é rejeitada na hora com Retry-After
+        assert primeira.status_code == 200, "A primeira requisição deveria ser atendida"
+        assert segunda.status_code == 503, "A segunda requisição deveria ser rejeitada"
+        assert segunda.headers["retry-after"] == admissao.RETRY_AFTER, "A resposta deveria ter Retry-After"
+        assert (orcamento.admitidas, orcamento.rejeitadas, orcamento.ativas) == (1, 1, 0), "Os contadores não conferem"
+
+    def test_fila_aguarda_vaga(self, orcamento_catalogo):
+        # Arrange: uma vaga e uma posição na fila
+        orcamento = orcamento_catalogo(1, 1)
+        async def cenario():
+            liberar = asyncio.Event()
+            return await requisitar_concorrente(criar_app(liberar), liberar)
+        # Act: faz duas requisições simultâneas
+        primeira, segunda = asyncio.run(cenario())
+        # Assert: a segunda espera a vaga e também é atendida
+        assert (primeira.status_code, segunda.status_code) == (200, 200), "As duas requisições deveriam ser atendidas"
+        assert orcamento.admitidas == 2, "As duas requisições deveriam ser admitidas"
+
+    def test_espera_maxima_rejeita_com_503(self, orcamento_catalogo, monkeypatch):
+        # Arrange: uma vaga, uma posição na fila e espera máxima curta
+        orcamento = orcamento_catalogo(1, 1)
+        monkeypatch.setattr(admissao, "ESPERA_MAXIMA", 0.05)
+        async def cenario():
+            liberar = asyncio.Event()
+            return await requisitar_concorrente(criar_app(liberar), liberar, atraso=0.2)
+        # Act: a rota fica ocupada por mais tempo que a espera máxima
+        primeira, segunda = asyncio.run(cenario())
+        # Assert: a requisição da fila desiste e recebe 503
+        assert primeira.status_code == 200, "A primeira requisição deveria ser atendida"
+        assert segunda.status_code == 503, "A requisição da fila deveria ser rejeitada após a espera máxima"
+        assert orcamento.rejeitadas == 1, "Deveria contar uma rejeição"
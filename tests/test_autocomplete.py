@@ -0,0 +1,76 @@
+from models.produto import Produto
+from repo import categoria_repo, produto_repo
+from util import autocomplete, sincronizacao
+
+def preparar_catalogo(categoria, nomes: list[str]) -> list[int]:
+    # Cria as tabelas do catálogo, insere os produtos e constrói o índice do zero
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    ids = [produto_repo.inserir_produto(Produto(0, nome, "Descrição", 10.0, 5, "produto.jpg", 1)) for nome in nomes]
+    sincronizacao.sincronizar()
+    autocomplete.limpar()
+    autocomplete.construir()
+    return ids
+
+def nomes_encontrados(consulta: str, limite: int = 10) -> list[str]:
+    # Retorna apenas os nomes dos produtos encontrados
+    return [produto["nome"] for produto in autocomplete.buscar(consulta, limite)]
+
+class TestAutocomplete:
+    def test_buscar_ignora_acentos_e_maiusculas(self, test_db, categoria_exemplo):
+        # Arrange
+        preparar_catalogo(categoria_exemplo, ["Fone Bluetooth JBL", "Cadeira Ergonômica", "Câmera Digital"])
+        # Act
+        resultado = nomes_encontrados("CAME")
+        # Assert
+        assert resultado == ["Câmera Digital"], "A busca deveria ignorar acentos e maiúsculas"
+
+    def test_buscar_prioriza_inicio_do_nome(self, test_db, categoria_exemplo):
+        # Arrange
+        preparar_catalogo(categoria_exemplo, ["Mouse Sem Fio", "Kit Teclado e Mouse", "Monitor 24"])
+        # Act
+        resultado = nomes_encontrados("mou")
+        limitado = nomes_encontrados("m", limite=2)
+        # Assert
+        assert resultado == ["Mouse Sem Fio", "Kit Teclado e Mouse"], "Nomes iniciados pela consulta deveriam vir primeiro"
+        assert limitado == ["Monitor 24", "Mouse Sem Fio"], "A busca deveria respeitar o limite"
+
+    def test_alteracoes_de_produtos_atualizam_indice(self, test_db, categoria_exemplo):
+        # Arrange
+        ids = preparar_catalogo(categoria_exemplo, ["Notebook Lenovo", "Smart TV LG"])
+        # Act: renomeia, exclui e insere produtos e sincroniza como no início de uma requisição
+        produto = produto_repo.obter_produto_por_id(ids[0])
+        produto.nome = "Ultrabook Lenovo"
+        produto_repo.atualizar_produto(produto)
+        produto_repo.excluir_produto(ids[1])
+        produto_repo.inserir_produto(Produto(0, "Smartphone Samsung", "Descrição", 10.0, 5, "produto.jpg", 1))
+        sincronizacao.sincronizar()
+        # Assert
+        assert nomes_encontrados("note") == [], "O nome anterior deveria sair do índice"
+        assert nomes_encontrados("lenovo") == ["Ultrabook Lenovo"], "O novo nome deveria ser indexado"
+        assert nomes_encontrados("smart") == ["Smartphone Samsung"], "O produto excluído deveria sair e o novo entrar"
+
+    def test_alteracao_sem_mudar_o_nome_mantem_entradas(self, test_db, categoria_exemplo, monkeypatch):
+        # Arrange: registra as entradas calculadas a cada atualização do índice
+        ids = preparar_catalogo(categoria_exemplo, ["Notebook Lenovo"])
+        calculadas = []
+        entradas = autocomplete._entradas
+        monkeypatch.setattr(autocomplete, "_entradas", lambda id, nome: calculadas.append(nome) or entradas(id, nome))
+        # Act: altera só o estoque do produto e sincroniza
+        produto = produto_repo.obter_produto_por_id(ids[0])
+        produto.estoque = 1
+        produto_repo.atualizar_produto(produto)
+        sincronizacao.sincronizar()
+        # Assert
+        assert calculadas == [], "Sem mudança no nome, as entradas do índice não deveriam ser refeitas"
+        assert nomes_encontrados("lenovo") == ["Notebook Lenovo"], "O produto deveria continuar no índice"
+
+    def test_consulta_maior_que_a_chave(self, test_db, categoria_exemplo):
+        # Arrange
+        nome_longo = "Cadeira Gamer Reclinável com Apoio de Braço Ajustável Preta"
+        preparar_catalogo(categoria_exemplo, [nome_longo, "Cadeira Gamer Reclinável com Apoio de Braço Ajustável Azul"])
+        # Act
+        resultado = nomes_encontrados("cadeira gamer reclinavel com apoio de braco ajustavel pre")
+        # Assert
+        assert resultado == [nome_longo], "Consultas longas deveriam ser conferidas no nome completo"
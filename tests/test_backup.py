@@ -0,0 +1,65 @@
+import os
+import sqlite3
+from repo import categoria_repo
+from util import backup
+from util.database import configurar_lojas, usar_loja
+
+class TestBackup:
+    def test_fazer_backup(self, test_db, tmp_path, lista_categorias_exemplo):
+        # Arrange: banco com algumas categorias
+        categoria_repo.criar_tabela_categorias()
+        for categoria in lista_categorias_exemplo:
+            categoria_repo.inserir_categoria(categoria)
+        # Act: faz o backup copiando uma página por passo
+        relatorio = backup.fazer_backup(str(tmp_path), paginas_por_passo=1, pausa=0)
+        # Assert: verifica o arquivo gerado e seu conteúdo
+        assert os.path.exists(relatorio["arquivo"]), "O arquivo de backup deveria existir"
+        assert relatorio["passos"] == relatorio["paginas"], "Deveria haver um passo por página"
+        assert backup.verificar_integridade(relatorio["arquivo"]), "O backup deveria estar íntegro"
+        conexao = sqlite3.connect(relatorio["arquivo"])
+        quantidade = conexao.execute("SELECT COUNT(*) FROM Categoria").fetchone()[0]
+        conexao.close()
+        assert quantidade == len(lista_categorias_exemplo), "O backup deveria conter todas as categorias"
+        assert not [nome for nome in os.listdir(tmp_path) if nome.endswith(".parcial")], "Não deveria sobrar cópia parcial"
+
+    def test_aplicar_retencao(self, tmp_path):
+        # Arrange: cria cinco arquivos de backup com datas diferentes
+        for dia in range(1, 6):
+            (tmp_path / f"backup_2025010{dia}_000000.db").write_bytes(b"")
+        # Act: mantém apenas os dois mais recentes
+        removidos = backup.aplicar_retencao(str(tmp_path), 2)
+        # Assert: verifica que os três mais antigos foram removidos
+        restantes = [os.path.basename(caminho) for caminho in backup.listar_backups(str(tmp_path))]
+        assert len(removidos) == 3, "Deveriam ser removidos 3 backups"
+        assert restantes == ["backup_20250104_000000.db", "backup_20250105_000000.db"], "Deveriam restar os backups mais recentes"
+
+    def test_verificar_integridade_arquivo_corrompido(self, tmp_path):
+        # Arrange: cria um arquivo que não é um banco SQLite válido
+        caminho = tmp_path / "backup_corrompido.db"
+        caminho.write_bytes(b"SQLite format 3\x00" + b"\xff" * 200)
+        # Act: verifica a integridade do arquivo
+        resultado = backup.verificar_integridade(str(caminho))
+        # Assert: verifica que o arquivo foi rejeitado
+        assert not resultado, "O arquivo corrompido não deveria passar na verificação"
+
+    def test_backup_de_todas_as_lojas(self, test_db, tmp_path, categoria_exemplo):
+        # Arrange: a loja padrão e uma loja configurada, cada uma com o seu banco
+        categoria_repo.criar_tabela_categorias()
+        loja, = configurar_lojas(f"moda.exemplo.com={tmp_path / 'moda.db'}")
+        try:
+            with usar_loja(loja):
+                categoria_repo.criar_tabela_categorias()
+                categoria_repo.inserir_categoria(categoria_exemplo)
+            destino = tmp_path / "backups"
+            # Act
+            backup.main(["--destino", str(destino), "--pausa", "0"])
+        finally:
+            configurar_lojas("")
+        # Assert
+        assert len(backup.listar_backups(str(destino))) == 1, "O banco padrão deveria ter um backup"
+        backups_loja = backup.listar_backups(str(destino / "moda"))
+        assert len(backups_loja) == 1, "A loja configurada deveria ter um backup no seu subdiretório"
+        conexao = sqlite3.connect(backups_loja[0])
+        quantidade = conexao.execute("SELECT COUNT(*) FROM Categoria").fetchone()[0]
+        conexao.close()
+        assert quantidade == 1, "O backup da loja deveria conter os dados do banco da loja"
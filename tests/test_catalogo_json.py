@@ -0,0 +1,61 @@
+import json
+from repo import categoria_repo, produto_repo
+from util import cache_produtos, catalogo_json
+
+class TestCatalogoJson:
+    def test_obter_produto_json_existente(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: insere um produto e limpa o cache
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto_inserido = produto_repo.inserir_produto(produto_exemplo)
+        cache_produtos.limpar()
+        # Act: obtém o payload JSON do produto
+        payload = catalogo_json.obter_produto_json(id_produto_inserido)
+        # Assert: verifica se o payload contém os dados do produto
+        dados = json.loads(payload)
+        assert dados["nome"] == produto_exemplo.nome, "O nome do produto não confere"
+        assert dados["categoria"]["nome"] == categoria_exemplo.nome, "O nome da categoria não confere"
+        assert cache_produtos.obter(id_produto_inserido) == payload, "O payload deveria estar em cache"
+
+    def test_obter_produto_json_inexistente(self, test_db):
+        # Arrange: prepara o banco sem produtos
+        categoria_repo.criar_tabela_categorias()
+        produto_repo.criar_tabela_produtos()
+        cache_produtos.limpar()
+        # Act: tenta obter o payload de um produto inexistente
+        payload = catalogo_json.obter_produto_json(999)
+        # Assert: verifica se retorna None
+        assert payload is None, "Deveria retornar None para produto inexistente"
+
+    def test_atualizar_produto_invalida_cache(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: insere um produto e coloca seu payload em cache
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto_inserido = produto_repo.inserir_produto(produto_exemplo)
+        cache_produtos.limpar()
+        catalogo_json.obter_produto_json(id_produto_inserido)
+        # Act: atualiza o preço do produto
+        produto = produto_repo.obter_produto_por_id(id_produto_inserido)
+        produto.preco = 99.9
+        produto_repo.atualizar_produto(produto)
+        # Assert: verifica se o novo payload reflete a alteração
+        dados = json.loads(catalogo_json.obter_produto_json(id_produto_inserido))
+        assert dados["preco"] == 99.9, "O payload em cache deveria ter sido invalidado"
+
+    def test_obter_pagina_produtos_json(self, test_db, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange: insere vários produtos e deixa parte deles em cache
+        categoria_repo.criar_tabela_categorias()
+        for categoria in lista_categorias_exemplo:
+            categoria_repo.inserir_categoria(categoria)
+        produto_repo.criar_tabela_produtos()
+        for produto in lista_produtos_exemplo:
+            produto_repo.inserir_produto(produto)
+        cache_produtos.limpar()
+        catalogo_json.obter_produto_json(2)
+        # Act: obtém a primeira página com 4 produtos
+        payload = catalogo_json.obter_pagina_produtos_json(1, 4)
+        # Assert: verifica se a lista está completa e na ordem da listagem
+        nomes = [produto["nome"] for produto in json.loads(payload)]
+        assert nomes == ["Produto 01", "Produto 02", "Produto 03", "Produto 04"], "A página não está na ordem correta"
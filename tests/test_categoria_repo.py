@@ -1,4 +1,6 @@
-from repo import categoria_repo
+from models.categoria import Categoria
+from models.produto import Produto
+from repo import categoria_repo, produto_repo
 
 class TestCategoriaRepo:
     def test_criar_tabela_categorias(self, test_db):
@@ -112,4 +114,46 @@ class TestCategoriaRepo:
         pagina_categorias = categoria_repo.obter_categorias_por_pagina(1, 10)
         # Assert
         assert isinstance(pagina_categorias, list), "Deveria retornar uma lista"
-        assert len(pagina_categorias) == 0, "Deveria retornar lista vazia quando não há categorias"
\ No newline at end of file
+        assert len(pagina_categorias) == 0, "Deveria retornar lista vazia quando não há categorias"
+
+    def test_agregados_acompanham_produtos(self, test_db, categoria_exemplo):
+        # Arrange
+        categoria_repo.criar_tabela_categorias()
+        id_categoria = categoria_repo.inserir_categoria(categoria_exemplo)
+        id_outra = categoria_repo.inserir_categoria(Categoria(0, "Outra"))
+        produto_repo.criar_tabela_produtos()
+        ids = [produto_repo.inserir_produto(Produto(0, f"Produto {i}", "Descrição", preco, estoque, "p.jpg", id_categoria))
+               for i, (preco, estoque) in enumerate([(10.0, 2), (20.0, 0), (30.0, 1)])]
+        # Act: reserva estoque, remove o mais barato e move o mais caro para outra categoria
+        produto_repo.reservar_estoque(ids[2], 1)
+        produto_repo.excluir_produto(ids[0])
+        produto = produto_repo.obter_produto_por_id(ids[1])
+        produto.id_categoria = id_outra
+        produto.preco = 25.0
+        produto_repo.atualizar_produto(produto)
+        agregado = categoria_repo.obter_agregado_categoria(id_categoria)
+        agregado_outra = categoria_repo.obter_agregado_categoria(id_outra)
+        # Assert
+        assert agregado.quantidade_produtos == 1, "A categoria deveria ter 1 produto"
+        assert agregado.quantidade_em_estoque == 0, "O produto restante está sem estoque"
+        assert agregado.preco_minimo == 30.0 and agregado.preco_maximo == 30.0, "A faixa de preço deveria ser recalculada"
+        assert agregado.valor_estoque == 0, "O valor em estoque deveria ser zero"
+        assert agregado_outra.quantidade_produtos == 1, "O produto movido deveria contar na nova categoria"
+        assert agregado_outra.preco_medio == 25.0, "O preço médio deveria refletir o novo preço"
+
+    def test_reconstruir_agregados_igual_ao_incremental(self, test_db, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange
+        categoria_repo.criar_tabela_categorias()
+        for categoria in lista_categorias_exemplo:
+            categoria_repo.inserir_categoria(categoria)
+        produto_repo.criar_tabela_produtos()
+        for produto in lista_produtos_exemplo:
+            produto_repo.inserir_produto(produto)
+        produto_repo.excluir_produto(3)
+        incrementais = categoria_repo.obter_agregados_categorias_por_pagina(1, 20)
+        # Act
+        quantidade = categoria_repo.reconstruir_agregados_categorias()
+        reconstruidos = categoria_repo.obter_agregados_categorias_por_pagina(1, 20)
+        # Assert
+        assert quantidade == 10, "Todas as categorias deveriam ser recalculadas"
+        assert reconstruidos == incrementais, "Os agregados incrementais deveriam ser iguais aos recalculados"
@@ -0,0 +1,143 @@
+import pytest
+from fastapi.testclient import TestClient
+from models.categoria import Categoria
+from models.produto import Produto
+from repo import categoria_repo, endereco_repo, pedido_repo, produto_repo, usuario_repo
+from util import exclusao_lotes, initializer
+
+@pytest.fixture
+def diretorio_exclusoes(tmp_path, monkeypatch):
+    # Grava o progresso em um diretório temporário e sem pausa entre os lotes
+    monkeypatch.setattr(exclusao_lotes, "DIRETORIO", str(tmp_path))
+    monkeypatch.setattr(exclusao_lotes, "PAUSA", 0)
+    return tmp_path
+
+def preparar_categorias(quantidade_produtos: int) -> None:
+    # Cria duas categorias e insere os produtos na primeira
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(Categoria(0, "Origem"))
+    categoria_repo.inserir_categoria(Categoria(0, "Destino"))
+    produto_repo.criar_tabela_produtos()
+    for i in range(quantidade_produtos):
+        produto_repo.inserir_produto(Produto(0, f"Produto {i}", "Descrição", 10.0, 2, "produto.jpg", 1))
+
+class TestExclusaoLotes:
+    def test_mover_produtos_e_excluir_categoria(self, test_db, diretorio_exclusoes):
+        # Arrange
+        preparar_categorias(5)
+        # Act
+        progresso = exclusao_lotes.excluir_categoria(1, id_destino=2, tamanho_lote=2)
+        # Assert
+        assert progresso["situacao"] == "concluida", "A exclusão deveria ser concluída"
+        assert progresso["lotes"] == 3, "Os 5 produtos deveriam ser movidos em 3 lotes"
+        assert progresso["processados"] == {"produtos_movidos": 5}, "Todos os produtos deveriam ser movidos"
+        assert categoria_repo.obter_categoria_por_id(1) is None, "A categoria deveria ser excluída"
+        assert categoria_repo.obter_agregado_categoria(2).quantidade_produtos == 5, "Os agregados do destino deveriam ser atualizados"
+        assert exclusao_lotes.obter_progresso("categoria-1")["situacao"] == "concluida", "O progresso deveria ser gravado"
+
+    def test_exclusao_interrompida_e_retomada(self, test_db, diretorio_exclusoes, monkeypatch):
+        # Arrange: o segundo lote falha como se o banco estivesse ocupado
+        preparar_categorias(5)
+        excluir_lote = produto_repo.excluir_produtos_categoria_lote
+        chamadas = []
+        def excluir_com_falha(id_categoria, tamanho_lote):
+            chamadas.append(id_categoria)
+            if len(chamadas) == 2:
+                raise RuntimeError("database is locked")
+            return excluir_lote(id_categoria, tamanho_lote)
+        monkeypatch.setattr(produto_repo, "excluir_produtos_categoria_lote", excluir_com_falha)
+        # Act
+        interrompida = exclusao_lotes.excluir_categoria(1, excluir_produtos=True, tamanho_lote=2)
+        retomadas = exclusao_lotes.retomar_pendentes(tamanho_lote=2)
+        # Assert
+        assert interrompida["situacao"] == "interrompida", "A falha deveria interromper a exclusão"
+        assert interrompida["processados"] == {"produtos_excluidos": 2}, "O lote já confirmado deveria permanecer"
+        assert len(retomadas) == 1 and retomadas[0]["situacao"] == "concluida", "A exclusão deveria ser retomada"
+        assert retomadas[0]["processados"] == {"produtos_excluidos": 5}, "A contagem deveria continuar de onde parou"
+        assert retomadas[0]["retomadas"] == 1, "A retomada deveria ser registrada"
+        assert produto_repo.obter_nomes_produtos() == [], "Todos os produtos deveriam ser excluídos"
+
+    def test_repeticao_sem_opcoes_retoma_com_as_originais(self, test_db, diretorio_exclusoes, monkeypatch):
+        # Arrange: a mudança dos produtos para a categoria 2 é interrompida no segundo lote
+        preparar_categorias(5)
+        mover_lote = produto_repo.mover_produtos_categoria_lote
+        chamadas = []
+        def mover_com_falha(id_categoria, id_destino, tamanho_lote):
+            chamadas.append(id_categoria)
+            if len(chamadas) == 2:
+                raise RuntimeError("database is locked")
+            return mover_lote(id_categoria, id_destino, tamanho_lote)
+        monkeypatch.setattr(produto_repo, "mover_produtos_categoria_lote", mover_com_falha)
+        exclusao_lotes.excluir_categoria(1, id_destino=2, tamanho_lote=2)
+        # Act: repete a exclusão sem as opções, como ao repetir a requisição sem os parâmetros
+        retomada = exclusao_lotes.excluir_categoria(1, tamanho_lote=2)
+        # Assert
+        assert retomada["situacao"] == "concluida", "A repetição deveria retomar a exclusão, sem falhar na validação"
+        assert retomada["opcoes"] == {"id_destino": 2, "excluir_produtos": False}, "As opções originais deveriam ser mantidas"
+        assert retomada["processados"] == {"produtos_movidos": 5}, "Os produtos restantes deveriam ser movidos, não excluídos"
+        assert categoria_repo.obter_agregado_categoria(2).quantidade_produtos == 5, "Todos os produtos deveriam estar no destino"
+
+    def test_categoria_com_produtos_exige_opcao(self, test_db, diretorio_exclusoes):
+        # Arrange
+        preparar_categorias(1)
+        # Act / Assert
+        with pytest.raises(ValueError):
+            exclusao_lotes.excluir_categoria(1)
+        assert categoria_repo.obter_categoria_por_id(1) is not None, "A categoria não deveria ser excluída"
+
+    def test_excluir_usuario_com_enderecos(self, test_db, diretorio_exclusoes, usuario_exemplo, lista_enderecos_exemplo):
+        # Arrange
+        usuario_repo.criar_tabela_usuarios()
+        endereco_repo.criar_tabela_enderecos()
+        pedido_repo.criar_tabela_pedidos()
+        id_usuario = usuario_repo.inserir_usuario(usuario_exemplo)
+        for endereco in lista_enderecos_exemplo:
+            endereco.id_usuario = id_usuario
+            endereco_repo.inserir_endereco(endereco)
+        # Act
+        progresso = exclusao_lotes.excluir_usuario(id_usuario, tamanho_lote=3)
+        # Assert
+        assert progresso["situacao"] == "concluida", "A exclusão deveria ser concluída"
+        assert progresso["processados"] == {"enderecos_excluidos": 10}, "Os endereços deveriam ser excluídos em lotes"
+        assert progresso["lotes"] == 4, "Os 10 endereços deveriam ser excluídos em 4 lotes"
+        assert usuario_repo.obter_usuario_por_id(id_usuario) is None, "O usuário deveria ser excluído"
+
+    def test_restricao_violada_cancela_exclusao(self, test_db, diretorio_exclusoes, usuario_exemplo, monkeypatch):
+        # Arrange: o usuário faz um pedido depois da validação (simulada sem pedidos), antes da exclusão
+        preparar_categorias(1)
+        usuario_repo.criar_tabela_usuarios()
+        endereco_repo.criar_tabela_enderecos()
+        pedido_repo.criar_tabela_pedidos()
+        id_usuario = usuario_repo.inserir_usuario(usuario_exemplo)
+        pedido_repo.inserir_pedido(id_usuario, [(1, 1)])
+        monkeypatch.setattr(pedido_repo, "usuario_possui_pedidos", lambda id: False)
+        # Act
+        cancelada = exclusao_lotes.excluir_usuario(id_usuario)
+        retomadas = exclusao_lotes.retomar_pendentes()
+        # Assert
+        assert cancelada["situacao"] == "cancelada", "A restrição violada deveria cancelar a exclusão, não interrompê-la"
+        assert "FOREIGN KEY" in cancelada["erro"], "O motivo do cancelamento deveria ser registrado"
+        assert retomadas == [], "Exclusões canceladas não deveriam ser retomadas"
+        assert usuario_repo.obter_usuario_por_id(id_usuario) is not None, "O usuário deveria continuar cadastrado"
+
+    def test_rota_de_exclusao_de_usuario_exige_administrador(self, test_db, diretorio_exclusoes, usuario_exemplo):
+        # Arrange: banco com os dados iniciais (que incluem o administrador padrão) e um usuário sem pedidos
+        import main
+        initializer.inicializar_banco()
+        usuario_exemplo.cpf, usuario_exemplo.email = "000.000.000-00", "sem.pedidos@email.com"
+        id_usuario = usuario_repo.inserir_usuario(usuario_exemplo)
+        cliente = TestClient(main.app)
+        # Act: tenta por GET e sem login, e depois exclui como administrador
+        por_get = cliente.get(f"/usuarios/excluir/{id_usuario}")
+        sem_login = cliente.post(f"/usuarios/excluir/{id_usuario}", follow_redirects=False)
+        progresso_sem_login = cliente.get(f"/usuarios/excluir/{id_usuario}/progresso")
+        cliente.post("/login", data={"email": "joaosilva@email.com", "senha": "123456"})
+        como_admin = cliente.post(f"/usuarios/excluir/{id_usuario}", follow_redirects=False)
+        progresso = cliente.get(f"/usuarios/excluir/{id_usuario}/progresso")
+        # Assert
+        assert por_get.status_code == 405, "A exclusão não deveria ser feita por GET"
+        assert sem_login.status_code == 403 and progresso_sem_login.status_code == 403, \
+            "A exclusão e o progresso deveriam ser restritos a administradores"
+        assert como_admin.status_code == 303, "O administrador deveria conseguir excluir o usuário"
+        assert progresso.json()["situacao"] == "concluida", "O progresso deveria estar disponível ao administrador"
+        assert usuario_repo.obter_usuario_por_id(id_usuario) is None, "O usuário deveria ser excluído"
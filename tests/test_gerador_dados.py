@@ -0,0 +1,42 @@
+import random
+from repo import produto_repo, usuario_repo, endereco_repo
+from util import gerador_dados
+from util.database import obter_conexao
+
+class TestGeradorDados:
+    def test_gerar_produtos_deterministico(self):
+        # Arrange: dois geradores com a mesma semente
+        gerador_a = random.Random(7)
+        gerador_b = random.Random(7)
+        # Act: gera produtos com cada gerador
+        produtos_a = list(gerador_dados.gerar_produtos(gerador_a, 1, 20, (1, 5)))
+        produtos_b = list(gerador_dados.gerar_produtos(gerador_b, 1, 20, (1, 5)))
+        # Assert: verifica se os dados gerados são idênticos
+        assert produtos_a == produtos_b, "A mesma semente deveria gerar os mesmos produtos"
+        assert all(1 <= produto[6] <= 5 for produto in produtos_a), "As categorias deveriam estar no intervalo informado"
+
+    def test_gerar_e_carregar(self, test_db):
+        # Arrange: banco temporário vazio
+        # Act: gera e carrega dados em lotes pequenos
+        totais = gerador_dados.gerar_e_carregar(
+            categorias=5, produtos=250, usuarios=30, enderecos_por_usuario=2,
+            tamanho_lote=40, relatar=lambda mensagem: None)
+        # Assert: verifica as quantidades carregadas e a listagem reconstruída
+        assert totais == {"Categoria": 5, "Produto": 250, "Usuario": 30, "Endereco": 60}, "As quantidades carregadas não conferem"
+        assert len(produto_repo.obter_produtos_por_pagina(1, 1000)) == 250, "A listagem de produtos deveria ter sido reconstruída"
+        assert usuario_repo.obter_usuario_por_id(30) is not None, "O último usuário gerado deveria existir"
+        assert len(endereco_repo.obter_enderecos_por_usuario(30)) == 2, "Cada usuário deveria ter 2 endereços"
+
+    def test_gerar_e_carregar_recria_indices_e_triggers(self, test_db):
+        # Arrange: banco temporário vazio
+        # Act: gera e carrega dados
+        gerador_dados.gerar_e_carregar(
+            categorias=2, produtos=10, usuarios=0, enderecos_por_usuario=0, relatar=lambda mensagem: None)
+        # Assert: verifica se os triggers voltaram a manter a listagem
+        produto = produto_repo.obter_produto_por_id(1)
+        produto.nome = "Produto Renomeado"
+        produto_repo.atualizar_produto(produto)
+        assert produto_repo.obter_produto_por_id(1).nome == "Produto Renomeado", "Os triggers da listagem deveriam ter sido recriados"
+        with obter_conexao() as conexao:
+            indices = [linha[0] for linha in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        assert "idx_produto_listagem_nome" in indices, "Os índices deveriam ter sido recriados"
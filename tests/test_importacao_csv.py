@@ -0,0 +1,133 @@
+import csv
+import io
+import os
+import threading
+from repo import categoria_repo, produto_repo
+from util import importacao_csv
+
+def preparar_catalogo(categoria, produtos) -> None:
+    # Cria as tabelas do catálogo e insere os produtos de exemplo
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    for produto in produtos:
+        produto.id_categoria = 1
+        produto_repo.inserir_produto(produto)
+
+def importar_texto(texto: str, tamanho_lote: int = 2, decimal: str = None) -> dict:
+    # Importa o conteúdo como se fosse o arquivo enviado pelo formulário
+    progresso = importacao_csv.criar("precos.csv", decimal)
+    return importacao_csv.importar(progresso["id"], io.BytesIO(texto.encode("utf-8")), tamanho_lote)
+
+def erros_por_linha(progresso: dict) -> dict[str, str]:
+    # Lê o arquivo de erros da importação como {linha: motivo}
+    with open(importacao_csv.caminho_erros(progresso["id"]), encoding="utf-8") as arquivo:
+        return {erro["linha"]: erro["erro"] for erro in csv.DictReader(arquivo)}
+
+class TestImportacaoCsv:
+    def test_importar_atualiza_preco_e_estoque_parcialmente(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        conteudo = "﻿id;preco;estoque\n1;1.234,50;\n2;;99\n3;30,00;15\n"
+        # Act
+        progresso = importar_texto(conteudo)
+        # Assert
+        assert progresso["situacao"] == "concluida", "A importação deveria ser concluída"
+        assert progresso["linhas_atualizadas"] == 2, "Dois produtos deveriam ser alterados"
+        assert progresso["linhas_sem_alteracao"] == 1, "O produto com os mesmos valores não deveria ser escrito"
+        produto_1 = produto_repo.obter_produto_por_id(1)
+        produto_2 = produto_repo.obter_produto_por_id(2)
+        assert (produto_1.preco, produto_1.estoque) == (1234.5, 5), "Só o preço do produto 1 deveria mudar"
+        assert (produto_2.preco, produto_2.estoque) == (20.0, 99), "Só o estoque do produto 2 deveria mudar"
+        assert importacao_csv.obter_progresso(progresso["id"]) == progresso, "O progresso deveria estar gravado"
+
+    def test_importar_registra_linhas_com_erro(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        conteudo = "id,preco,estoque\nabc,1,1\n1,-5,\n999,10,\n4,,\n5,12.5,1\n"
+        # Act
+        progresso = importar_texto(conteudo)
+        # Assert
+        with open(importacao_csv.caminho_erros(progresso["id"]), encoding="utf-8") as arquivo:
+            erros = list(csv.DictReader(arquivo))
+        assert progresso["linhas_lidas"] == 5, "Todas as linhas deveriam ser lidas"
+        assert progresso["linhas_atualizadas"] == 1, "Apenas a linha válida deveria ser aplicada"
+        assert [erro["linha"] for erro in erros] == ["2", "3", "5", "4"], "As linhas rejeitadas deveriam ir para o arquivo de erros"
+        assert erros[3]["erro"] == "Produto não encontrado", "O produto inexistente deveria ser informado"
+        assert produto_repo.obter_produto_por_id(5).preco == 12.5, "A linha válida deveria ser aplicada"
+
+    def test_importar_cabecalho_invalido(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        # Act
+        progresso = importar_texto("codigo,valor\n1,10\n")
+        # Assert
+        assert progresso["situacao"] == "falhou", "Um cabeçalho sem id e preco/estoque deveria falhar"
+        assert progresso["erro"], "O motivo da falha deveria ser informado"
+
+    def test_convencao_de_decimais_decidida_pelo_arquivo(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange: o mesmo texto "10.500" em um arquivo com ";" (decimais com vírgula) e em um com "," (com ponto)
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        com_virgula = "id;preco;estoque\n1;1.234;\n2;1.234.567;\n3;10.500;\n4;12.50;\n5;0.125;\n"
+        com_ponto = 'id,preco,estoque\n6,10.500,\n7,0.75,\n8,"1,234.50",\n9,"12,5",\n'
+        # Act
+        progresso_virgula = importar_texto(com_virgula)
+        progresso_ponto = importar_texto(com_ponto)
+        precos = [produto_repo.obter_produto_por_id(id).preco for id in range(1, 9)]
+        # Assert
+        assert (progresso_virgula["decimal"], progresso_ponto["decimal"]) == (",", "."), \
+            "A convenção deveria seguir o delimitador do arquivo"
+        assert precos[:3] == [1234.0, 1234567.0, 10500.0], "Com \";\", o ponto deveria ser separador de milhar"
+        assert precos[5:] == [10.5, 0.75, 1234.5], "Com \",\", o ponto deveria separar os decimais"
+        assert list(erros_por_linha(progresso_virgula)) == ["5", "6"], \
+            "Decimais com ponto em um arquivo com vírgula deveriam ser rejeitados, não multiplicados por mil"
+        assert list(erros_por_linha(progresso_ponto)) == ["5"], "Decimais com vírgula em um arquivo com ponto deveriam ser rejeitados"
+
+    def test_convencao_de_decimais_informada_no_envio(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange: arquivo com ";" exportado com decimais com ponto
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        # Act
+        progresso = importar_texto("id;preco;estoque\n1;10.500;\n", decimal=".")
+        # Assert
+        assert progresso["decimal"] == ".", "A convenção informada deveria prevalecer sobre a do delimitador"
+        assert produto_repo.obter_produto_por_id(1).preco == 10.5, "O ponto deveria separar os decimais"
+
+    def test_precos_e_estoques_nao_finitos(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        conteudo = f"id,preco,estoque\n1,inf,\n2,nan,\n3,{'9' * 400},\n4,,inf\n5,,nan\n"
+        # Act
+        progresso = importar_texto(conteudo)
+        # Assert
+        assert progresso["linhas_atualizadas"] == 0, "Nenhum valor não finito deveria ser gravado"
+        assert list(erros_por_linha(progresso)) == ["2", "3", "4", "5", "6"], "Todas as linhas deveriam ser rejeitadas"
+
+    def test_progresso_visivel_durante_importacao_em_segundo_plano(self, test_db, tmp_path, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange: o primeiro lote só é aplicado depois que o progresso for lido
+        monkeypatch.setattr(importacao_csv, "DIRETORIO", str(tmp_path))
+        preparar_catalogo(categoria_exemplo, lista_produtos_exemplo)
+        liberar = threading.Event()
+        atualizar = produto_repo.atualizar_precos_estoques
+        def atualizar_apos_liberar(valores):
+            liberar.wait(5)
+            return atualizar(valores)
+        monkeypatch.setattr(produto_repo, "atualizar_precos_estoques", atualizar_apos_liberar)
+        progresso = importacao_csv.criar("precos.csv")
+        importacao_csv.receber_arquivo(progresso["id"], io.BytesIO(b"id,preco,estoque\n1,15.5,\n2,,7\n"))
+        # Act: lê o progresso pelo ID com a importação em andamento e depois ao final
+        thread = importacao_csv.importar_em_segundo_plano(progresso["id"], tamanho_lote=1)
+        durante = importacao_csv.obter_progresso(progresso["id"])
+        liberar.set()
+        thread.join(5)
+        final = importacao_csv.obter_progresso(progresso["id"])
+        # Assert
+        assert durante["situacao"] in ("aguardando", "em_andamento"), "O ID deveria ser acompanhado antes do fim da importação"
+        assert final["situacao"] == "concluida" and final["linhas_atualizadas"] == 2, "A importação deveria terminar em segundo plano"
+        assert produto_repo.obter_produto_por_id(1).preco == 15.5, "Os lotes deveriam ser aplicados no banco da loja"
+        assert not os.path.exists(importacao_csv.caminho_arquivo(progresso["id"])), "A cópia do arquivo deveria ser removida"
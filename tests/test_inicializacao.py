@@ -0,0 +1,34 @@
+import os
+import pytest
+from util import perfil_inicializacao
+
+# Orçamento de partida a frio (importação do main + inicialização do banco), em milissegundos
+ORCAMENTO_INICIALIZACAO_MS = float(os.environ.get("ORCAMENTO_INICIALIZACAO_MS", "3000"))
+
+@pytest.fixture(scope="module")
+def medicao_inicializacao():
+    # Mede a inicialização uma única vez, em um processo Python novo
+    return perfil_inicializacao.medir_fases()
+
+class TestInicializacao:
+    def test_importar_main_nao_carrega_modulos_pesados(self, medicao_inicializacao):
+        # Arrange: módulos que devem ser carregados apenas no primeiro uso
+        modulos_adiados = ["babel", "babel.numbers", "uvicorn"]
+        # Act: obtém os módulos carregados após importar o main e inicializar o banco
+        carregados = set(medicao_inicializacao["modulos_carregados"])
+        # Assert: verifica se nenhum módulo adiado foi carregado
+        assert carregados.isdisjoint(modulos_adiados), f"Módulos carregados antes do uso: {carregados & set(modulos_adiados)}"
+
+    def test_inicializacao_dentro_do_orcamento(self, medicao_inicializacao):
+        # Arrange: fases que compõem a partida a frio
+        fases = medicao_inicializacao["fases"]
+        # Act: soma o tempo de importação e de inicialização do banco
+        total_ms = (fases["importacao_main"] + fases["inicializacao_banco"]) * 1000
+        # Assert: verifica se a partida a frio respeita o orçamento
+        assert total_ms <= ORCAMENTO_INICIALIZACAO_MS, f"Inicialização levou {total_ms:.0f} ms (orçamento: {ORCAMENTO_INICIALIZACAO_MS:.0f} ms)"
+
+    def test_primeira_requisicao_responde(self, medicao_inicializacao):
+        # Arrange/Act: a primeira requisição foi feita durante a medição
+        status = medicao_inicializacao["status_primeira_requisicao"]
+        # Assert: verifica se a aplicação respondeu à primeira requisição
+        assert status == 200, "A primeira requisição deveria retornar 200"
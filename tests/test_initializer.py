@@ -0,0 +1,45 @@
+from repo import categoria_repo, produto_repo, usuario_repo
+from util import initializer
+from util.database import obter_conexao
+
+class TestInitializer:
+    def test_inicializar_banco_vazio(self, test_db):
+        # Arrange: banco temporário vazio
+        # Act: inicializa o banco
+        initializer.inicializar_banco()
+        # Assert: verifica a versão do schema e os dados iniciais
+        with obter_conexao() as conexao:
+            versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+        assert versao == initializer.VERSAO_SCHEMA, "A versão do schema não foi gravada"
+        assert len(produto_repo.obter_produtos_por_pagina(1, 5)) == 5, "Os produtos iniciais deveriam ter sido inseridos"
+        assert usuario_repo.obter_usuario_por_email("joaosilva@email.com") is not None, "O usuário padrão deveria existir"
+
+    def test_inicializar_banco_sem_dados_iniciais(self, test_db):
+        # Arrange: banco temporário vazio
+        # Act: inicializa o banco sem dados iniciais
+        initializer.inicializar_banco(inserir_dados=False)
+        # Assert: verifica se as tabelas existem e estão vazias
+        assert produto_repo.obter_produtos_por_pagina(1, 5) == [], "Não deveria haver produtos"
+        assert categoria_repo.obter_categorias_por_pagina(1, 5) == [], "Não deveria haver categorias"
+
+    def test_inicializar_banco_schema_atualizado_nao_altera_dados(self, test_db):
+        # Arrange: inicializa o banco e remove um produto
+        initializer.inicializar_banco()
+        produto_repo.excluir_produto(1)
+        # Act: inicializa o banco novamente
+        initializer.inicializar_banco()
+        # Assert: verifica se os dados iniciais não foram reinseridos
+        assert produto_repo.obter_produto_por_id(1) is None, "Os dados iniciais não deveriam ser reinseridos"
+
+    def test_inicializar_banco_existente_sem_versao(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: simula um banco antigo, com catálogo preenchido mas sem versão de schema
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        produto_repo.inserir_produto(produto_exemplo)
+        # Act: inicializa o banco
+        initializer.inicializar_banco()
+        # Assert: verifica se o catálogo foi preservado e as tabelas vazias foram semeadas
+        produtos = produto_repo.obter_produtos_por_pagina(1, 10)
+        assert [produto.nome for produto in produtos] == ["Produto Teste"], "Os produtos existentes não deveriam ser alterados"
+        assert usuario_repo.obter_usuario_por_email("joaosilva@email.com") is not None, "A tabela vazia de usuários deveria ter sido semeada"
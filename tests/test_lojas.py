@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from models.categoria import Categoria
+from models.produto import Produto
+from repo import categoria_repo, produto_repo
+from util import cache_produtos, catalogo_json, initializer, sessao, sincronizacao, visualizacoes
+from util.database import LOJA_PADRAO, MiddlewareLoja, configurar_lojas, loja_atual, resolver_loja, usar_loja
+
+@pytest.fixture
+def lojas(test_db):
+    # Configura duas lojas, uma por host e outra por prefixo, com bancos ao lado do banco de teste
+    diretorio = os.path.dirname(test_db)
+    base = os.path.splitext(os.path.basename(test_db))[0]
+    caminhos = {nome: os.path.join(diretorio, f"{base}_{nome}.db") for nome in ("moda", "casa")}
+    configuradas = configurar_lojas(f"moda.exemplo.com={caminhos['moda']},/casa={caminhos['casa']}")
+    yield {loja.nome.rsplit("_", 1)[1]: loja for loja in configuradas}
+    # Descarta os caches das lojas, volta para a loja única e remove os bancos criados
+    for loja in configuradas:
+        with usar_loja(loja):
+            cache_produtos.limpar()
+            sessao.limpar()
+            visualizacoes.limpar()
+    configurar_lojas("")
+    for caminho in caminhos.values():
+        if os.path.exists(caminho):
+            os.unlink(caminho)
+
+def criar_app() -> FastAPI:
+    # Cria uma aplicação mínima que lê produtos pelo cache de JSON, como a API do main.py
+    app = FastAPI()
+    @app.get("/api/produtos/{id}")
+    def produto(id: int):
+        return Response(catalogo_json.obter_produto_json(id), media_type="application/json")
+    @app.get("/loja")
+    def loja():
+        return {"loja": loja_atual()}
+    app.add_middleware(sincronizacao.MiddlewareSincronizacao)
+    app.add_middleware(MiddlewareLoja)
+    return app
+
+def preparar_catalogo(nome_produto: str) -> None:
+    # Cria o catálogo da loja corrente com um único produto
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(Categoria(0, "Categoria Teste"))
+    produto_repo.criar_tabela_produtos()
+    produto_repo.inserir_produto(Produto(0, nome_produto, "Descrição", 10.0, 5, "produto.jpg", 1))
+    sincronizacao.sincronizar()
+
+class TestLojas:
+    def test_resolver_loja_por_host_e_prefixo(self, lojas):
+        # Act
+        por_host = resolver_loja("Moda.Exemplo.com:8000", "/produtos")
+        por_prefixo = resolver_loja("localhost", "/casa/produtos/1")
+        sem_loja = resolver_loja("localhost", "/casados")
+        # Assert
+        assert por_host == (lojas["moda"], ""), "O host deveria ser comparado sem porta e sem diferenciar maiúsculas"
+        assert por_prefixo == (lojas["casa"], "/casa"), "O prefixo do caminho deveria resolver a loja"
+        assert sem_loja == (None, ""), "Caminhos que só começam com o mesmo texto deveriam usar a loja padrão"
+
+    def test_configuracao_invalida(self):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            configurar_lojas("moda.exemplo.com")
+        with pytest.raises(ValueError):
+            configurar_lojas(f"/padrao={LOJA_PADRAO}.db")
+
+    def test_requisicoes_usam_o_banco_da_loja(self, lojas):
+        # Arrange: cada banco tem um produto diferente com o mesmo ID
+        preparar_catalogo("Produto Padrão")
+        with usar_loja(lojas["moda"]):
+            preparar_catalogo("Vestido Longo")
+        with usar_loja(lojas["casa"]):
+            preparar_catalogo("Jogo de Panelas")
+        cliente = TestClient(criar_app())
+        # Act: lê duas vezes de cada loja (a segunda leitura vem do cache em memória)
+        nomes = {}
+        for _ in range(2):
+            nomes["padrao"] = cliente.get("/api/produtos/1").json()["nome"]
+            nomes["moda"] = cliente.get("/api/produtos/1", headers={"Host": "moda.exemplo.com"}).json()["nome"]
+            nomes["casa"] = cliente.get("/casa/api/produtos/1").json()["nome"]
+        loja_prefixo = cliente.get("/casa/loja").json()
+        # Assert
+        assert nomes == {"padrao": "Produto Padrão", "moda": "Vestido Longo", "casa": "Jogo de Panelas"}, \
+            "Cada loja deveria ler o próprio banco, sem misturar os caches"
+        assert loja_prefixo["loja"] == lojas["casa"].nome, "A rota deveria casar sem o prefixo da loja"
+
+    def test_visualizacoes_gravadas_no_banco_da_loja(self, test_db, lojas):
+        # Arrange: o produto 1 existe nas duas lojas
+        preparar_catalogo("Produto Padrão")
+        with usar_loja(lojas["moda"]):
+            preparar_catalogo("Vestido Longo")
+        # Act: registra visualizações em cada loja e grava todas em uma única descarga
+        for _ in range(3):
+            visualizacoes.registrar(1)
+        with usar_loja(lojas["moda"]):
+            visualizacoes.registrar(1)
+        visualizacoes.parar()
+        gravadas = {}
+        for nome, caminho in (("padrao", test_db), ("moda", lojas["moda"].caminho)):
+            conexao = sqlite3.connect(caminho)
+            gravadas[nome] = conexao.execute("SELECT id_produto, visualizacoes FROM ProdutoEstatistica").fetchall()
+            conexao.close()
+        # Assert
+        assert gravadas == {"padrao": [(1, 3)], "moda": [(1, 1)]}, \
+            "As visualizações de cada loja deveriam ir para o banco da própria loja"
+
+    def test_login_em_loja_por_prefixo(self, lojas):
+        # Arrange: só a loja por prefixo tem usuários (os dados iniciais incluem o administrador padrão)
+        import main
+        with usar_loja(lojas["casa"]):
+            initializer.inicializar_banco()
+        cliente = TestClient(main.app)
+        # Act: abre o formulário, entra e segue o redirecionamento até o perfil
+        formulario = cliente.get("/casa/login")
+        login = cliente.post("/casa/login", data={"email": "joaosilva@email.com", "senha": "123456"},
+            follow_redirects=False)
+        inicial = cliente.get(login.headers["location"])
+        perfil = cliente.get("/casa/perfil")
+        # Assert
+        assert 'action="/casa/login"' in formulario.text, "O formulário deveria enviar para a própria loja"
+        assert login.status_code == 303 and login.headers["location"] == "/casa/", \
+            "O login deveria redirecionar para a página inicial da loja"
+        assert cliente.cookies.get(f"{sessao.NOME_COOKIE}_{lojas['casa'].nome}"), "A sessão deveria usar o cookie da loja"
+        assert 'href="/casa/logout"' in inicial.text, "Os links da página deveriam manter o prefixo da loja"
+        assert perfil.status_code == 200, "O usuário deveria continuar logado nas páginas da loja"
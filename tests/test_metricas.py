@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+from repo import categoria_repo, produto_repo
+from sql.produto_sql import GET_PRODUTO_BY_ID, GET_PRODUTOS_BY_IDS
+from util import metricas
+
+def valor_metrica(texto: str, prefixo: str) -> float:
+    # Retorna o valor da linha de métrica que começa com o prefixo informado
+    for linha in texto.splitlines():
+        if linha.startswith(prefixo):
+            return float(linha.rsplit(" ", 1)[1])
+    return 0.0
+
+class TestMetricas:
+    def test_nome_consulta(self):
+        # Arrange: comando montado a partir de uma constante com marcadores
+        sql_formatado = GET_PRODUTOS_BY_IDS.format(marcadores="?, ?")
+        # Act: obtém os nomes das consultas
+        nome_constante = metricas.nome_consulta(GET_PRODUTO_BY_ID)
+        nome_formatado = metricas.nome_consulta(sql_formatado)
+        nome_desconhecido = metricas.nome_consulta("SELECT 1")
+        # Assert: verifica os nomes das constantes
+        assert nome_constante == "GET_PRODUTO_BY_ID", "Deveria usar o nome da constante"
+        assert nome_formatado == "GET_PRODUTOS_BY_IDS", "Deveria reconhecer o comando formatado"
+        assert nome_desconhecido == "outros", "Comandos desconhecidos deveriam ficar em 'outros'"
+
+    def test_consultas_dos_repositorios_sao_medidas(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: insere um produto e guarda as métricas atuais
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto = produto_repo.inserir_produto(produto_exemplo)
+        prefixo_contagem = 'loja_sql_duracao_segundos_count{consulta="GET_PRODUTO_BY_ID"}'
+        prefixo_linhas = 'loja_sql_linhas_total{consulta="GET_PRODUTO_BY_ID"}'
+        antes = metricas.gerar_texto()
+        # Act: consulta o produto duas vezes
+        produto_repo.obter_produto_por_id(id_produto)
+        produto_repo.obter_produto_por_id(id_produto)
+        depois = metricas.gerar_texto()
+        # Assert: verifica a contagem de execuções e de linhas lidas
+        assert valor_metrica(depois, prefixo_contagem) - valor_metrica(antes, prefixo_contagem) == 2, "Deveria registrar duas execuções"
+        assert valor_metrica(depois, prefixo_linhas) - valor_metrica(antes, prefixo_linhas) == 2, "Deveria registrar duas linhas lidas"
+
+    def test_endpoint_metrics(self, test_db):
+        # Arrange: cliente da aplicação com o banco inicializado
+        import main
+        with TestClient(main.app) as cliente:
+            # Act: faz uma requisição a uma rota com parâmetro e consulta as métricas
+            cliente.get("/api/produtos/1")
+            resposta = cliente.get("/metrics")
+        # Assert: verifica o formato e a rota agrupada pelo template
+        assert resposta.status_code == 200, "O endpoint de métricas deveria responder 200"
+        assert resposta.headers["content-type"].startswith("text/plain"), "As métricas deveriam estar em texto"
+        assert 'loja_requisicoes_total{metodo="GET",rota="/api/produtos/{id}",status="200"}' in resposta.text, \
+            "A requisição deveria ser contada pelo template da rota"
+        assert "loja_cache_produtos_entradas" in resposta.text, "Os indicadores do cache deveriam ser exportados"
@@ -0,0 +1,84 @@
+from repo import categoria_repo, produto_repo, usuario_repo, pedido_repo
+
+class TestPedidoRepo:
+    def preparar_catalogo(self, usuario, categorias, produtos):
+        # Cria as tabelas e insere um usuário, categorias e produtos (estoque 5, 10, 15, ...)
+        usuario_repo.criar_tabela_usuarios()
+        usuario_repo.inserir_usuario(usuario)
+        categoria_repo.criar_tabela_categorias()
+        for categoria in categorias:
+            categoria_repo.inserir_categoria(categoria)
+        produto_repo.criar_tabela_produtos()
+        for produto in produtos:
+            produto_repo.inserir_produto(produto)
+        pedido_repo.criar_tabela_pedidos()
+
+    def test_criar_tabela_pedidos(self, test_db):
+        # Arrange: prepara as tabelas referenciadas pelos pedidos
+        usuario_repo.criar_tabela_usuarios()
+        categoria_repo.criar_tabela_categorias()
+        produto_repo.criar_tabela_produtos()
+        # Act: chama o método para criar as tabelas
+        resultado = pedido_repo.criar_tabela_pedidos()
+        # Assert: verifica se as tabelas foram criadas com sucesso
+        assert resultado == True, "As tabelas de pedidos deveriam ser criadas com sucesso"
+
+    def test_inserir_pedido(self, test_db, usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange: prepara o catálogo
+        self.preparar_catalogo(usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo)
+        # Act: insere um pedido com dois produtos
+        id_pedido = pedido_repo.inserir_pedido(1, [(1, 2), (3, 1)])
+        # Assert: verifica o pedido, os itens, o total e a baixa de estoque
+        pedido = pedido_repo.obter_pedido_por_id(id_pedido)
+        assert pedido is not None, "O pedido inserido não deveria ser None"
+        assert pedido.id_usuario == 1, "O usuário do pedido não confere"
+        assert len(pedido.itens) == 2, "O pedido deveria ter 2 itens"
+        assert pedido.itens[0].nome_produto == "Produto 01", "O nome do produto não foi copiado para o item"
+        assert pedido.itens[0].preco_unitario == 10.0, "O preço do produto não foi copiado para o item"
+        assert pedido.valor_total == 50.0, "O valor total do pedido não confere"
+        assert produto_repo.obter_produto_por_id(1).estoque == 3, "O estoque do produto 1 deveria ter baixado para 3"
+        assert produto_repo.obter_produto_por_id(3).estoque == 14, "O estoque do produto 3 deveria ter baixado para 14"
+
+    def test_inserir_pedido_preserva_preco_do_momento_da_compra(self, test_db, usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange: prepara o catálogo e insere um pedido
+        self.preparar_catalogo(usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo)
+        id_pedido = pedido_repo.inserir_pedido(1, [(1, 1)])
+        # Act: altera o preço do produto depois da compra
+        produto = produto_repo.obter_produto_por_id(1)
+        produto.preco = 999.0
+        produto_repo.atualizar_produto(produto)
+        # Assert: verifica se o item mantém o preço da compra
+        pedido = pedido_repo.obter_pedido_por_id(id_pedido)
+        assert pedido.itens[0].preco_unitario == 10.0, "O item deveria manter o preço do momento da compra"
+
+    def test_inserir_pedido_estoque_insuficiente(self, test_db, usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange: prepara o catálogo
+        self.preparar_catalogo(usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo)
+        # Act: tenta inserir um pedido em que o segundo item não tem estoque suficiente
+        id_pedido = pedido_repo.inserir_pedido(1, [(1, 2), (2, 11)])
+        # Assert: verifica se o pedido não foi criado e o estoque não mudou
+        assert id_pedido is None, "O pedido não deveria ter sido criado"
+        assert produto_repo.obter_produto_por_id(1).estoque == 5, "O estoque do produto 1 não deveria ter sido alterado"
+        assert pedido_repo.obter_pedidos_por_usuario(1, 1, 10) == [], "Nenhum pedido deveria existir"
+
+    def test_cancelar_pedido(self, test_db, usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange: prepara o catálogo e insere um pedido
+        self.preparar_catalogo(usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo)
+        id_pedido = pedido_repo.inserir_pedido(1, [(1, 5)])
+        # Act: cancela o pedido
+        resultado = pedido_repo.cancelar_pedido(id_pedido)
+        # Assert: verifica o status do pedido e a devolução do estoque
+        assert resultado == True, "O cancelamento deveria retornar True"
+        assert pedido_repo.obter_pedido_por_id(id_pedido).status == "cancelado", "O pedido deveria estar cancelado"
+        assert produto_repo.obter_produto_por_id(1).estoque == 5, "O estoque deveria ter sido devolvido"
+        assert pedido_repo.cancelar_pedido(id_pedido) == False, "Um pedido não deveria ser cancelado duas vezes"
+
+    def test_obter_pedidos_por_usuario(self, test_db, usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo):
+        # Arrange: prepara o catálogo e insere três pedidos
+        self.preparar_catalogo(usuario_exemplo, lista_categorias_exemplo, lista_produtos_exemplo)
+        for id_produto in [1, 2, 3]:
+            pedido_repo.inserir_pedido(1, [(id_produto, 1)])
+        # Act: busca a primeira página com 2 pedidos
+        pedidos = pedido_repo.obter_pedidos_por_usuario(1, 1, 2)
+        # Assert: verifica se retornou os pedidos mais recentes primeiro
+        assert [pedido.id for pedido in pedidos] == [3, 2], "Os pedidos deveriam vir do mais recente para o mais antigo"
@@ -0,0 +1,65 @@
+import os
+import pstats
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from util import perfil_requisicao
+
+def criar_app(usuario: dict) -> FastAPI:
+    # Cria uma aplicação com rotas perfiláveis e uma sessão fixa (simulando o SessionMiddleware)
+    app = FastAPI()
+    app.router.route_class = perfil_requisicao.RotaPerfilavel
+    @app.get("/soma/{n}")
+    def soma(n: int):
+        return {"soma": sum(range(n))}
+    app.add_middleware(perfil_requisicao.MiddlewarePerfil)
+    def com_sessao(aplicacao):
+        async def middleware(scope, receive, send):
+            scope["session"] = {"usuario": usuario} if usuario else {}
+            await aplicacao(scope, receive, send)
+        return middleware
+    app.add_middleware(lambda aplicacao: com_sessao(aplicacao))
+    return app
+
+@pytest.fixture
+def diretorio_perfis(tmp_path, monkeypatch):
+    # Grava os perfis em um diretório temporário e zera o limite de frequência
+    monkeypatch.setattr(perfil_requisicao, "DIRETORIO", str(tmp_path))
+    monkeypatch.setattr(perfil_requisicao, "INTERVALO_MINIMO", 0)
+    monkeypatch.setattr(perfil_requisicao, "_ultimo_perfil", None)
+    return tmp_path
+
+class TestPerfilRequisicao:
+    def test_perfil_negado_para_usuario_comum(self, diretorio_perfis):
+        # Arrange: aplicação com um usuário comum na sessão
+        cliente = TestClient(criar_app({"id": 2, "tipo": "user"}))
+        # Act: pede o perfil pelo cabeçalho
+        resposta = cliente.get("/soma/10", headers={"X-Profile": "cprofile"})
+        # Assert: a requisição é atendida sem perfil
+        assert resposta.json() == {"soma": 45}, "A rota deveria responder normalmente"
+        assert resposta.headers["x-profile-status"] == "negado", "O perfil deveria ser negado"
+        assert not os.listdir(diretorio_perfis), "Nenhum perfil deveria ser gravado"
+
+    def test_perfil_cprofile_para_administrador(self, diretorio_perfis):
+        # Arrange: aplicação com um administrador na sessão
+        cliente = TestClient(criar_app({"id": 1, "tipo": "admin"}))
+        # Act: pede o perfil pelo parâmetro da URL
+        resposta = cliente.get("/soma/1000?_perfil=cprofile")
+        # Assert: o perfil é gravado com a rota no nome e pode ser lido pelo pstats
+        nome = resposta.headers["x-profile-file"]
+        assert resposta.headers["x-profile-status"] == "gravado", "O perfil deveria ser gravado"
+        assert nome.endswith("_GET_soma_n.prof"), "O nome do arquivo deveria conter a rota"
+        estatisticas = pstats.Stats(str(diretorio_perfis / nome))
+        assert any(funcao[2] == "soma" for funcao in estatisticas.stats), "O perfil deveria conter a função da rota"
+
+    def test_perfil_limitado_pelo_intervalo(self, diretorio_perfis, monkeypatch):
+        # Arrange: administrador e intervalo mínimo longo entre perfis
+        monkeypatch.setattr(perfil_requisicao, "INTERVALO_MINIMO", 3600)
+        cliente = TestClient(criar_app({"id": 1, "tipo": "admin"}))
+        # Act: pede dois perfis seguidos
+        primeira = cliente.get("/soma/10", headers={"X-Profile": "amostragem"})
+        segunda = cliente.get("/soma/10", headers={"X-Profile": "amostragem"})
+        # Assert: apenas o primeiro é gravado
+        assert primeira.headers["x-profile-status"] == "gravado", "O primeiro perfil deveria ser gravado"
+        assert segunda.headers["x-profile-status"] == "limitado", "O segundo perfil deveria ser limitado"
+        assert len(os.listdir(diretorio_perfis)) == 1, "Apenas um perfil deveria ser gravado"
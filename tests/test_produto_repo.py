@@ -1,5 +1,8 @@
 from models.categoria import Categoria
+from models.produto import Produto
+from models.produto_resumo import ProdutoResumo
 from repo import categoria_repo, produto_repo
+from util.database import obter_conexao
 
 class TestProdutoRepo:
     def test_criar_tabela_produtos(self, test_db):
@@ -155,3 +158,119 @@ class TestProdutoRepo:
         # Assert: verifica se retorna lista vazia
         assert isinstance(produtos_pagina, list), "Deveria retornar uma lista"
         assert len(produtos_pagina) == 0, "Deveria retornar lista vazia quando não há produtos"
+
+    def test_obter_produto_reflete_alteracao_nome_categoria(self, test_db, produto_exemplo, categoria_exemplo):
+        # Arrange: insere um produto associado a uma categoria
+        categoria_repo.criar_tabela_categorias()
+        id_categoria = categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto_inserido = produto_repo.inserir_produto(produto_exemplo)
+        # Act: renomeia a categoria do produto
+        categoria_repo.atualizar_categoria(Categoria(id_categoria, "Categoria Renomeada"))
+        # Assert: verifica se a listagem desnormalizada acompanhou a alteração
+        produto_encontrado = produto_repo.obter_produto_por_id(id_produto_inserido)
+        assert produto_encontrado.categoria.nome == "Categoria Renomeada", "O nome da categoria não foi atualizado na listagem"
+
+    def test_reconstruir_listagem_produtos(self, test_db, lista_produtos_exemplo, lista_categorias_exemplo):
+        # Arrange: insere vários produtos e apaga a tabela de listagem manualmente
+        categoria_repo.criar_tabela_categorias()
+        for categoria in lista_categorias_exemplo:
+            categoria_repo.inserir_categoria(categoria)
+        produto_repo.criar_tabela_produtos()
+        for produto in lista_produtos_exemplo:
+            produto_repo.inserir_produto(produto)
+        with obter_conexao() as conexao:
+            conexao.execute("DELETE FROM ProdutoListagem")
+        # Act: reconstrói a tabela de listagem
+        quantidade = produto_repo.reconstruir_listagem_produtos()
+        # Assert: verifica se todos os produtos voltaram para a listagem
+        assert quantidade == 10, "Deveria reconstruir os 10 produtos"
+        produtos_pagina = produto_repo.obter_produtos_por_pagina(numero_pagina=1, tamanho_pagina=20)
+        assert len(produtos_pagina) == 10, "A listagem deveria conter os 10 produtos após a reconstrução"
+        assert produtos_pagina[0].categoria.nome == "Categoria 01", "O nome da categoria não confere após a reconstrução"
+
+    def test_reservar_estoque_suficiente(self, test_db, produto_exemplo, categoria_exemplo):
+        # Arrange: insere um produto com 5 unidades em estoque
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto_inserido = produto_repo.inserir_produto(produto_exemplo)
+        # Act: reserva 3 unidades
+        resultado = produto_repo.reservar_estoque(id_produto_inserido, 3)
+        # Assert: verifica se a reserva foi feita e o estoque decrementado
+        assert resultado == True, "A reserva deveria retornar True"
+        produto = produto_repo.obter_produto_por_id(id_produto_inserido)
+        assert produto.estoque == 2, "O estoque deveria ter sido decrementado para 2"
+
+    def test_reservar_estoque_insuficiente(self, test_db, produto_exemplo, categoria_exemplo):
+        # Arrange: insere um produto com 5 unidades em estoque
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto_inserido = produto_repo.inserir_produto(produto_exemplo)
+        # Act: tenta reservar mais unidades do que o disponível
+        resultado = produto_repo.reservar_estoque(id_produto_inserido, 6)
+        # Assert: verifica se a reserva foi recusada sem alterar o estoque
+        assert resultado == False, "A reserva deveria retornar False"
+        produto = produto_repo.obter_produto_por_id(id_produto_inserido)
+        assert produto.estoque == 5, "O estoque não deveria ter sido alterado"
+
+    def test_liberar_estoque(self, test_db, produto_exemplo, categoria_exemplo):
+        # Arrange: insere um produto e reserva parte do estoque
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        id_produto_inserido = produto_repo.inserir_produto(produto_exemplo)
+        produto_repo.reservar_estoque(id_produto_inserido, 4)
+        # Act: libera as unidades reservadas
+        resultado = produto_repo.liberar_estoque(id_produto_inserido, 4)
+        # Assert: verifica se o estoque voltou ao valor original
+        assert resultado == True, "A liberação deveria retornar True"
+        produto = produto_repo.obter_produto_por_id(id_produto_inserido)
+        assert produto.estoque == 5, "O estoque deveria ter voltado para 5"
+
+    def test_reservar_estoque_carrinho_completo(self, test_db, lista_produtos_exemplo, lista_categorias_exemplo):
+        # Arrange: insere vários produtos (estoque 5, 10, 15, ...)
+        categoria_repo.criar_tabela_categorias()
+        for categoria in lista_categorias_exemplo:
+            categoria_repo.inserir_categoria(categoria)
+        produto_repo.criar_tabela_produtos()
+        for produto in lista_produtos_exemplo:
+            produto_repo.inserir_produto(produto)
+        # Act: reserva um carrinho com itens repetidos do mesmo produto
+        resultado = produto_repo.reservar_estoque_carrinho([(1, 2), (2, 10), (1, 3)])
+        # Assert: verifica se todos os itens foram reservados
+        assert resultado == True, "A reserva do carrinho deveria retornar True"
+        assert produto_repo.obter_produto_por_id(1).estoque == 0, "O estoque do produto 1 deveria ser 0"
+        assert produto_repo.obter_produto_por_id(2).estoque == 0, "O estoque do produto 2 deveria ser 0"
+
+    def test_reservar_estoque_carrinho_item_insuficiente(self, test_db, lista_produtos_exemplo, lista_categorias_exemplo):
+        # Arrange: insere vários produtos (estoque 5, 10, 15, ...)
+        categoria_repo.criar_tabela_categorias()
+        for categoria in lista_categorias_exemplo:
+            categoria_repo.inserir_categoria(categoria)
+        produto_repo.criar_tabela_produtos()
+        for produto in lista_produtos_exemplo:
+            produto_repo.inserir_produto(produto)
+        # Act: tenta reservar um carrinho em que o segundo item não tem estoque suficiente
+        resultado = produto_repo.reservar_estoque_carrinho([(1, 2), (2, 11)])
+        # Assert: verifica se nenhuma reserva foi mantida
+        assert resultado == False, "A reserva do carrinho deveria retornar False"
+        assert produto_repo.obter_produto_por_id(1).estoque == 5, "A reserva do produto 1 deveria ter sido desfeita"
+        assert produto_repo.obter_produto_por_id(2).estoque == 10, "O estoque do produto 2 não deveria ter sido alterado"
+
+    def test_obter_produtos_resumo_por_pagina(self, test_db, categoria_exemplo):
+        # Arrange: um produto com descrição longa e outro com descrição curta
+        categoria_repo.criar_tabela_categorias()
+        categoria_repo.inserir_categoria(categoria_exemplo)
+        produto_repo.criar_tabela_produtos()
+        produto_repo.inserir_produto(Produto(0, "Produto A", "Descrição longa " * 20, 10.0, 5, "a.jpg", 1))
+        produto_repo.inserir_produto(Produto(0, "Produto B", "Descrição curta", 20.0, 0, "b.jpg", 1))
+        # Act
+        produtos_pagina = produto_repo.obter_produtos_resumo_por_pagina(1, 10)
+        # Assert
+        assert [p.nome for p in produtos_pagina] == ["Produto A", "Produto B"], "Os produtos deveriam estar ordenados por nome"
+        assert all(isinstance(p, ProdutoResumo) for p in produtos_pagina), "A listagem deveria retornar resumos"
+        assert len(produtos_pagina[0].descricao_resumida) == 120, "A descrição longa deveria vir resumida do banco"
+        assert produtos_pagina[0].descricao_resumida.endswith("..."), "A descrição resumida deveria terminar com reticências"
+        assert produtos_pagina[1].descricao_resumida == "Descrição curta", "A descrição curta não deveria ser alterada"
@@ -0,0 +1,74 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from repo import categoria_repo, produto_repo
+from util import rastreamento
+
+def preparar_produtos(categoria, produtos) -> None:
+    # Cria as tabelas do catálogo e insere os produtos
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    for produto in produtos:
+        produto.id_categoria = 1
+        produto_repo.inserir_produto(produto)
+
+class TestRastreamento:
+    def test_normalizar(self):
+        # Arrange: comandos com valores diferentes
+        comando_a = "SELECT * FROM Produto WHERE id = 1 AND nome = 'a''b'"
+        comando_b = "SELECT * FROM Produto WHERE id = 25 AND nome = 'c'"
+        # Act / Assert: verifica que ambos são normalizados para o mesmo texto
+        assert rastreamento.normalizar(comando_a) == rastreamento.normalizar(comando_b), "Os literais deveriam ser removidos"
+
+    def test_middleware_informa_quantidade_de_comandos(self, test_db, monkeypatch, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange: ativa o rastreamento e cria uma aplicação com uma rota que consulta produtos
+        monkeypatch.setattr(rastreamento, "ATIVO", True)
+        preparar_produtos(categoria_exemplo, lista_produtos_exemplo)
+        app = FastAPI()
+        app.add_middleware(rastreamento.MiddlewareRastreamento)
+        @app.get("/produtos")
+        def listar():
+            return [produto_repo.obter_produto_por_id(id).nome for id in (1, 2)]
+        # Act: faz a requisição
+        resposta = TestClient(app).get("/produtos")
+        # Assert: verifica o cabeçalho com a quantidade de comandos
+        assert resposta.status_code == 200, "A requisição deveria ser atendida"
+        assert int(resposta.headers["x-query-count"]) == 2, "Deveria informar os dois comandos executados"
+        assert float(resposta.headers["x-query-time-ms"]) > 0, "Deveria informar o tempo dos comandos"
+
+    def test_analisar_avisa_n_mais_1(self, test_db, monkeypatch, caplog, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange: ativa o rastreamento com limite baixo para N+1
+        monkeypatch.setattr(rastreamento, "ATIVO", True)
+        monkeypatch.setattr(rastreamento, "LIMITE_N_MAIS_1", 5)
+        preparar_produtos(categoria_exemplo, lista_produtos_exemplo)
+        rastro = rastreamento.Rastro()
+        token = rastreamento._rastro.set(rastro)
+        # Act: consulta os produtos um a um (padrão N+1) e analisa o rastro
+        try:
+            for id in range(1, 8):
+                produto_repo.obter_produto_por_id(id)
+        finally:
+            rastreamento._rastro.reset(token)
+        with caplog.at_level(logging.WARNING, logger="util.rastreamento"):
+            rastreamento.analisar(rastro, "GET /teste")
+        # Assert: verifica o aviso de N+1
+        assert rastro.total == 7, "Deveria registrar os sete comandos"
+        assert any("N+1" in mensagem and "7 vezes" in mensagem for mensagem in caplog.messages), "Deveria avisar sobre N+1"
+
+    def test_executemany_conta_como_uma_chamada(self, test_db, monkeypatch, caplog, categoria_exemplo, lista_produtos_exemplo):
+        # Arrange: ativa o rastreamento com limite baixo para N+1
+        monkeypatch.setattr(rastreamento, "ATIVO", True)
+        monkeypatch.setattr(rastreamento, "LIMITE_N_MAIS_1", 3)
+        preparar_produtos(categoria_exemplo, lista_produtos_exemplo)
+        rastro = rastreamento.Rastro()
+        token = rastreamento._rastro.set(rastro)
+        # Act: reserva o estoque de vários produtos com um único executemany
+        try:
+            produto_repo.reservar_estoque_carrinho([(id, 1) for id in range(1, 8)])
+        finally:
+            rastreamento._rastro.reset(token)
+        with caplog.at_level(logging.WARNING, logger="util.rastreamento"):
+            rastreamento.analisar(rastro, "POST /teste")
+        # Assert: verifica que não há aviso de N+1
+        assert not any("N+1" in mensagem for mensagem in caplog.messages), "executemany não deveria ser tratado como N+1"
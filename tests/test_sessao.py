@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+import time
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from models.sessao import Sessao
+from repo import sessao_repo, usuario_repo
+from util import sessao, sincronizacao
+
+def criar_app() -> FastAPI:
+    # Cria uma aplicação mínima que entra, lê e sai da sessão, como as rotas do main.py
+    app = FastAPI()
+    @app.get("/entrar/{id}")
+    def entrar(request: Request, id: int):
+        request.session["usuario"] = {"id": id, "nome": "Usuário Teste", "tipo": "user"}
+        return {"ok": True}
+    @app.get("/eu")
+    def eu(request: Request):
+        return {"usuario": request.session.get("usuario")}
+    @app.get("/sair")
+    def sair(request: Request):
+        request.session.clear()
+        return {"ok": True}
+    app.add_middleware(sessao.MiddlewareSessao)
+    return app
+
+def preparar(usuario) -> tuple[TestClient, int]:
+    # Cria as tabelas de usuários e sessões, insere o usuário e começa com o cache vazio
+    usuario_repo.criar_tabela_usuarios()
+    id_usuario = usuario_repo.inserir_usuario(usuario)
+    sessao.limpar()
+    sincronizacao.sincronizar()
+    return TestClient(criar_app()), id_usuario
+
+class TestSessao:
+    def test_login_grava_sessao_no_servidor_com_cookie_opaco(self, test_db, usuario_exemplo):
+        # Arrange
+        cliente, id_usuario = preparar(usuario_exemplo)
+        # Act: entra e faz uma segunda requisição com o cookie recebido
+        cliente.get(f"/entrar/{id_usuario}")
+        token = cliente.cookies.get(sessao.NOME_COOKIE)
+        acertos = sessao._acertos
+        resposta = cliente.get("/eu")
+        # Assert: o cookie é só o identificador, os dados estão no banco e a leitura veio do cache
+        assert token and len(token) < 64, "O cookie deveria conter apenas um identificador curto"
+        assert "Usuário" not in token, "O cookie não deveria conter os dados da sessão"
+        gravada = sessao_repo.obter_sessao(sessao._hash(token), time.time())
+        assert gravada is not None and gravada.id_usuario == id_usuario, "A sessão deveria estar gravada no banco"
+        assert resposta.json()["usuario"]["id"] == id_usuario, "A sessão deveria ser lida na requisição seguinte"
+        assert "set-cookie" not in resposta.headers, "Uma sessão sem alterações não deveria reenviar o cookie"
+        assert sessao._acertos == acertos + 1, "A segunda leitura deveria ser atendida pelo cache"
+
+    def test_logout_remove_sessao(self, test_db, usuario_exemplo):
+        # Arrange
+        cliente, id_usuario = preparar(usuario_exemplo)
+        cliente.get(f"/entrar/{id_usuario}")
+        id_sessao = sessao._hash(cliente.cookies.get(sessao.NOME_COOKIE))
+        # Act
+        cliente.get("/sair")
+        resposta = cliente.get("/eu")
+        # Assert
+        assert sessao_repo.obter_sessao(id_sessao, time.time()) is None, "A sessão deveria ser removida do banco"
+        assert resposta.json()["usuario"] is None, "O usuário não deveria continuar logado"
+
+    def test_alterar_senha_revoga_sessoes(self, test_db, usuario_exemplo):
+        # Arrange: o usuário entra em dois navegadores
+        cliente, id_usuario = preparar(usuario_exemplo)
+        outro_cliente = TestClient(cliente.app)
+        cliente.get(f"/entrar/{id_usuario}")
+        outro_cliente.get(f"/entrar/{id_usuario}")
+        # Act
+        usuario_repo.atualizar_senha_usuario(id_usuario, "nova")
+        # Assert
+        assert cliente.get("/eu").json()["usuario"] is None, "A sessão deveria ser revogada"
+        assert outro_cliente.get("/eu").json()["usuario"] is None, "Todas as sessões do usuário deveriam ser revogadas"
+
+    def test_revogacao_em_outro_processo_limpa_cache(self, test_db, usuario_exemplo):
+        # Arrange: a sessão está no cache deste processo
+        cliente, id_usuario = preparar(usuario_exemplo)
+        cliente.get(f"/entrar/{id_usuario}")
+        sincronizacao.sincronizar()
+        # Act: outro processo revoga as sessões do usuário e este processo sincroniza
+        conexao = sqlite3.connect(test_db)
+        with conexao:
+            conexao.execute("DELETE FROM Sessao WHERE id_usuario = ?", (id_usuario,))
+        conexao.close()
+        sincronizacao.sincronizar()
+        # Assert
+        assert not sessao._cache, "A sessão revogada deveria sair do cache"
+        assert cliente.get("/eu").json()["usuario"] is None, "A sessão revogada não deveria ser aceita"
+
+    def test_excluir_sessoes_expiradas(self, test_db, usuario_exemplo):
+        # Arrange: uma sessão vencida e outra válida
+        _, id_usuario = preparar(usuario_exemplo)
+        agora = time.time()
+        sessao_repo.gravar_sessao(Sessao("vencida", id_usuario, {"a": 1}, agora - 10))
+        sessao_repo.gravar_sessao(Sessao("valida", id_usuario, {"a": 1}, agora + 3600))
+        # Act
+        removidas = sessao_repo.excluir_sessoes_expiradas(agora)
+        # Assert: só a vencida sai, e sem avisar os outros processos
+        assert removidas == 1, "Apenas a sessão vencida deveria ser removida"
+        assert sessao_repo.obter_sessao("valida", agora) is not None, "A sessão válida deveria continuar"
+        assert sincronizacao.sincronizar() == 0, "Remover sessões vencidas não deveria gerar alterações"
+
+    def test_acessos_ao_banco_fora_do_loop_de_eventos(self, test_db, usuario_exemplo, monkeypatch):
+        # Arrange: registra a thread de cada leitura e gravação de sessão
+        cliente, id_usuario = preparar(usuario_exemplo)
+        threads = []
+        for nome in ("obter_sessao", "gravar_sessao", "excluir_sessao"):
+            original = getattr(sessao_repo, nome)
+            def registrar(*args, original=original):
+                threads.append(threading.current_thread())
+                return original(*args)
+            monkeypatch.setattr(sessao_repo, nome, registrar)
+        # Act: entra, lê a sessão em um cache vazio (vai ao banco) e sai
+        cliente.get(f"/entrar/{id_usuario}")
+        sessao.limpar()
+        cliente.get("/sair")
+        # Assert: o loop de eventos do TestClient roda em outra thread, então basta conferir as do threadpool
+        assert len(threads) == 3, "A sessão deveria ser gravada, lida e excluída no banco"
+        assert all(thread.name == "AnyIO worker thread" for thread in threads), \
+            "Os acessos ao banco deveriam rodar no threadpool, sem bloquear o loop de eventos"
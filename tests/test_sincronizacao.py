@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from repo import categoria_repo, produto_repo
+from util import cache_produtos, sincronizacao
+
+def preparar_catalogo(categoria, produto) -> int:
+    # Cria as tabelas do catálogo, insere um produto e sincroniza o ponto de partida
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    id_produto = produto_repo.inserir_produto(produto)
+    sincronizacao.sincronizar()
+    cache_produtos.limpar()
+    return id_produto
+
+def executar_em_outro_processo(caminho_banco: str, comando: str, parametros: tuple = ()) -> None:
+    # Simula a escrita feita por outro worker, com uma conexão própria e sem passar pelos repositórios
+    conexao = sqlite3.connect(caminho_banco)
+    with conexao:
+        conexao.execute(comando, parametros)
+    conexao.close()
+
+class TestSincronizacao:
+    def test_sincronizar_sem_alteracoes(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: prepara o catálogo já sincronizado
+        preparar_catalogo(categoria_exemplo, produto_exemplo)
+        # Act: sincroniza sem nenhuma escrita nova
+        processadas = sincronizacao.sincronizar()
+        # Assert: verifica que nada foi processado
+        assert processadas == 0, "Não deveria haver alterações a processar"
+
+    def test_alteracao_de_produto_em_outro_processo_invalida_cache(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: coloca o payload do produto em cache
+        id_produto = preparar_catalogo(categoria_exemplo, produto_exemplo)
+        cache_produtos.armazenar(id_produto, b"{}", cache_produtos.geracao_atual())
+        cache_produtos.armazenar(999, b"{}", cache_produtos.geracao_atual())
+        # Act: outro processo altera o preço do produto e este processo sincroniza
+        executar_em_outro_processo(test_db, "UPDATE Produto SET preco = 1.0 WHERE id = ?", (id_produto,))
+        processadas = sincronizacao.sincronizar()
+        # Assert: verifica que apenas o produto alterado saiu do cache
+        assert processadas == 1, "Deveria haver uma alteração processada"
+        assert cache_produtos.obter(id_produto) is None, "O produto alterado deveria sair do cache"
+        assert cache_produtos.obter(999) == b"{}", "Os demais produtos deveriam continuar em cache"
+
+    def test_alteracao_de_categoria_em_outro_processo_limpa_cache(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: coloca o payload do produto em cache
+        id_produto = preparar_catalogo(categoria_exemplo, produto_exemplo)
+        cache_produtos.armazenar(id_produto, b"{}", cache_produtos.geracao_atual())
+        # Act: outro processo renomeia a categoria e este processo sincroniza
+        executar_em_outro_processo(test_db, "UPDATE Categoria SET nome = 'Renomeada' WHERE id = 1")
+        sincronizacao.sincronizar()
+        # Assert: verifica que o cache foi esvaziado
+        assert cache_produtos.estatisticas()["entradas"] == 0, "O cache deveria ter sido esvaziado"
+
+    def test_alteracoes_podadas_limpam_cache(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange: coloca payloads em cache e gera duas alterações, removendo a primeira (como na poda)
+        id_produto = preparar_catalogo(categoria_exemplo, produto_exemplo)
+        cache_produtos.armazenar(999, b"{}", cache_produtos.geracao_atual())
+        executar_em_outro_processo(test_db, "UPDATE Produto SET preco = 1.0 WHERE id = ?", (id_produto,))
+        executar_em_outro_processo(test_db, "UPDATE Produto SET preco = 2.0 WHERE id = ?", (id_produto,))
+        executar_em_outro_processo(test_db, "DELETE FROM Alteracao WHERE seq = (SELECT MAX(seq) - 1 FROM Alteracao)")
+        # Act: sincroniza com alterações perdidas
+        sincronizacao.sincronizar()
+        # Assert: verifica que todo o cache foi descartado por segurança
+        assert cache_produtos.obter(999) is None, "O cache deveria ter sido esvaziado"
+
+    def test_middleware_sincroniza_fora_do_loop_de_eventos(self, test_db, categoria_exemplo, produto_exemplo, monkeypatch):
+        # Arrange: registra a thread em que o callback de produtos é chamado
+        id_produto = preparar_catalogo(categoria_exemplo, produto_exemplo)
+        threads = []
+        callbacks = {**sincronizacao._callbacks,
+            "produto": sincronizacao._callbacks.get("produto", []) + [lambda chaves: threads.append(threading.current_thread())]}
+        monkeypatch.setattr(sincronizacao, "_callbacks", callbacks)
+        app = FastAPI()
+        app.get("/")(lambda: {})
+        app.add_middleware(sincronizacao.MiddlewareSincronizacao)
+        # Act: outro processo altera o produto e chega uma requisição
+        executar_em_outro_processo(test_db, "UPDATE Produto SET preco = 1.0 WHERE id = ?", (id_produto,))
+        TestClient(app).get("/")
+        # Assert: o loop de eventos do TestClient roda em outra thread, então basta conferir a do threadpool
+        assert len(threads) == 1, "A alteração deveria ser repassada ao callback"
+        assert threads[0].name == "AnyIO worker thread", \
+            "A sincronização deveria rodar no threadpool, sem bloquear o loop de eventos"
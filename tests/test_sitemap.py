@@ -0,0 +1,80 @@
+import os
+import xml.etree.ElementTree as ET
+import pytest
+from models.produto import Produto
+from repo import categoria_repo, produto_repo
+from util import sitemap
+
+NS_SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+NS_GOOGLE = "{http://base.google.com/ns/1.0}"
+URL_BASE = "http://loja.test/"
+
+@pytest.fixture
+def diretorio_sitemap(tmp_path, monkeypatch):
+    # Grava os arquivos em um diretório temporário e gera sempre que o catálogo mudar
+    monkeypatch.setattr(sitemap, "DIRETORIO", str(tmp_path))
+    monkeypatch.setattr(sitemap, "INTERVALO_MINIMO", 0)
+    yield tmp_path
+    # Não deixa gerações em segundo plano rodando para o próximo teste
+    sitemap.aguardar()
+
+def preparar_catalogo(categoria, produtos: list[tuple[str, int]]) -> list[int]:
+    # Cria as tabelas do catálogo e insere os produtos (nome, estoque)
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    return [produto_repo.inserir_produto(Produto(0, nome, "Descrição", 10.0, estoque, "produto.jpg", 1))
+        for nome, estoque in produtos]
+
+def ler_xml(nome: str) -> ET.Element:
+    # Lê o arquivo da versão atual com os links montados para URL_BASE
+    return ET.fromstring(b"".join(sitemap.ler(sitemap.obter_caminho(nome), URL_BASE)))
+
+class TestSitemap:
+    def test_sitemap_dividido_em_indice(self, test_db, diretorio_sitemap, categoria_exemplo, monkeypatch):
+        # Arrange: página inicial + 8 produtos, com no máximo 3 URLs por arquivo
+        monkeypatch.setattr(sitemap, "URLS_POR_ARQUIVO", 3)
+        ids = preparar_catalogo(categoria_exemplo, [(f"Produto {i}", 5) for i in range(8)])
+        # Act
+        indice = ler_xml("sitemap.xml")
+        ultima_parte = ler_xml("sitemap-3.xml")
+        # Assert
+        assert indice.tag == f"{NS_SITEMAP}sitemapindex", "Acima do limite de URLs, sitemap.xml deveria ser um índice"
+        assert [loc.text for loc in indice.iter(f"{NS_SITEMAP}loc")] == \
+            [f"{URL_BASE}sitemaps/sitemap-{parte}.xml" for parte in range(1, 4)], "O índice deveria listar as 3 partes"
+        assert [loc.text for loc in ultima_parte.iter(f"{NS_SITEMAP}loc")] == \
+            [f"{URL_BASE}produtos/{id}" for id in ids[5:]], "A última parte deveria ter os produtos restantes"
+        assert sitemap.obter_caminho("sitemap-4.xml") is None, "Partes além da última não deveriam existir"
+
+    def test_gerado_apenas_quando_catalogo_muda(self, test_db, diretorio_sitemap, categoria_exemplo):
+        # Arrange
+        ids = preparar_catalogo(categoria_exemplo, [("Produto A", 5), ("Produto B", 5)])
+        geracoes = sitemap._geracoes
+        # Act: duas leituras sem alterações e duas após excluir um produto, antes e depois da geração em segundo plano
+        primeira = sitemap.preparar()
+        segunda = sitemap.preparar()
+        produto_repo.excluir_produto(ids[1])
+        terceira = sitemap.preparar()
+        sitemap.aguardar()
+        quarta = sitemap.preparar()
+        locs = [loc.text for loc in ler_xml("sitemap.xml").iter(f"{NS_SITEMAP}loc")]
+        # Assert
+        assert primeira == segunda, "Sem alterações no catálogo, os arquivos gerados deveriam ser reaproveitados"
+        assert terceira == primeira, "Durante a geração da nova versão, a anterior deveria continuar sendo servida"
+        assert quarta != primeira, "A alteração do catálogo deveria gerar uma nova versão"
+        assert sitemap._geracoes == geracoes + 2, "Deveria haver uma geração por versão do catálogo"
+        assert f"{URL_BASE}produtos/{ids[1]}" not in locs, "O produto excluído deveria sair do sitemap"
+        assert os.path.isdir(primeira), "A versão anterior deveria ser mantida durante a troca"
+
+    def test_feed_de_produtos(self, test_db, diretorio_sitemap, categoria_exemplo):
+        # Arrange
+        ids = preparar_catalogo(categoria_exemplo, [("Fone & Microfone", 3), ("Cabo USB", 0)])
+        # Act
+        itens = ler_xml("produtos.xml").findall("channel/item")
+        # Assert
+        assert [item.findtext("title") for item in itens] == ["Fone & Microfone", "Cabo USB"], \
+            "O feed deveria ter todos os produtos, com o texto escapado"
+        assert itens[0].findtext("link") == f"{URL_BASE}produtos/{ids[0]}", "O link deveria usar o endereço da requisição"
+        assert itens[0].findtext(f"{NS_GOOGLE}price") == "10.00 BRL", "O preço deveria estar no formato do feed"
+        assert [item.findtext(f"{NS_GOOGLE}availability") for item in itens] == ["in_stock", "out_of_stock"], \
+            "A disponibilidade deveria seguir o estoque"
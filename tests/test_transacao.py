@@ -0,0 +1,67 @@
+import pytest
+from models.produto import Produto
+from repo import categoria_repo, produto_repo
+from util import cache_produtos
+from util.database import transacao
+
+def preparar_produto(categoria, produto) -> int:
+    # Cria as tabelas do catálogo e insere um produto
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    return produto_repo.inserir_produto(produto)
+
+class TestTransacao:
+    def test_repositorios_participam_da_transacao(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange
+        id = preparar_produto(categoria_exemplo, produto_exemplo)
+        # Act: altera o produto e insere outro, mas falha antes do fim
+        with pytest.raises(RuntimeError):
+            with transacao():
+                produto = produto_repo.obter_produto_por_id(id)
+                produto.nome = "Produto Alterado"
+                produto_repo.atualizar_produto(produto)
+                produto_repo.inserir_produto(Produto(0, "Outro", "Descrição", 1.0, 1, "outro.jpg", 1))
+                raise RuntimeError("falha no meio da operação")
+        # Assert
+        assert produto_repo.obter_produto_por_id(id).nome == "Produto Teste", "A alteração deveria ser desfeita"
+        assert len(produto_repo.obter_nomes_produtos()) == 1, "A inserção deveria ser desfeita"
+
+    def test_confirma_tudo_no_fim(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange
+        id = preparar_produto(categoria_exemplo, produto_exemplo)
+        # Act
+        with transacao():
+            produto_repo.reservar_estoque(id, 2)
+            produto_repo.reservar_estoque(id, 1)
+        # Assert
+        assert produto_repo.obter_produto_por_id(id).estoque == 2, "As duas reservas deveriam ser confirmadas"
+
+    def test_savepoint_desfaz_apenas_o_bloco_interno(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange
+        id = preparar_produto(categoria_exemplo, produto_exemplo)
+        # Act: uma reserva confirmada, um bloco interno que falha e um carrinho sem estoque (desfeito pelo repositório)
+        with transacao():
+            produto_repo.reservar_estoque(id, 1)
+            with pytest.raises(RuntimeError):
+                with transacao():
+                    produto_repo.reservar_estoque(id, 1)
+                    raise RuntimeError("falha no bloco interno")
+            reservado = produto_repo.reservar_estoque_carrinho([(id, 1), (id + 1, 1)])
+        # Assert
+        assert not reservado, "O carrinho com produto inexistente não deveria ser reservado"
+        assert produto_repo.obter_produto_por_id(id).estoque == 4, "Apenas a primeira reserva deveria permanecer"
+
+    def test_invalidacao_do_cache_apenas_apos_commit(self, test_db, categoria_exemplo, produto_exemplo):
+        # Arrange
+        id = preparar_produto(categoria_exemplo, produto_exemplo)
+        cache_produtos.limpar()
+        cache_produtos.armazenar(id, b"{}", cache_produtos.geracao_atual())
+        # Act
+        with transacao():
+            produto_repo.reservar_estoque(id, 1)
+            durante = cache_produtos.obter(id)
+        depois = cache_produtos.obter(id)
+        # Assert
+        assert durante == b"{}", "O cache não deveria ser invalidado antes do commit"
+        assert depois is None, "O cache deveria ser invalidado após o commit"
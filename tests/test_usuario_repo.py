@@ -1,4 +1,5 @@
 from models.usuario import Usuario
+from models.usuario_resumo import UsuarioResumo
 from repo import usuario_repo
 
 class TestUsuarioRepo:
@@ -174,4 +175,17 @@ class TestUsuarioRepo:
         pagina_usuarios = usuario_repo.obter_usuarios_por_pagina(3, 4)
         # Assert: verifica se retornou a quantidade correta (2 usuários na terceira página)
         assert len(pagina_usuarios) == 2, "Deveria retornar 2 usuários na terceira página"
-        assert (isinstance(u, Usuario) for u in pagina_usuarios), "Todos os itens da página devem ser do tipo Usuario"
\ No newline at end of file
+        assert (isinstance(u, Usuario) for u in pagina_usuarios), "Todos os itens da página devem ser do tipo Usuario"
+
+    def test_obter_usuarios_resumo_por_pagina(self, test_db, lista_usuarios_exemplo):
+        # Arrange
+        usuario_repo.criar_tabela_usuarios()
+        for usuario in lista_usuarios_exemplo:
+            usuario_repo.inserir_usuario(usuario)
+        # Act
+        pagina_usuarios = usuario_repo.obter_usuarios_resumo_por_pagina(1, 2)
+        # Assert
+        assert [u.id for u in pagina_usuarios] == [1, 2], "Os IDs dos usuários na primeira página não estão corretos"
+        assert all(isinstance(u, UsuarioResumo) for u in pagina_usuarios), "A listagem deveria retornar resumos"
+        assert pagina_usuarios[1].data_nascimento == "02/01/2000", "A data deveria vir formatada pelo banco"
+        assert not hasattr(pagina_usuarios[0], "senha_hash"), "O resumo não deveria carregar a senha"
@@ -0,0 +1,99 @@
+import sqlite3
+import time
+import pytest
+from models.produto import Produto
+from repo import categoria_repo, produto_repo
+from util import sincronizacao, visualizacoes
+
+@pytest.fixture
+def contadores(test_db, monkeypatch):
+    # Sem contadores de outros testes nem thread de gravação iniciada por eles
+    visualizacoes.limpar()
+    visualizacoes.parar()
+    # Sem gravações periódicas durante o teste (as descargas são explícitas)
+    monkeypatch.setattr(visualizacoes, "INTERVALO", 3600)
+    yield
+    # Encerra a thread de gravação iniciada pelas visualizações e descarta o que sobrou
+    visualizacoes.parar()
+    visualizacoes.limpar()
+
+def preparar_catalogo(categoria, quantidade: int) -> list[int]:
+    # Cria as tabelas do catálogo e insere os produtos
+    categoria_repo.criar_tabela_categorias()
+    categoria_repo.inserir_categoria(categoria)
+    produto_repo.criar_tabela_produtos()
+    ids = [produto_repo.inserir_produto(Produto(0, f"Produto {i}", "Descrição", 10.0, 5, "produto.jpg", 1))
+        for i in range(quantidade)]
+    sincronizacao.sincronizar()
+    return ids
+
+def registrar(visualizacoes_por_produto: dict[int, int]) -> None:
+    # Registra as visualizações como as requisições a /produtos/{id}
+    for id, quantidade in visualizacoes_por_produto.items():
+        for _ in range(quantidade):
+            visualizacoes.registrar(id)
+
+def gravadas(caminho_banco: str) -> dict[int, int]:
+    # Visualizações gravadas na tabela de estatísticas, lidas com uma conexão própria
+    conexao = sqlite3.connect(caminho_banco)
+    try:
+        return dict(conexao.execute("SELECT id_produto, visualizacoes FROM ProdutoEstatistica").fetchall())
+    finally:
+        conexao.close()
+
+class TestVisualizacoes:
+    def test_visualizacoes_gravadas_em_lote(self, test_db, contadores, categoria_exemplo):
+        # Arrange
+        ids = preparar_catalogo(categoria_exemplo, 3)
+        # Act: registra visualizações e verifica o banco antes e depois da descarga
+        registrar({ids[0]: 2, ids[1]: 5, ids[2]: 1})
+        antes = gravadas(test_db)
+        quantidade = visualizacoes.descarregar()
+        depois = gravadas(test_db)
+        # Assert
+        assert antes == {}, "Nenhuma visualização deveria ser gravada antes da descarga"
+        assert quantidade == 3, "Todos os produtos visualizados deveriam ser gravados de uma vez"
+        assert depois == {ids[0]: 2, ids[1]: 5, ids[2]: 1}, "As somas deveriam ser gravadas na tabela de estatísticas"
+        assert [p.id for p in visualizacoes.mais_vistos(10)] == [ids[1], ids[0], ids[2]], "O ranking deveria seguir as visualizações"
+
+    def test_descargas_somam_contadores(self, test_db, contadores, categoria_exemplo):
+        # Arrange
+        ids = preparar_catalogo(categoria_exemplo, 2)
+        # Act: o segundo produto passa o primeiro ao longo de duas descargas
+        registrar({ids[0]: 3, ids[1]: 1})
+        visualizacoes.descarregar()
+        primeiro = [p.id for p in visualizacoes.mais_vistos(2)]
+        registrar({ids[1]: 4})
+        visualizacoes.descarregar()
+        segundo = [p.id for p in visualizacoes.mais_vistos(2)]
+        # Assert
+        assert gravadas(test_db) == {ids[0]: 3, ids[1]: 5}, "A segunda descarga deveria somar às visualizações gravadas"
+        assert primeiro == [ids[0], ids[1]], "O ranking inicial deveria ter o primeiro produto à frente"
+        assert segundo == [ids[1], ids[0]], "O ranking deveria ser relido após a descarga"
+
+    def test_produto_excluido_sai_do_ranking(self, test_db, contadores, categoria_exemplo):
+        # Arrange
+        ids = preparar_catalogo(categoria_exemplo, 2)
+        registrar({ids[0]: 2, ids[1]: 1})
+        visualizacoes.descarregar()
+        visualizacoes.mais_vistos(2)
+        # Act: exclui um produto do ranking e outro que só tem visualizações pendentes
+        produto_repo.excluir_produto(ids[0])
+        registrar({ids[0]: 1})
+        sincronizacao.sincronizar()
+        visualizacoes.descarregar()
+        # Assert
+        assert [p.id for p in visualizacoes.mais_vistos(2)] == [ids[1]], "O produto excluído deveria sair do ranking"
+        assert gravadas(test_db) == {ids[1]: 1}, "As visualizações do produto excluído não deveriam ser gravadas"
+
+    def test_thread_grava_periodicamente(self, test_db, contadores, categoria_exemplo, monkeypatch):
+        # Arrange: intervalo curto entre as gravações
+        ids = preparar_catalogo(categoria_exemplo, 1)
+        monkeypatch.setattr(visualizacoes, "INTERVALO", 0.01)
+        # Act: a primeira visualização inicia a thread, que grava sem descarga explícita
+        registrar({ids[0]: 3})
+        limite = time.monotonic() + 5
+        while not gravadas(test_db) and time.monotonic() < limite:
+            time.sleep(0.01)
+        # Assert
+        assert gravadas(test_db) == {ids[0]: 3}, "A thread de gravação deveria gravar as visualizações registradas"
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import re
+from typing import Optional
+from util import metricas
+from util.database import LOJA_PADRAO, loja_atual
+
+# Controle de admissão: limita as requisições simultâneas por classe de rota (catálogo, autenticação,
+# administração e demais), com uma fila de espera limitada. Quando a fila está cheia ou a espera
+# passa do limite, responde 503 com Retry-After na hora, em vez de acumular requisições no
+# threadpool esperando pelo SQLite. Os limites são por processo (worker) e por loja: cada banco tem
+# o próprio lock de escrita, então a carga de uma loja não consome as vagas das outras.
+
+# Classe de cada rota: (métodos, expressão do caminho, classe), avaliadas em ordem; None = sem limite
+REGRAS = [
+    (None, re.compile(r"^/metrics$"), None),
+    (None, re.compile(r"^/(usuarios|categorias/(inserir|alterar|excluir)|produtos/importar)(/|$)"), "admin"),
+    (None, re.compile(r"^/(login|logout|cadastrar|senha|perfil)(/|$)"), "auth"),
+    ({"GET", "HEAD"}, re.compile(r"^/($|produtos|categorias|api/)"), "catalogo"),
+]
+CLASSE_PADRAO = "geral"
+
+def _limites(classe: str, simultaneas: int, fila: int) -> tuple[int, int]:
+    # Lê os limites da classe das variáveis de ambiente (ex.: ADMISSAO_CATALOGO=24, ADMISSAO_CATALOGO_FILA=100)
+    prefixo = f"ADMISSAO_{classe.upper()}"
+    return int(os.environ.get(prefixo, simultaneas)), int(os.environ.get(f"{prefixo}_FILA", fila))
+
+# Requisições simultâneas e tamanho da fila de cada classe (o threadpool padrão tem 40 threads)
+LIMITES = {
+    "catalogo": _limites("catalogo", 24, 100),
+    "auth": _limites("auth", 8, 50),
+    "admin": _limites("admin", 4, 10),
+    "geral": _limites("geral", 8, 50),
+}
+# Tempo máximo de espera na fila, em segundos, e o valor do Retry-After das respostas 503
+ESPERA_MAXIMA = float(os.environ.get('ADMISSAO_ESPERA_MAXIMA', '2'))
+RETRY_AFTER = os.environ.get('ADMISSAO_RETRY_AFTER', '1')
+
+class Orcamento:
+    # Vagas de uma classe de rotas, com contadores de admitidas, rejeitadas, ativas e em espera
+    def __init__(self, simultaneas: int, fila: int):
+        self.simultaneas = simultaneas
+        self.fila = fila
+        self.ativas = 0
+        self.esperando = 0
+        self.admitidas = 0
+        self.rejeitadas = 0
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def semaforo(self) -> asyncio.Semaphore:
+        # O semáforo pertence ao event loop; é recriado se o loop mudar (ex.: nos testes)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.simultaneas)
+            self._loop = loop
+        return self._semaforo
+
+    async def entrar(self) -> bool:
+        semaforo = self.semaforo()
+        # Sem vaga livre e com a fila cheia, rejeita imediatamente
+        if semaforo.locked() and self.esperando >= self.fila:
+            self.rejeitadas += 1
+            return False
+        self.esperando += 1
+        try:
+            await asyncio.wait_for(semaforo.acquire(), ESPERA_MAXIMA)
+        except asyncio.TimeoutError:
+            # Esperou demais na fila
+            self.rejeitadas += 1
+            return False
+        finally:
+            self.esperando -= 1
+        self.ativas += 1
+        self.admitidas += 1
+        return True
+
+    def sair(self) -> None:
+        self.ativas -= 1
+        self._semaforo.release()
+
+# Orçamentos da loja padrão indexados pela classe; os das demais lojas, por "classe@loja", criados no primeiro uso
+ORCAMENTOS = {classe: Orcamento(*limites) for classe, limites in LIMITES.items()}
+
+def obter_orcamento(classe: str) -> Orcamento:
+    # Orçamento da classe na loja corrente
+    loja = loja_atual()
+    chave = classe if loja == LOJA_PADRAO else f"{classe}@{loja}"
+    orcamento = ORCAMENTOS.get(chave)
+    if orcamento is None:
+        orcamento = ORCAMENTOS.setdefault(chave, Orcamento(*LIMITES[classe]))
+    return orcamento
+
+def caminho_da_rota(scope) -> str:
+    # Caminho sem o root_path (prefixo da loja ou --root-path do servidor), que continua no início de "path"
+    caminho, raiz = scope["path"], scope.get("root_path", "")
+    if raiz and caminho.startswith(raiz) and caminho[len(raiz):len(raiz) + 1] in ("", "/"):
+        return caminho[len(raiz):] or "/"
+    return caminho
+
+def classificar(metodo: str, caminho: str) -> Optional[str]:
+    # Retorna a classe da rota pela primeira regra que combinar (None = sem limite)
+    for metodos, expressao, classe in REGRAS:
+        if (metodos is None or metodo in metodos) and expressao.match(caminho):
+            return classe
+    return CLASSE_PADRAO
+
+async def responder_sobrecarga(send) -> None:
+    # Resposta 503 mínima, sem passar pela aplicação
+    corpo = b'{"detail":"Servidor sobrecarregado, tente novamente em instantes"}'
+    await send({"type": "http.response.start", "status": 503, "headers": [
+        (b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode()),
+        (b"retry-after", RETRY_AFTER.encode())]})
+    await send({"type": "http.response.body", "body": corpo})
+
+class MiddlewareAdmissao:
+    # Middleware ASGI que aplica os orçamentos de cada classe de rota
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Classifica pelo caminho sem o prefixo da loja (root_path)
+        classe = classificar(scope["method"], caminho_da_rota(scope)) if scope["type"] == "http" else None
+        if classe is None:
+            await self.app(scope, receive, send)
+            return
+        orcamento = obter_orcamento(classe)
+        if not await orcamento.entrar():
+            await responder_sobrecarga(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            orcamento.sair()
+
+# Exporta os contadores de cada classe no endpoint de métricas
+metricas.registrar_indicador("loja_admissao_admitidas_total", "counter", "Requisições admitidas por classe de rota",
+    lambda: {classe: orcamento.admitidas for classe, orcamento in list(ORCAMENTOS.items())}, rotulo="classe")
+metricas.registrar_indicador("loja_admissao_rejeitadas_total", "counter", "Requisições rejeitadas com 503 por classe de rota",
+    lambda: {classe: orcamento.rejeitadas for classe, orcamento in list(ORCAMENTOS.items())}, rotulo="classe")
+metricas.registrar_indicador("loja_admissao_ativas", "gauge", "Requisições em atendimento por classe de rota",
+    lambda: {classe: orcamento.ativas for classe, orcamento in list(ORCAMENTOS.items())}, rotulo="classe")
+metricas.registrar_indicador("loja_admissao_em_espera", "gauge", "Requisições na fila de espera por classe de rota",
+    lambda: {classe: orcamento.esperando for classe, orcamento in list(ORCAMENTOS.items())}, rotulo="classe")
@@ -5,9 +5,6 @@ import hashlib
 from models.usuario import Usuario
 from repo import usuario_repo
 
-# Chave secreta utilizada para criptografia de sessões
-SECRET_KEY="cae3def7c5c8f5c07613a742c1c5435076ccf0777c259796ad1653c0fd5dfdd7"
-
 def hash_senha(senha: str) -> str:
     # Converte a senha para bytes e aplica hash SHA256
     # Retorna o hash como string hexadecimal
@@ -0,0 +1,159 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Optional
+from repo import produto_repo
+from util import metricas, sincronizacao
+from util.database import loja_atual
+
+# Índice em memória para autocompletar nomes de produtos sem consultar o banco a cada tecla.
+# Cada produto gera uma entrada com o nome inteiro e uma para cada palavra seguinte ("notebook lenovo pro",
+# "lenovo pro", "pro"), normalizadas sem acentos e em minúsculas, em listas ordenadas percorridas com bisect.
+# Cada loja tem o seu próprio índice.
+
+# Quantidade de caracteres de cada entrada do índice (consultas maiores são conferidas no nome completo)
+TAMANHO_CHAVE = 40
+# Separador entre a chave e o ID do produto (menor que qualquer caractere das chaves)
+SEPARADOR = "\x00"
+# Sequências de pontuação e espaços, trocadas por um espaço simples
+NAO_ALFANUMERICO = re.compile(r"[\W_]+")
+
+class _Indice:
+    def __init__(self):
+        # Entradas do início do nome (ordenadas primeiro nos resultados) e das demais palavras
+        self.inicio: list[str] = []
+        self.palavras: list[str] = []
+        # Nome original de cada produto indexado
+        self.nomes: dict[int, str] = {}
+        self.construido = False
+
+# Índice de cada loja, indexado pelo nome da loja
+_indices: dict[str, _Indice] = {}
+# Trava que protege as listas durante buscas e atualizações
+_trava = threading.Lock()
+
+def _indice() -> _Indice:
+    # Índice da loja corrente, criado vazio no primeiro uso
+    indice = _indices.get(loja_atual())
+    if indice is None:
+        indice = _indices.setdefault(loja_atual(), _Indice())
+    return indice
+
+def normalizar(texto: str) -> str:
+    # Remove acentos (só há o que decompor fora do ASCII) e converte para minúsculas
+    if not texto.isascii():
+        texto = "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+    # Troca pontuação e espaços repetidos por espaços simples
+    return NAO_ALFANUMERICO.sub(" ", texto.casefold()).strip()
+
+def _entradas(id: int, nome: str) -> tuple[Optional[str], list[str]]:
+    # Gera a entrada do nome inteiro e as entradas a partir de cada palavra seguinte
+    palavras = normalizar(nome).split()
+    if not palavras:
+        return None, []
+    sufixo = f"{SEPARADOR}{id}"
+    inicio = " ".join(palavras)[:TAMANHO_CHAVE] + sufixo
+    demais = [" ".join(palavras[i:])[:TAMANHO_CHAVE] + sufixo for i in range(1, len(palavras))]
+    return inicio, demais
+
+def _remover_entrada(lista: list[str], entrada: str) -> None:
+    # Localiza a entrada por busca binária e a remove
+    posicao = bisect_left(lista, entrada)
+    if posicao < len(lista) and lista[posicao] == entrada:
+        del lista[posicao]
+
+def construir() -> int:
+    # Lê o nome de todos os produtos e monta as listas ordenadas de uma vez
+    nomes = dict(produto_repo.obter_nomes_produtos())
+    inicio, palavras = [], []
+    for id, nome in nomes.items():
+        entrada, demais = _entradas(id, nome)
+        if entrada is not None:
+            inicio.append(entrada)
+            palavras.extend(demais)
+    inicio.sort()
+    palavras.sort()
+    # Troca o índice inteiro sob a trava
+    indice = _indice()
+    with _trava:
+        indice.inicio, indice.palavras, indice.nomes, indice.construido = inicio, palavras, nomes, True
+    # Retorna a quantidade de produtos indexados
+    return len(nomes)
+
+def limpar() -> None:
+    with _trava:
+        # Descarta o índice da loja; ele será reconstruído na próxima busca
+        _indices.pop(loja_atual(), None)
+
+def atualizar(id: int, nome: Optional[str]) -> None:
+    indice = _indice()
+    with _trava:
+        # Nome inalterado (ex.: só o preço ou o estoque mudou): as entradas continuam válidas
+        if indice.nomes.get(id) == nome:
+            return
+        # Remove as entradas do nome anterior do produto
+        anterior = indice.nomes.pop(id, None)
+        if anterior is not None:
+            entrada, demais = _entradas(id, anterior)
+            if entrada is not None:
+                _remover_entrada(indice.inicio, entrada)
+            for entrada in demais:
+                _remover_entrada(indice.palavras, entrada)
+        # Produto excluído: não há nome novo para indexar
+        if nome is None:
+            return
+        # Insere as entradas do nome atual nas posições ordenadas
+        indice.nomes[id] = nome
+        entrada, demais = _entradas(id, nome)
+        if entrada is not None:
+            insort(indice.inicio, entrada)
+        for entrada in demais:
+            insort(indice.palavras, entrada)
+
+def aplicar_alteracoes(ids: Optional[set[int]]) -> None:
+    # Alterações em lote (None) reconstroem o índice, se ele já tiver sido construído
+    if not _indice().construido:
+        return
+    if ids is None:
+        construir()
+        return
+    # Relê apenas os nomes dos produtos alterados (os ausentes foram excluídos)
+    nomes = dict(produto_repo.obter_nomes_produtos(list(ids)))
+    for id in ids:
+        atualizar(id, nomes.get(id))
+
+def buscar(consulta: str, limite: int = 10) -> list[dict]:
+    # Constrói o índice na primeira busca, se ele não foi construído na inicialização
+    indice = _indice()
+    if not indice.construido:
+        construir()
+    chave = normalizar(consulta)
+    if not chave:
+        return []
+    prefixo = chave[:TAMANHO_CHAVE]
+    resultados, vistos = [], set()
+    with _trava:
+        # Primeiro os nomes que começam pela consulta, depois os que têm uma palavra começando por ela
+        for lista in (indice.inicio, indice.palavras):
+            posicao = bisect_left(lista, prefixo)
+            while posicao < len(lista) and len(resultados) < limite and lista[posicao].startswith(prefixo):
+                id = int(lista[posicao].rsplit(SEPARADOR, 1)[1])
+                posicao += 1
+                if id in vistos:
+                    continue
+                nome = indice.nomes[id]
+                # Consultas maiores que a chave são conferidas no nome normalizado completo
+                if len(chave) > TAMANHO_CHAVE and f" {chave}" not in f" {normalizar(nome)}":
+                    continue
+                vistos.add(id)
+                resultados.append({"id": id, "nome": nome})
+    # Retorna até "limite" produtos, na ordem alfabética da parte do nome que combinou
+    return resultados
+
+# Mantém o índice coerente com as alterações de produtos feitas por qualquer processo
+sincronizacao.registrar("produto", aplicar_alteracoes)
+
+# Expõe o tamanho do índice no endpoint de métricas
+metricas.registrar_indicador("loja_autocomplete_produtos", "gauge",
+    "Produtos no índice de autocompletar", lambda: sum(len(indice.nomes) for indice in list(_indices.values())))
@@ -0,0 +1,139 @@
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable
+from util.database import obter_caminho_banco, obter_loja, todas_as_lojas, usar_loja
+
+# Backups online do banco com a API de backup do SQLite: copia poucas páginas por vez e
+# pausa entre os passos para não segurar os escritores, verifica a integridade de cada cópia
+# e mantém apenas os backups mais recentes. Com várias lojas (LOJAS), copia o banco de cada uma,
+# as demais em um subdiretório com o nome da loja.
+# Uso: python -m util.backup --destino backups --manter 7 --intervalo 3600 [--loja moda]
+
+# Prefixo e formato do nome dos arquivos de backup (a ordem alfabética é a cronológica)
+PREFIXO_BACKUP = "backup_"
+FORMATO_DATA = "%Y%m%d_%H%M%S"
+
+def copiar_banco(caminho_destino: str, paginas_por_passo: int = 256, pausa: float = 0.005) -> dict:
+    # Abre a origem (banco da aplicação) e o arquivo de destino
+    origem = sqlite3.connect(obter_caminho_banco())
+    destino = sqlite3.connect(caminho_destino)
+    estado = {"passos": 0, "reinicios": 0, "restantes": None, "total": 0}
+    def progresso(status: int, restantes: int, total: int) -> None:
+        # Se restam mais páginas que no passo anterior, outro processo escreveu e a cópia recomeçou
+        if estado["restantes"] is not None and restantes > estado["restantes"]:
+            estado["reinicios"] += 1
+        estado.update(passos=estado["passos"] + 1, restantes=restantes, total=total)
+        # Pausa entre os passos, liberando o banco para os escritores
+        if restantes and pausa:
+            time.sleep(pausa)
+    inicio = time.perf_counter()
+    try:
+        # Copia o banco em passos de poucas páginas
+        origem.backup(destino, pages=paginas_por_passo, progress=progresso)
+    finally:
+        destino.close()
+        origem.close()
+    # Retorna as medições da cópia
+    duracao = time.perf_counter() - inicio
+    tamanho = os.path.getsize(caminho_destino)
+    return {
+        "paginas": estado["total"],
+        "passos": estado["passos"],
+        "reinicios": estado["reinicios"],
+        "bytes": tamanho,
+        "duracao": duracao,
+        "mb_por_segundo": tamanho / (1024 * 1024) / duracao if duracao else 0.0,
+    }
+
+def verificar_integridade(caminho: str) -> bool:
+    # Executa PRAGMA integrity_check, que retorna uma única linha "ok" quando não há problemas
+    conexao = sqlite3.connect(caminho)
+    try:
+        resultado = conexao.execute("PRAGMA integrity_check").fetchall()
+    except sqlite3.DatabaseError:
+        # Arquivo que nem chega a ser lido como banco SQLite
+        return False
+    finally:
+        conexao.close()
+    return resultado == [("ok",)]
+
+def listar_backups(diretorio: str) -> list[str]:
+    # Lista os arquivos de backup do diretório, do mais antigo para o mais recente
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+                  if nome.startswith(PREFIXO_BACKUP) and nome.endswith(".db"))
+
+def aplicar_retencao(diretorio: str, manter: int) -> list[str]:
+    # Remove os backups mais antigos, mantendo apenas os "manter" mais recentes
+    backups = listar_backups(diretorio)
+    removidos = backups[:max(len(backups) - manter, 0)]
+    for caminho in removidos:
+        os.remove(caminho)
+    # Retorna os arquivos removidos
+    return removidos
+
+def fazer_backup(diretorio: str, manter: int = 7, paginas_por_passo: int = 256, pausa: float = 0.005) -> dict:
+    # Cria o diretório de destino, se necessário
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"{PREFIXO_BACKUP}{datetime.now().strftime(FORMATO_DATA)}.db")
+    # Copia para um arquivo temporário, que só vira um backup após passar na verificação
+    caminho_parcial = caminho + ".parcial"
+    try:
+        relatorio = copiar_banco(caminho_parcial, paginas_por_passo, pausa)
+        if not verificar_integridade(caminho_parcial):
+            raise RuntimeError(f"Falha na verificação de integridade do backup {caminho}")
+        os.replace(caminho_parcial, caminho)
+    finally:
+        # Remove a cópia parcial em caso de erro
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+    # Aplica a política de retenção apenas depois de ter um novo backup válido
+    relatorio["arquivo"] = caminho
+    relatorio["removidos"] = aplicar_retencao(diretorio, manter)
+    return relatorio
+
+def imprimir_relatorio(relatorio: dict, relatar: Callable[[str], None] = print) -> None:
+    # Resume duração, tamanho e vazão do backup
+    relatar(f"Backup {relatorio['arquivo']}: {relatorio['paginas']} páginas "
+            f"({relatorio['bytes'] / (1024 * 1024):.1f} MB) em {relatorio['duracao']:.2f} s "
+            f"({relatorio['mb_por_segundo']:.1f} MB/s, {relatorio['passos']} passos, "
+            f"{relatorio['reinicios']} reinícios), integridade ok")
+    for caminho in relatorio["removidos"]:
+        relatar(f"Backup antigo removido: {caminho}")
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backup online do banco de dados da loja")
+    grupo_origem = parser.add_mutually_exclusive_group()
+    grupo_origem.add_argument("--banco", help="banco de origem (padrão: TEST_DATABASE_PATH ou dados.db)")
+    grupo_origem.add_argument("--loja", help="copia apenas o banco desta loja (padrão: todas as lojas configuradas)")
+    parser.add_argument("--destino", default="backups", help="diretório dos backups")
+    parser.add_argument("--manter", type=int, default=7, help="quantidade de backups mantidos")
+    parser.add_argument("--paginas", type=int, default=256, help="páginas copiadas por passo")
+    parser.add_argument("--pausa", type=float, default=0.005, help="segundos de pausa entre os passos")
+    parser.add_argument("--intervalo", type=float, help="repete o backup a cada N segundos")
+    args = parser.parse_args(argv)
+    # O banco de origem é resolvido pela variável TEST_DATABASE_PATH
+    if args.banco:
+        os.environ['TEST_DATABASE_PATH'] = args.banco
+    # Lojas copiadas: a informada, apenas o banco informado ou todas as configuradas
+    try:
+        lojas = [obter_loja(args.loja)] if args.loja else [None] if args.banco else todas_as_lojas()
+    except ValueError as e:
+        parser.error(str(e))
+    while True:
+        for loja in lojas:
+            # Os backups das demais lojas ficam em um subdiretório, cada um com a sua retenção
+            diretorio = args.destino if loja is None else os.path.join(args.destino, loja.nome)
+            with usar_loja(loja):
+                imprimir_relatorio(fazer_backup(diretorio, args.manter, args.paginas, args.pausa))
+        # Sem intervalo, faz um único backup
+        if not args.intervalo:
+            break
+        time.sleep(args.intervalo)
+
+if __name__ == "__main__":
+    main()
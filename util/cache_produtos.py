@@ -0,0 +1,88 @@
+import os
+import threading
+from typing import Optional
+from util import metricas, sincronizacao
+from util.database import loja_atual
+
+# Cache em memória com o JSON já serializado (bytes) de cada produto, indexado pela loja e pelo ID
+_payloads: dict[str, dict[int, bytes]] = {}
+# Geração do cache: muda a cada invalidação para descartar valores lidos antes dela
+_geracao = 0
+# Trava usada apenas nas escritas do cache (leituras de dicionário já são atômicas)
+_trava = threading.Lock()
+# Quantidade máxima de produtos mantidos em cache
+LIMITE_ENTRADAS = int(os.environ.get('CACHE_PRODUTOS_MAX', '50000'))
+# Contadores de acertos e falhas para acompanhamento do cache
+_acertos = 0
+_falhas = 0
+
+def obter(id: int) -> Optional[bytes]:
+    global _acertos, _falhas
+    # Busca o payload do produto no cache da loja corrente
+    payload = _payloads.get(loja_atual(), {}).get(id)
+    # Atualiza os contadores (sem trava, são apenas estatísticas)
+    if payload is None:
+        _falhas += 1
+    else:
+        _acertos += 1
+    # Retorna o payload ou None se não estiver em cache
+    return payload
+
+def geracao_atual() -> int:
+    # Retorna a geração atual, que deve ser capturada antes de ler o produto do banco
+    return _geracao
+
+def armazenar(id: int, payload: bytes, geracao: int) -> None:
+    with _trava:
+        # Descarta o valor se houve invalidação depois que o produto foi lido do banco
+        if geracao != _geracao:
+            return
+        payloads = _payloads.setdefault(loja_atual(), {})
+        # Remove a entrada mais antiga quando o limite de entradas da loja é atingido
+        if len(payloads) >= LIMITE_ENTRADAS and id not in payloads:
+            payloads.pop(next(iter(payloads)))
+        # Guarda o payload serializado do produto
+        payloads[id] = payload
+
+def invalidar(id: int) -> None:
+    global _geracao
+    with _trava:
+        # Avança a geração e remove o payload do produto alterado na loja corrente
+        _geracao += 1
+        _payloads.get(loja_atual(), {}).pop(id, None)
+
+def limpar() -> None:
+    global _geracao
+    with _trava:
+        # Avança a geração e remove todos os payloads da loja corrente
+        _geracao += 1
+        _payloads.pop(loja_atual(), None)
+
+def estatisticas() -> dict:
+    # Retorna o tamanho atual do cache e os contadores de acertos e falhas
+    return {"entradas": _quantidade_entradas(), "acertos": _acertos, "falhas": _falhas}
+
+def _quantidade_entradas() -> int:
+    # Soma as entradas em cache de todas as lojas
+    return sum(len(payloads) for payloads in list(_payloads.values()))
+
+def aplicar_alteracoes(ids: Optional[set[int]]) -> None:
+    # Aplica as alterações de produtos feitas por outros processos (None descarta tudo)
+    if ids is None:
+        limpar()
+        return
+    for id in ids:
+        invalidar(id)
+
+# Mantém o cache coerente com as alterações registradas pelos triggers do banco.
+# Alterar uma categoria muda o payload de todos os seus produtos, então descarta tudo.
+sincronizacao.registrar("produto", aplicar_alteracoes)
+sincronizacao.registrar("categoria", lambda ids: limpar())
+
+# Expõe o tamanho e a eficiência do cache no endpoint de métricas
+metricas.registrar_indicador("loja_cache_produtos_entradas", "gauge",
+    "Produtos com JSON em cache", _quantidade_entradas)
+metricas.registrar_indicador("loja_cache_produtos_acertos_total", "counter",
+    "Leituras atendidas pelo cache de produtos", lambda: _acertos)
+metricas.registrar_indicador("loja_cache_produtos_falhas_total", "counter",
+    "Leituras que não encontraram o produto em cache", lambda: _falhas)
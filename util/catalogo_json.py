@@ -0,0 +1,60 @@
+import json
+from typing import Optional
+
+from models.produto import Produto
+from repo import produto_repo
+from util import cache_produtos
+
+def serializar_produto(produto: Produto) -> bytes:
+    # Monta o dicionário com os campos expostos pela API
+    dados = {
+        "id": produto.id,
+        "nome": produto.nome,
+        "descricao": produto.descricao,
+        "preco": produto.preco,
+        "estoque": produto.estoque,
+        "imagem": produto.imagem,
+        "categoria": {
+            "id": produto.id_categoria,
+            "nome": produto.categoria.nome if produto.categoria else None
+        }
+    }
+    # Serializa em JSON compacto e codifica em UTF-8 uma única vez
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def obter_produto_json(id: int) -> Optional[bytes]:
+    # Tenta obter o payload já serializado do cache
+    payload = cache_produtos.obter(id)
+    if payload is not None:
+        return payload
+    # Captura a geração do cache antes de ler o banco
+    geracao = cache_produtos.geracao_atual()
+    # Busca o produto no banco de dados
+    produto = produto_repo.obter_produto_por_id(id)
+    # Se não encontrou o produto, retorna None
+    if not produto:
+        return None
+    # Serializa e guarda o payload no cache
+    payload = serializar_produto(produto)
+    cache_produtos.armazenar(id, payload, geracao)
+    # Retorna o payload serializado
+    return payload
+
+def obter_pagina_produtos_json(numero_pagina: int, tamanho_pagina: int) -> bytes:
+    # Busca apenas os IDs da página, na ordem da listagem
+    ids = produto_repo.obter_ids_produtos_por_pagina(numero_pagina, tamanho_pagina)
+    # Obtém os payloads que já estão em cache
+    payloads = {id: cache_produtos.obter(id) for id in ids}
+    # Identifica os produtos que precisam ser lidos e serializados
+    faltantes = [id for id, payload in payloads.items() if payload is None]
+    if faltantes:
+        # Captura a geração do cache antes de ler o banco
+        geracao = cache_produtos.geracao_atual()
+        # Busca todos os produtos faltantes em uma única consulta
+        for produto in produto_repo.obter_produtos_por_ids(faltantes):
+            # Serializa e guarda o payload de cada produto no cache
+            payload = serializar_produto(produto)
+            cache_produtos.armazenar(produto.id, payload, geracao)
+            payloads[produto.id] = payload
+    # Concatena os payloads na ordem da listagem, ignorando produtos excluídos no meio do caminho
+    return b"[" + b",".join(payloads[id] for id in ids if payloads[id] is not None) + b"]"
@@ -1,14 +1,250 @@
 import sqlite3
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+from util import rastreamento
+from util.metricas import ConexaoInstrumentada
 
-def obter_conexao():
-    # Obtém o caminho do banco de dados a partir da variável de ambiente de testes ou usa o padrão
-    database_path = os.environ.get('TEST_DATABASE_PATH', 'dados.db')
-    # Conecta ao banco de dados SQLite
-    conexao = sqlite3.connect(database_path)
+# Várias lojas na mesma aplicação, cada uma com o seu próprio arquivo de banco (e, portanto, o seu próprio
+# lock de escrita). LOJAS mapeia hosts ou prefixos de caminho para arquivos, separados por vírgula:
+#   LOJAS="moda.exemplo.com=moda.db,www.moda.exemplo.com=moda.db,/casa=casa.db"
+# O nome da loja é o nome do arquivo sem extensão; requisições que não casam com nenhuma entrada usam
+# o banco padrão (TEST_DATABASE_PATH ou dados.db). A loja é resolvida uma vez por requisição pelo
+# MiddlewareLoja e guardada em uma ContextVar, consultada por obter_conexao() e pelos caches em memória.
+
+# Nome da loja que usa o banco padrão
+LOJA_PADRAO = "padrao"
+
+@dataclass(frozen=True)
+class Loja:
+    nome: str
+    caminho: str
+
+# Lojas por host e por prefixo de caminho (prefixos mais longos primeiro), carregadas de LOJAS
+_lojas_por_host: dict[str, Loja] = {}
+_lojas_por_prefixo: list[tuple[str, Loja]] = []
+# Loja da requisição (ou do bloco usar_loja) corrente; None usa o banco padrão
+_loja_atual: ContextVar[Optional[Loja]] = ContextVar("loja_atual", default=None)
+
+def configurar_lojas(configuracao: str) -> list[Loja]:
+    global _lojas_por_host, _lojas_por_prefixo
+    # Interpreta as entradas "host=arquivo" ou "/prefixo=arquivo"; um arquivo pode atender várias entradas
+    lojas: dict[str, Loja] = {}
+    por_host, por_prefixo = {}, []
+    for entrada in filter(None, (parte.strip() for parte in configuracao.split(","))):
+        chave, separador, caminho = (texto.strip() for texto in entrada.partition("="))
+        if not separador or not chave or not caminho:
+            raise ValueError(f"Entrada inválida em LOJAS: {entrada!r} (use host=arquivo ou /prefixo=arquivo)")
+        nome = os.path.splitext(os.path.basename(caminho))[0]
+        loja = lojas.setdefault(nome, Loja(nome, caminho))
+        if loja.caminho != caminho or nome == LOJA_PADRAO:
+            raise ValueError(f"Nome de loja repetido ou reservado em LOJAS: {nome!r}")
+        if chave.startswith("/"):
+            por_prefixo.append((chave.rstrip("/"), loja))
+        else:
+            por_host[chave.lower()] = loja
+    _lojas_por_host = por_host
+    _lojas_por_prefixo = sorted(por_prefixo, key=lambda item: len(item[0]), reverse=True)
+    # Retorna as lojas configuradas
+    return list(lojas.values())
+
+def lojas_configuradas() -> list[Loja]:
+    # Lojas distintas configuradas em LOJAS (sem a loja padrão)
+    lojas = {loja.nome: loja for loja in _lojas_por_host.values()}
+    lojas.update((loja.nome, loja) for _, loja in _lojas_por_prefixo)
+    return list(lojas.values())
+
+def todas_as_lojas() -> list[Optional[Loja]]:
+    # A loja padrão (None) e as configuradas, para tarefas que percorrem todos os bancos
+    return [None] + lojas_configuradas()
+
+def obter_loja(nome: str) -> Optional[Loja]:
+    # Localiza uma loja configurada pelo nome (None para a loja padrão); ValueError se não existir
+    if nome == LOJA_PADRAO:
+        return None
+    for loja in lojas_configuradas():
+        if loja.nome == nome:
+            return loja
+    raise ValueError(f"Loja não configurada: {nome}")
+
+def resolver_loja(host: str, caminho: str) -> tuple[Optional[Loja], str]:
+    # Procura primeiro pelo host (sem a porta) e depois pelo prefixo do caminho; retorna a loja e o prefixo
+    loja = _lojas_por_host.get(host.rsplit(":", 1)[0].lower()) if host else None
+    if loja is not None:
+        return loja, ""
+    for prefixo, loja in _lojas_por_prefixo:
+        if caminho == prefixo or caminho.startswith(prefixo + "/"):
+            return loja, prefixo
+    return None, ""
+
+def loja_atual() -> str:
+    # Nome da loja corrente, usado como chave dos caches em memória
+    loja = _loja_atual.get()
+    return loja.nome if loja is not None else LOJA_PADRAO
+
+@contextmanager
+def usar_loja(loja: Optional[Loja]) -> Iterator[None]:
+    # Executa o bloco no banco da loja (ex.: tarefas em segundo plano e comandos de manutenção)
+    marcador = _loja_atual.set(loja)
+    try:
+        yield
+    finally:
+        _loja_atual.reset(marcador)
+
+def obter_caminho_banco() -> str:
+    # Usa o banco da loja resolvida para a requisição; sem loja, o da variável de ambiente de testes ou o padrão
+    loja = _loja_atual.get()
+    if loja is not None:
+        return loja.caminho
+    return os.environ.get('TEST_DATABASE_PATH', 'dados.db')
+
+class MiddlewareLoja:
+    # Middleware ASGI que resolve a loja pelo host ou prefixo uma única vez e a mantém durante a requisição
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not (_lojas_por_host or _lojas_por_prefixo):
+            await self.app(scope, receive, send)
+            return
+        host = ""
+        for nome, valor in scope["headers"]:
+            if nome == b"host":
+                host = valor.decode("latin-1")
+                break
+        loja, prefixo = resolver_loja(host, scope["path"])
+        # Lojas por prefixo: o prefixo vira root_path, e as rotas casam com o restante do caminho
+        if prefixo:
+            scope = dict(scope, root_path=scope.get("root_path", "") + prefixo)
+        marcador = _loja_atual.set(loja)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _loja_atual.reset(marcador)
+
+class Transacao:
+    # Unidade de trabalho aberta por transacao(): uma conexão e uma transação compartilhadas pelos repositórios
+    def __init__(self, conexao: sqlite3.Connection):
+        self.conexao = conexao
+        # Quantidade de savepoints abertos (usada para nomeá-los)
+        self.profundidade = 0
+        # Funções adiadas até o commit (ex.: invalidação de caches)
+        self.apos_commit: list[tuple[Callable, tuple]] = []
+
+    def abrir_savepoint(self) -> str:
+        # Abre um savepoint aninhado e retorna o seu nome
+        self.profundidade += 1
+        nome = f"sp_{self.profundidade}"
+        self.conexao.execute(f"SAVEPOINT {nome}")
+        return nome
+
+    def fechar_savepoint(self, nome: str, desfazer: bool) -> None:
+        # Desfaz (se preciso) e libera o savepoint, mantendo a transação externa aberta
+        if desfazer:
+            self.conexao.execute(f"ROLLBACK TO {nome}")
+        self.conexao.execute(f"RELEASE {nome}")
+        self.profundidade -= 1
+
+class ConexaoParticipante:
+    # Conexão entregue por obter_conexao() dentro de transacao(): cada bloco "with" vira um savepoint,
+    # commit() e close() não fazem nada e rollback() desfaz apenas o trabalho do bloco
+    def __init__(self, transacao: Transacao):
+        self._transacao = transacao
+        self._savepoint = None
+
+    def __getattr__(self, nome):
+        # Demais atributos (cursor, execute, row_factory...) são os da conexão compartilhada
+        return getattr(self._transacao.conexao, nome)
+
+    def __enter__(self):
+        self._savepoint = self._transacao.abrir_savepoint()
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        # Libera o savepoint em caso de sucesso ou o desfaz em caso de erro (sem confirmar a transação)
+        self._transacao.fechar_savepoint(self._savepoint, desfazer=tipo is not None)
+        self._savepoint = None
+        return False
+
+    def rollback(self) -> None:
+        # Desfaz apenas o que foi feito desde o início do bloco
+        if self._savepoint is not None:
+            self._transacao.conexao.execute(f"ROLLBACK TO {self._savepoint}")
+
+    def commit(self) -> None:
+        # Quem confirma é o transacao() mais externo
+        pass
+
+    def close(self) -> None:
+        # A conexão é fechada pelo transacao() mais externo
+        pass
+
+# Transação ativa no contexto atual (requisição ou thread); None fora de transacao()
+_transacao_atual: ContextVar[Optional[Transacao]] = ContextVar("transacao_atual", default=None)
+
+def _nova_conexao() -> sqlite3.Connection:
+    # Conecta ao banco de dados SQLite, com cursores que registram as métricas de cada comando
+    conexao = sqlite3.connect(obter_caminho_banco(), factory=ConexaoInstrumentada)
     # Ativa as chaves estrangeiras
     conexao.execute("PRAGMA foreign_keys = ON")
     # Define a fábrica de linhas para retornar dicionários
     conexao.row_factory = sqlite3.Row
+    # Se o rastreamento de SQL estiver ativo, registra cada comando na requisição corrente
+    if rastreamento.ATIVO:
+        conexao.set_trace_callback(rastreamento.registrar_comando)
     # Retorna a conexão com o banco de dados
-    return conexao
\ No newline at end of file
+    return conexao
+
+def obter_conexao():
+    # Dentro de transacao(), os repositórios participam da transação aberta em vez de confirmar sozinhos
+    transacao = _transacao_atual.get()
+    if transacao is not None:
+        return ConexaoParticipante(transacao)
+    # Fora dela, cada chamada abre a sua própria conexão (e o "with" confirma ao final)
+    return _nova_conexao()
+
+@contextmanager
+def transacao() -> Iterator[Transacao]:
+    # Dentro de outra transação, vira um savepoint: um erro desfaz apenas o bloco interno
+    atual = _transacao_atual.get()
+    if atual is not None:
+        nome = atual.abrir_savepoint()
+        try:
+            yield atual
+        except BaseException:
+            atual.fechar_savepoint(nome, desfazer=True)
+            raise
+        atual.fechar_savepoint(nome, desfazer=False)
+        return
+    # Abre a conexão e já reserva a escrita (BEGIN IMMEDIATE), para que uma leitura seguida de escrita
+    # não falhe com "database is locked" ao tentar promover a transação no meio do caminho
+    atual = Transacao(_nova_conexao())
+    atual.conexao.execute("BEGIN IMMEDIATE")
+    marcador = _transacao_atual.set(atual)
+    try:
+        yield atual
+        # Confirma tudo com um único commit (um único fsync)
+        atual.conexao.commit()
+    except BaseException:
+        # Desfaz todo o trabalho dos repositórios e descarta as funções adiadas
+        atual.conexao.rollback()
+        raise
+    finally:
+        _transacao_atual.reset(marcador)
+        atual.conexao.close()
+    # Só após o commit executa as invalidações de cache adiadas pelos repositórios
+    for funcao, argumentos in atual.apos_commit:
+        funcao(*argumentos)
+
+def apos_commit(funcao: Callable, *argumentos) -> None:
+    # Adia a função até o commit da transação em andamento; fora de transacao(), executa agora
+    atual = _transacao_atual.get()
+    if atual is None:
+        funcao(*argumentos)
+    else:
+        atual.apos_commit.append((funcao, argumentos))
+
+# Carrega as lojas configuradas no ambiente
+configurar_lojas(os.environ.get('LOJAS', ''))
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Callable, Optional
+from repo import categoria_repo, endereco_repo, pedido_repo, produto_repo, sessao_repo, usuario_repo
+from util.database import LOJA_PADRAO, loja_atual, obter_loja, usar_loja
+
+# Exclusões em cascata feitas em lotes: os registros dependentes (produtos de uma categoria, endereços e
+# sessões de um usuário) são excluídos ou movidos em transações curtas de no máximo TAMANHO_LOTE linhas,
+# com uma pausa entre elas para que as demais escritas não esperem. O progresso fica em um arquivo JSON
+# por operação e, se ela for interrompida, repeti-la (ou "retomar-exclusoes") continua de onde parou.
+
+logger = logging.getLogger(__name__)
+
+# Diretório dos arquivos de progresso das exclusões
+DIRETORIO = os.environ.get('EXCLUSAO_DIRETORIO', 'exclusoes')
+# Linhas tratadas por transação
+TAMANHO_LOTE = int(os.environ.get('EXCLUSAO_LOTE', '500'))
+# Pausa (em segundos) entre os lotes, para liberar o banco para as outras escritas
+PAUSA = float(os.environ.get('EXCLUSAO_PAUSA', '0.01'))
+
+def id_operacao(tipo: str, alvo: int) -> str:
+    # Identificador da operação; o diretório é comum a todas as lojas, então as demais levam o nome da loja
+    loja = loja_atual()
+    return f"{tipo}-{alvo}" if loja == LOJA_PADRAO else f"{loja}-{tipo}-{alvo}"
+
+def caminho_progresso(id: str) -> str:
+    # Arquivo JSON com o progresso da operação
+    return os.path.join(DIRETORIO, f"{id}.json")
+
+def salvar_progresso(progresso: dict) -> None:
+    # Grava o progresso em um arquivo temporário e o troca de uma vez, para nunca ser lido pela metade
+    caminho = caminho_progresso(progresso["id"])
+    with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(progresso, arquivo, ensure_ascii=False)
+    os.replace(caminho + ".tmp", caminho)
+
+def obter_progresso(id: str) -> Optional[dict]:
+    # Lê o progresso de uma operação (de qualquer worker); None se ela nunca foi iniciada
+    if not os.path.exists(caminho_progresso(id)):
+        return None
+    with open(caminho_progresso(id), encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+def _pendente(tipo: str, alvo: int) -> Optional[dict]:
+    # Operação iniciada e não terminada (interrompida ou com o processo encerrado no meio), a ser retomada
+    anterior = obter_progresso(id_operacao(tipo, alvo))
+    if anterior is None or anterior["situacao"] not in ("em_andamento", "interrompida"):
+        return None
+    return anterior
+
+def _iniciar_progresso(tipo: str, alvo: int, opcoes: dict, total: Optional[int]) -> dict:
+    os.makedirs(DIRETORIO, exist_ok=True)
+    # Uma operação interrompida é retomada com os contadores e as opções que já tinha
+    anterior = _pendente(tipo, alvo)
+    if anterior is not None:
+        anterior.update(situacao="em_andamento", erro=None, fim=None)
+        anterior["retomadas"] += 1
+        return anterior
+    return {
+        "id": id_operacao(tipo, alvo), "loja": loja_atual(), "tipo": tipo, "alvo": alvo, "opcoes": opcoes, "situacao": "em_andamento",
+        "total": total, "processados": {}, "lotes": 0, "retomadas": 0,
+        "inicio": time.time(), "fim": None, "erro": None,
+    }
+
+def _executar(progresso: dict, etapas: list[tuple[str, Callable[[], int]]], finalizar: Callable[[], bool]) -> dict:
+    salvar_progresso(progresso)
+    try:
+        # Repete cada etapa em lotes até ela não encontrar mais linhas
+        for nome, lote in etapas:
+            while True:
+                quantidade = lote()
+                if not quantidade:
+                    break
+                progresso["processados"][nome] = progresso["processados"].get(nome, 0) + quantidade
+                progresso["lotes"] += 1
+                salvar_progresso(progresso)
+                time.sleep(PAUSA)
+        # Sem dependentes, exclui o registro principal
+        finalizar()
+        progresso["situacao"] = "concluida"
+    except sqlite3.IntegrityError as e:
+        # Restrição violada (ex.: pedido feito entre a validação e a exclusão do usuário): repetir não resolve,
+        # então a operação é cancelada com o motivo; os lotes já feitos permanecem
+        progresso["situacao"] = "cancelada"
+        progresso["erro"] = f"O registro não pode mais ser excluído: {e}"
+        logger.warning(f"Exclusão {progresso['id']} cancelada após {progresso['lotes']} lotes: {e}")
+    except Exception as e:
+        # Banco ocupado ou erro inesperado: os lotes já feitos permanecem e a operação pode ser retomada
+        progresso["situacao"] = "interrompida"
+        progresso["erro"] = str(e)
+        logger.warning(f"Exclusão {progresso['id']} interrompida após {progresso['lotes']} lotes: {e}")
+    finally:
+        progresso["fim"] = time.time()
+        salvar_progresso(progresso)
+    # Retorna o resumo da operação
+    return progresso
+
+def excluir_categoria(id: int, id_destino: Optional[int] = None, excluir_produtos: bool = False,
+                      tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    # Ao retomar, vale o que foi pedido no início (a repetição pode vir sem as opções ou com outras)
+    anterior = _pendente("categoria", id)
+    if anterior is not None:
+        opcoes = {"id_destino": id_destino, "excluir_produtos": excluir_produtos}
+        if opcoes != anterior["opcoes"]:
+            logger.info(f"Exclusão {anterior['id']} retomada com as opções originais {anterior['opcoes']}, não {opcoes}")
+        id_destino, excluir_produtos = anterior["opcoes"]["id_destino"], anterior["opcoes"]["excluir_produtos"]
+    # Valida a operação antes de alterar qualquer produto
+    agregado = categoria_repo.obter_agregado_categoria(id)
+    if agregado is None:
+        raise ValueError("Categoria não encontrada")
+    if id_destino is not None:
+        if id_destino == id or categoria_repo.obter_categoria_por_id(id_destino) is None:
+            raise ValueError("Categoria de destino inválida")
+    elif not excluir_produtos and agregado.quantidade_produtos:
+        raise ValueError("A categoria possui produtos: informe uma categoria de destino ou exclua os produtos")
+    # Move os produtos para a categoria de destino ou os exclui, lote a lote
+    if id_destino is not None:
+        etapa = ("produtos_movidos", lambda: produto_repo.mover_produtos_categoria_lote(id, id_destino, tamanho_lote))
+    else:
+        etapa = ("produtos_excluidos", lambda: produto_repo.excluir_produtos_categoria_lote(id, tamanho_lote))
+    progresso = _iniciar_progresso("categoria", id,
+        {"id_destino": id_destino, "excluir_produtos": excluir_produtos}, agregado.quantidade_produtos)
+    return _executar(progresso, [etapa], lambda: categoria_repo.excluir_categoria(id))
+
+def excluir_usuario(id: int, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    # Valida a operação antes de excluir qualquer sessão ou endereço (os pedidos são mantidos)
+    if usuario_repo.obter_usuario_por_id(id) is None:
+        raise ValueError("Usuário não encontrado")
+    if pedido_repo.usuario_possui_pedidos(id):
+        raise ValueError("O usuário possui pedidos e não pode ser excluído")
+    # Encerra as sessões primeiro e depois exclui os endereços, lote a lote
+    etapas = [
+        ("sessoes_excluidas", lambda: sessao_repo.excluir_sessoes_usuario_lote(id, tamanho_lote)),
+        ("enderecos_excluidos", lambda: endereco_repo.excluir_enderecos_usuario_lote(id, tamanho_lote)),
+    ]
+    progresso = _iniciar_progresso("usuario", id, {}, None)
+    return _executar(progresso, etapas, lambda: usuario_repo.excluir_usuario(id))
+
+def retomar_pendentes(tamanho_lote: int = TAMANHO_LOTE) -> list[dict]:
+    # Retoma as operações que não foram concluídas (ex.: processo encerrado no meio), com as opções originais
+    if not os.path.isdir(DIRETORIO):
+        return []
+    resultados = []
+    for nome in sorted(os.listdir(DIRETORIO)):
+        if not nome.endswith(".json"):
+            continue
+        progresso = obter_progresso(nome[:-len(".json")])
+        # Concluídas e canceladas não são retomadas (as canceladas só voltam se a exclusão for pedida de novo)
+        if progresso is None or progresso["situacao"] in ("concluida", "cancelada"):
+            continue
+        try:
+            # Cada operação é retomada no banco da loja em que foi iniciada
+            with usar_loja(obter_loja(progresso.get("loja", LOJA_PADRAO))):
+                if progresso["tipo"] == "categoria":
+                    resultados.append(excluir_categoria(progresso["alvo"], tamanho_lote=tamanho_lote, **progresso["opcoes"]))
+                else:
+                    resultados.append(excluir_usuario(progresso["alvo"], tamanho_lote=tamanho_lote))
+        except ValueError as e:
+            # O registro (ou a loja) já não existe, ou não pode mais ser excluído: encerra a operação com o motivo
+            progresso.update(situacao="cancelada", erro=str(e), fim=time.time())
+            salvar_progresso(progresso)
+            resultados.append(progresso)
+    # Retorna o resumo de cada operação retomada
+    return resultados
@@ -0,0 +1,192 @@
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from itertools import islice
+from typing import Callable, Iterator
+
+# Gera dados sintéticos determinísticos (mesma semente => mesmos dados) e os carrega
+# em lotes com executemany, adiando índices e triggers para o final da carga.
+# Uso: python -m util.gerador_dados --banco carga.db --produtos 1000000 --usuarios 100000
+
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+         "Karina", "Lucas", "Mariana", "Nicolas", "Olívia", "Paulo", "Quésia", "Rafael", "Sofia", "Tiago"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa"]
+TIPOS_PRODUTO = ["Notebook", "Smartphone", "Fone Bluetooth", "Cadeira Gamer", "Monitor", "Teclado Mecânico",
+                 "Mouse Sem Fio", "Smart TV", "Caixa de Som", "Roteador", "SSD", "Impressora", "Webcam", "Tablet"]
+MARCAS = ["Lenovo", "Samsung", "JBL", "LG", "Logitech", "Dell", "Philips", "TP-Link", "Kingston", "Epson", "Xiaomi"]
+ADJETIVOS = ["Pro", "Max", "Lite", "Ultra", "Plus", "Slim", "Prime", "Neo", "Air", "Turbo"]
+SETORES = ["Informática", "Eletrônicos", "Games", "Áudio", "Escritório", "Casa", "Redes", "Acessórios", "Móveis"]
+CIDADES = [("Cachoeiro de Itapemirim", "ES"), ("Vitória", "ES"), ("Rio de Janeiro", "RJ"), ("São Paulo", "SP"),
+           ("Belo Horizonte", "MG"), ("Curitiba", "PR"), ("Salvador", "BA"), ("Recife", "PE")]
+RUAS = ["Rua das Flores", "Avenida Brasil", "Rua São José", "Rua Sete de Setembro", "Avenida Beira Mar", "Rua Direita"]
+
+# Hash fixo de senha para todos os usuários sintéticos (senha "123456")
+SENHA_HASH = hashlib.sha256("123456".encode()).hexdigest()
+
+def gerar_categorias(gerador: random.Random, primeiro_id: int, quantidade: int) -> Iterator[tuple]:
+    # Gera categorias com nomes únicos a partir do ID
+    for id in range(primeiro_id, primeiro_id + quantidade):
+        yield (id, f"{gerador.choice(SETORES)} {id}")
+
+def gerar_produtos(gerador: random.Random, primeiro_id: int, quantidade: int, ids_categoria: tuple[int, int]) -> Iterator[tuple]:
+    # Gera produtos distribuídos uniformemente entre as categorias existentes
+    for id in range(primeiro_id, primeiro_id + quantidade):
+        nome = f"{gerador.choice(TIPOS_PRODUTO)} {gerador.choice(MARCAS)} {gerador.choice(ADJETIVOS)} {id}"
+        yield (id, nome, f"{nome} - produto de alta qualidade. " * gerador.randint(1, 4),
+               round(gerador.uniform(9.9, 9999.9), 2), gerador.randint(0, 500),
+               f"https://picsum.photos/200/200?random={id}", gerador.randint(*ids_categoria))
+
+def gerar_usuarios(gerador: random.Random, primeiro_id: int, quantidade: int) -> Iterator[tuple]:
+    # Gera usuários com CPF, telefone e e-mail únicos derivados do ID
+    nascimento_base = date(1950, 1, 1)
+    for id in range(primeiro_id, primeiro_id + quantidade):
+        nome, sobrenome = gerador.choice(NOMES), gerador.choice(SOBRENOMES)
+        cpf = f"{id:011d}"
+        yield (id, f"{nome} {sobrenome}", f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}",
+               f"(28) 9{id // 10000 % 10000:04d}-{id % 10000:04d}" if id < 10 ** 8 else f"(28) {id}",
+               f"{nome.lower()}.{sobrenome.lower()}{id}@exemplo.com",
+               (nascimento_base + timedelta(days=gerador.randint(0, 20000))).isoformat(), SENHA_HASH)
+
+def gerar_enderecos(gerador: random.Random, ids_usuario: tuple[int, int], por_usuario: int) -> Iterator[tuple]:
+    # Gera a quantidade indicada de endereços para cada usuário
+    for id_usuario in range(ids_usuario[0], ids_usuario[1] + 1):
+        for _ in range(por_usuario):
+            cidade, estado = gerador.choice(CIDADES)
+            yield (gerador.choice(RUAS), str(gerador.randint(1, 9999)), gerador.choice(["", "Casa", "Apto 101", "Fundos"]),
+                   "Centro", cidade, estado, f"{gerador.randint(10000, 99999)}-{gerador.randint(0, 999):03d}", id_usuario)
+
+INSERTS = {
+    "Categoria": "INSERT INTO Categoria (id, nome) VALUES (?, ?)",
+    "Produto": "INSERT INTO Produto (id, nome, descricao, preco, estoque, imagem, id_categoria) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "Usuario": "INSERT INTO Usuario (id, nome, cpf, telefone, email, data_nascimento, senha_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "Endereco": "INSERT INTO Endereco (logradouro, numero, complemento, bairro, cidade, estado, cep, id_usuario) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+def carregar(conexao: sqlite3.Connection, tabela: str, linhas: Iterator[tuple], tamanho_lote: int,
+             relatar: Callable[[str], None] = print) -> int:
+    # Insere as linhas em lotes, com uma transação por lote, sem materializar tudo em memória
+    inicio = time.perf_counter()
+    total = 0
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            break
+        with conexao:
+            conexao.executemany(INSERTS[tabela], lote)
+        total += len(lote)
+    # Relata a vazão da carga da tabela
+    duracao = time.perf_counter() - inicio
+    if total:
+        relatar(f"{tabela:<10} {total:>10} linhas em {duracao:7.2f} s ({total / duracao:,.0f} linhas/s)")
+    return total
+
+def proximo_id(conexao: sqlite3.Connection, tabela: str) -> int:
+    # Retorna o próximo ID livre da tabela, para que a carga possa ser feita sobre dados existentes
+    return (conexao.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]) + 1
+
+def remover_indices_e_triggers(conexao: sqlite3.Connection) -> list[str]:
+    # Guarda a definição dos índices secundários e triggers e os remove durante a carga
+    objetos = conexao.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE type IN ('index', 'trigger') AND sql IS NOT NULL").fetchall()
+    for tipo, nome, _ in objetos:
+        conexao.execute(f"DROP {tipo.upper()} IF EXISTS {nome}")
+    return [sql for _, _, sql in objetos]
+
+def recriar_indices_e_triggers(conexao: sqlite3.Connection, definicoes: list[str]) -> None:
+    # Recria os índices e triggers removidos antes da carga
+    for sql in definicoes:
+        conexao.execute(sql)
+
+def reconstruir_tabelas_derivadas(conexao: sqlite3.Connection) -> None:
+    from sql.produto_sql import DELETE_PRODUTO_LISTAGEM, POPULAR_PRODUTO_LISTAGEM
+    from sql.alteracao_sql import INSERT_ALTERACAO
+    from sql.categoria_sql import DELETE_CATEGORIA_AGREGADO, POPULAR_CATEGORIA_AGREGADO
+    # Recalcula as tabelas mantidas por triggers, que ficaram desligados durante a carga
+    conexao.execute(DELETE_PRODUTO_LISTAGEM)
+    conexao.execute(POPULAR_PRODUTO_LISTAGEM)
+    conexao.execute(DELETE_CATEGORIA_AGREGADO)
+    conexao.execute(POPULAR_CATEGORIA_AGREGADO)
+    # Os triggers do registro de alterações também estavam desligados: avisa os processos em execução
+    conexao.execute(INSERT_ALTERACAO, ("tudo", None))
+
+def gerar_e_carregar(categorias: int, produtos: int, usuarios: int, enderecos_por_usuario: int,
+                     semente: int = 42, tamanho_lote: int = 10000, relatar: Callable[[str], None] = print) -> dict:
+    from util import initializer
+    from util.database import obter_caminho_banco
+    # Garante que o schema existe no banco de destino (sem os dados iniciais de exemplo)
+    initializer.inicializar_banco(inserir_dados=False)
+    # Usa uma conexão própria, com autocommit controlado pelos lotes
+    conexao = sqlite3.connect(obter_caminho_banco())
+    # Durante a carga, a integridade referencial é garantida pelo próprio gerador
+    conexao.execute("PRAGMA foreign_keys = OFF")
+    # Reduz as sincronizações com o disco durante a carga
+    conexao.execute("PRAGMA synchronous = OFF")
+    gerador = random.Random(semente)
+    inicio = time.perf_counter()
+    totais = {}
+    definicoes = remover_indices_e_triggers(conexao)
+    try:
+        # Carrega categorias e produtos, distribuindo os produtos entre todas as categorias
+        primeira_categoria = proximo_id(conexao, "Categoria")
+        totais["Categoria"] = carregar(conexao, "Categoria",
+            gerar_categorias(gerador, primeira_categoria, categorias), tamanho_lote, relatar)
+        ultima_categoria = proximo_id(conexao, "Categoria") - 1
+        if produtos and ultima_categoria < 1:
+            raise ValueError("É necessário existir ao menos uma categoria para gerar produtos")
+        totais["Produto"] = carregar(conexao, "Produto",
+            gerar_produtos(gerador, proximo_id(conexao, "Produto"), produtos, (1, max(ultima_categoria, 1))),
+            tamanho_lote, relatar)
+        # Carrega usuários e seus endereços
+        primeiro_usuario = proximo_id(conexao, "Usuario")
+        totais["Usuario"] = carregar(conexao, "Usuario",
+            gerar_usuarios(gerador, primeiro_usuario, usuarios), tamanho_lote, relatar)
+        totais["Endereco"] = carregar(conexao, "Endereco",
+            gerar_enderecos(gerador, (primeiro_usuario, primeiro_usuario + usuarios - 1), enderecos_por_usuario),
+            tamanho_lote, relatar)
+    finally:
+        # Recria índices e triggers e reconstrói as tabelas derivadas, mesmo se a carga for interrompida
+        inicio_indices = time.perf_counter()
+        with conexao:
+            recriar_indices_e_triggers(conexao, definicoes)
+            reconstruir_tabelas_derivadas(conexao)
+        relatar(f"Índices, triggers e tabelas derivadas recriados em {time.perf_counter() - inicio_indices:.2f} s")
+        conexao.close()
+    # Relata a vazão total da carga
+    duracao = time.perf_counter() - inicio
+    total = sum(totais.values())
+    relatar(f"Total: {total} linhas em {duracao:.2f} s ({total / duracao:,.0f} linhas/s)")
+    return totais
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera e carrega dados sintéticos determinísticos para testes de escala")
+    grupo_destino = parser.add_mutually_exclusive_group()
+    grupo_destino.add_argument("--banco", help="arquivo do banco de destino (padrão: TEST_DATABASE_PATH ou dados.db)")
+    grupo_destino.add_argument("--loja", help="carrega no banco desta loja (nome configurado em LOJAS)")
+    parser.add_argument("--categorias", type=int, default=100, help="quantidade de categorias")
+    parser.add_argument("--produtos", type=int, default=10000, help="quantidade de produtos")
+    parser.add_argument("--usuarios", type=int, default=10000, help="quantidade de usuários")
+    parser.add_argument("--enderecos-por-usuario", type=int, default=1, help="endereços gerados por usuário")
+    parser.add_argument("--semente", type=int, default=42, help="semente do gerador aleatório")
+    parser.add_argument("--lote", type=int, default=10000, help="linhas por executemany/transação")
+    args = parser.parse_args(argv)
+    # Os repositórios resolvem o banco pela variável TEST_DATABASE_PATH
+    if args.banco:
+        os.environ['TEST_DATABASE_PATH'] = args.banco
+    from util.database import obter_loja, usar_loja
+    try:
+        loja = obter_loja(args.loja) if args.loja else None
+    except ValueError as e:
+        parser.error(str(e))
+    # Com --loja, os repositórios e a conexão da carga usam o banco da loja
+    with usar_loja(loja):
+        gerar_e_carregar(args.categorias, args.produtos, args.usuarios, args.enderecos_por_usuario,
+                         args.semente, args.lote)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import csv
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from typing import BinaryIO, Optional
+from repo import produto_repo
+from util.database import loja_atual, obter_loja, usar_loja
+
+# Importação de preços e estoques a partir de CSV (id;preco;estoque), lida linha a linha e aplicada em lotes,
+# cada lote em uma transação. O progresso fica em um arquivo JSON (visível para todos os workers)
+# e as linhas rejeitadas vão para um CSV de erros, com o número da linha e o motivo.
+# A rota grava o arquivo enviado ao lado do progresso e o importa em uma thread, devolvendo o ID logo em seguida.
+
+logger = logging.getLogger(__name__)
+
+# Diretório dos arquivos de progresso e de erros de cada importação
+DIRETORIO = os.environ.get('IMPORTACAO_DIRETORIO', 'importacoes')
+# Linhas aplicadas por transação
+TAMANHO_LOTE = int(os.environ.get('IMPORTACAO_LOTE', '1000'))
+# Formato dos identificadores de importação (também impede caminhos arbitrários nas rotas)
+FORMATO_ID = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{6}$")
+# Números aceitos em cada convenção de decimais, decidida uma vez por arquivo: com vírgula ("1.234,50",
+# ponto só como separador de milhar) ou com ponto ("1,234.50", vírgula só como separador de milhar)
+FORMATOS_NUMERO = {
+    ",": re.compile(r"^-?(\d+|[1-9]\d{0,2}(\.\d{3})+)(,\d+)?$"),
+    ".": re.compile(r"^-?(\d+|[1-9]\d{0,2}(,\d{3})+)(\.\d+)?$"),
+}
+# Colunas do arquivo de erros
+COLUNAS_ERRO = ["linha", "id", "preco", "estoque", "erro"]
+
+def caminho_progresso(id: str) -> str:
+    # Arquivo JSON com o progresso da importação
+    return os.path.join(DIRETORIO, f"{id}.json")
+
+def caminho_arquivo(id: str) -> str:
+    # Cópia do CSV enviado, lida pela importação em segundo plano e removida ao final
+    return os.path.join(DIRETORIO, f"{id}.csv")
+
+def caminho_erros(id: str) -> str:
+    # Arquivo CSV com as linhas rejeitadas
+    return os.path.join(DIRETORIO, f"{id}_erros.csv")
+
+def salvar_progresso(progresso: dict) -> None:
+    # Grava o progresso em um arquivo temporário e o troca de uma vez, para nunca ser lido pela metade
+    caminho = caminho_progresso(progresso["id"])
+    with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(progresso, arquivo, ensure_ascii=False)
+    os.replace(caminho + ".tmp", caminho)
+
+def obter_progresso(id: str) -> Optional[dict]:
+    # Lê o progresso de uma importação (de qualquer worker); None se o ID não existe
+    if not FORMATO_ID.match(id) or not os.path.exists(caminho_progresso(id)):
+        return None
+    with open(caminho_progresso(id), encoding="utf-8") as arquivo:
+        progresso = json.load(arquivo)
+    # O diretório é comum a todas as lojas: importações de outra loja não são visíveis nesta
+    return progresso if progresso.get("loja", loja_atual()) == loja_atual() else None
+
+def converter_numero(valor: str, decimal: str) -> float:
+    # Converte o número na convenção do arquivo; valores fora dela são rejeitados, nunca reinterpretados
+    valor = valor.strip()
+    if not FORMATOS_NUMERO[decimal].match(valor):
+        raise ValueError(f"Número fora do formato do arquivo: {valor}")
+    if decimal == ",":
+        valor = valor.replace(".", "").replace(",", ".")
+    else:
+        valor = valor.replace(",", "")
+    return float(valor)
+
+def converter_linha(linha: dict, decimal: str = ".") -> tuple[int, Optional[float], Optional[int]]:
+    # Valida a linha e retorna (id, preço ou None, estoque ou None); lança ValueError com o motivo
+    try:
+        id = int((linha.get("id") or "").strip())
+    except ValueError:
+        raise ValueError("ID inválido")
+    texto_preco = (linha.get("preco") or "").strip()
+    texto_estoque = (linha.get("estoque") or "").strip()
+    if not texto_preco and not texto_estoque:
+        raise ValueError("Informe o preço e/ou o estoque")
+    preco = estoque = None
+    if texto_preco:
+        try:
+            preco = converter_numero(texto_preco, decimal)
+        except ValueError:
+            raise ValueError(f"Preço inválido (o arquivo usa decimais com \"{decimal}\")")
+        # Números enormes viram infinito no float
+        if not math.isfinite(preco):
+            raise ValueError("Preço inválido")
+        if preco < 0:
+            raise ValueError("O preço não pode ser negativo")
+        preco = round(preco, 2)
+    if texto_estoque:
+        try:
+            estoque = int(texto_estoque)
+        except ValueError:
+            raise ValueError("Estoque inválido")
+        if estoque < 0:
+            raise ValueError("O estoque não pode ser negativo")
+    return id, preco, estoque
+
+def detectar_delimitador(cabecalho: str) -> str:
+    # Planilhas em português costumam exportar com ";"; usa o separador mais frequente no cabeçalho
+    return max(";,\t", key=cabecalho.count)
+
+def detectar_decimal(delimitador: str) -> str:
+    # Arquivos com ";" vêm de planilhas em português (decimais com vírgula); os demais usam ponto
+    return "," if delimitador == ";" else "."
+
+def criar(nome_arquivo: str = "", decimal: Optional[str] = None) -> dict:
+    os.makedirs(DIRETORIO, exist_ok=True)
+    # Cria e grava o registro de progresso antes da importação, para que o ID possa ser acompanhado desde já
+    id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+    progresso = {
+        "id": id, "loja": loja_atual(), "arquivo": nome_arquivo, "situacao": "aguardando", "decimal": decimal,
+        "linhas_lidas": 0, "linhas_atualizadas": 0, "linhas_sem_alteracao": 0, "linhas_com_erro": 0,
+        "inicio": time.time(), "fim": None, "erro": None, "arquivo_erros": None,
+    }
+    salvar_progresso(progresso)
+    # Retorna o progresso inicial
+    return progresso
+
+def receber_arquivo(id: str, arquivo: BinaryIO) -> None:
+    # Copia o arquivo enviado para o diretório das importações (o temporário do upload some com a requisição)
+    with open(caminho_arquivo(id), "wb") as destino:
+        shutil.copyfileobj(arquivo, destino)
+
+def importar_em_segundo_plano(id: str, tamanho_lote: int = TAMANHO_LOTE) -> threading.Thread:
+    loja = obter_loja(loja_atual())
+    def executar() -> None:
+        # Importa a cópia do arquivo no banco da loja que a recebeu e a remove ao terminar
+        try:
+            with usar_loja(loja), open(caminho_arquivo(id), "rb") as arquivo:
+                importar(id, arquivo, tamanho_lote)
+        except Exception:
+            logger.exception(f"Falha na importação {id}")
+        finally:
+            if os.path.exists(caminho_arquivo(id)):
+                os.unlink(caminho_arquivo(id))
+    # A thread não é daemon: ao encerrar, o processo espera a importação em vez de deixá-la pela metade
+    thread = threading.Thread(target=executar, name=f"importacao-{id}")
+    thread.start()
+    return thread
+
+def importar(id: str, arquivo: BinaryIO, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    # Retoma o registro criado por criar() e marca a importação como iniciada
+    progresso = obter_progresso(id)
+    if progresso is None:
+        raise ValueError("Importação não encontrada")
+    decimal = progresso["decimal"]
+    progresso.update(situacao="em_andamento", inicio=time.time())
+    salvar_progresso(progresso)
+    # O arquivo de erros só é criado se alguma linha for rejeitada
+    erros = {"arquivo": None, "escritor": None}
+
+    def registrar_erro(numero: int, linha: dict, motivo: str) -> None:
+        if erros["escritor"] is None:
+            erros["arquivo"] = open(caminho_erros(id), "w", encoding="utf-8", newline="")
+            erros["escritor"] = csv.writer(erros["arquivo"])
+            erros["escritor"].writerow(COLUNAS_ERRO)
+        erros["escritor"].writerow([numero, linha.get("id"), linha.get("preco"), linha.get("estoque"), motivo])
+        progresso["linhas_com_erro"] += 1
+
+    def aplicar(lote: list[tuple[int, dict, tuple]]) -> None:
+        # Aplica o lote em uma transação e registra como erro os produtos inexistentes
+        alterados, ausentes = produto_repo.atualizar_precos_estoques([valores for _, _, valores in lote])
+        for numero, linha, (id_produto, _, _) in lote:
+            if id_produto in ausentes:
+                registrar_erro(numero, linha, "Produto não encontrado")
+        progresso["linhas_atualizadas"] += alterados
+        progresso["linhas_sem_alteracao"] += len(lote) - alterados - sum(
+            1 for _, _, (id_produto, _, _) in lote if id_produto in ausentes)
+        lote.clear()
+        salvar_progresso(progresso)
+
+    # Lê o arquivo como texto sob demanda (sem carregá-lo inteiro), ignorando o BOM do Excel
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    try:
+        cabecalho = texto.readline()
+        delimitador = detectar_delimitador(cabecalho)
+        # A convenção de decimais vale para o arquivo inteiro: a informada no envio ou a do delimitador
+        progresso["decimal"] = decimal or detectar_decimal(delimitador)
+        leitor = csv.DictReader(itertools.chain([cabecalho], texto), delimiter=delimitador)
+        leitor.fieldnames = [coluna.strip().lower() for coluna in (leitor.fieldnames or [])]
+        if "id" not in leitor.fieldnames or not {"preco", "estoque"} & set(leitor.fieldnames):
+            raise ValueError("O cabeçalho deve ter a coluna id e as colunas preco e/ou estoque")
+        lote = []
+        # A linha 1 é o cabeçalho
+        for numero, linha in enumerate(leitor, start=2):
+            progresso["linhas_lidas"] += 1
+            try:
+                lote.append((numero, linha, converter_linha(linha, progresso["decimal"])))
+            except ValueError as e:
+                registrar_erro(numero, linha, str(e))
+            if len(lote) >= tamanho_lote:
+                aplicar(lote)
+        aplicar(lote)
+        progresso["situacao"] = "concluida"
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        # Arquivo inválido: os lotes já aplicados permanecem, e o motivo fica no progresso
+        progresso["situacao"] = "falhou"
+        progresso["erro"] = str(e)
+        logger.warning(f"Importação {id} interrompida na linha {progresso['linhas_lidas'] + 1}: {e}")
+    except Exception as e:
+        # Falha inesperada (ex.: banco indisponível): registra no progresso e propaga
+        progresso["situacao"] = "falhou"
+        progresso["erro"] = str(e)
+        raise
+    finally:
+        # Devolve o arquivo enviado sem fechá-lo (quem o abriu é quem o fecha)
+        texto.detach()
+        if erros["arquivo"] is not None:
+            erros["arquivo"].close()
+        progresso["fim"] = time.time()
+        progresso["arquivo_erros"] = os.path.basename(caminho_erros(id)) if progresso["linhas_com_erro"] else None
+        salvar_progresso(progresso)
+    # Retorna o resumo final da importação
+    return progresso
@@ -1,21 +1,135 @@
+import logging
+import os
+import time
 from util.database import obter_conexao
-from repo import usuario_repo, endereco_repo, categoria_repo, produto_repo
+from sql.usuario_sql import CREATE_TABLE_USUARIO, CREATE_INDEX_USUARIO_NOME
+from sql.endereco_sql import CREATE_TABLE_ENDERECO, CREATE_INDEX_ENDERECO_USUARIO
+from sql.categoria_sql import *
+from sql.produto_sql import *
+from sql.pedido_sql import *
+from sql.alteracao_sql import *
+from sql.sessao_sql import *
 
-def criar_tabelas():
-    usuario_repo.criar_tabela_usuarios()
-    endereco_repo.criar_tabela_enderecos()
-    categoria_repo.criar_tabela_categorias()
-    produto_repo.criar_tabela_produtos()
+logger = logging.getLogger(__name__)
 
-def inserir_dados_iniciais():
-    # Obtém a conexão com o banco de dados
+# Versão do schema gravada em PRAGMA user_version.
+# Deve ser incrementada sempre que um comando for adicionado a COMANDOS_SCHEMA.
+VERSAO_SCHEMA = 7
+
+# Comandos de criação de tabelas, índices e triggers, na ordem em que devem ser executados
+COMANDOS_SCHEMA = [
+    CREATE_TABLE_USUARIO,
+    CREATE_INDEX_USUARIO_NOME,
+    CREATE_TABLE_ENDERECO,
+    CREATE_INDEX_ENDERECO_USUARIO,
+    CREATE_TABLE_CATEGORIA,
+    CREATE_TABLE_PRODUTO,
+    CREATE_TABLE_PRODUTO_LISTAGEM,
+    CREATE_INDEX_PRODUTO_LISTAGEM_NOME,
+    CREATE_INDEX_PRODUTO_LISTAGEM_CATEGORIA,
+    CREATE_TRIGGER_PRODUTO_LISTAGEM_INSERT,
+    CREATE_TRIGGER_PRODUTO_LISTAGEM_UPDATE,
+    CREATE_TRIGGER_PRODUTO_LISTAGEM_ESTOQUE,
+    CREATE_TRIGGER_PRODUTO_LISTAGEM_DELETE,
+    CREATE_TRIGGER_CATEGORIA_LISTAGEM_UPDATE,
+    POPULAR_PRODUTO_LISTAGEM_SE_VAZIA,
+    CREATE_TABLE_PEDIDO,
+    CREATE_INDEX_PEDIDO_USUARIO,
+    CREATE_TABLE_ITEM_PEDIDO,
+    CREATE_INDEX_ITEM_PEDIDO_PEDIDO,
+    CREATE_INDEX_ITEM_PEDIDO_PRODUTO,
+    CREATE_TABLE_ALTERACAO,
+    CREATE_TRIGGER_ALTERACAO_PODA,
+    CREATE_TRIGGER_ALTERACAO_PRODUTO_INSERT,
+    CREATE_TRIGGER_ALTERACAO_PRODUTO_UPDATE,
+    CREATE_TRIGGER_ALTERACAO_PRODUTO_DELETE,
+    CREATE_TRIGGER_ALTERACAO_CATEGORIA_INSERT,
+    CREATE_TRIGGER_ALTERACAO_CATEGORIA_UPDATE,
+    CREATE_TRIGGER_ALTERACAO_CATEGORIA_DELETE,
+    CREATE_TABLE_SESSAO,
+    CREATE_INDEX_SESSAO_USUARIO,
+    CREATE_INDEX_SESSAO_EXPIRACAO,
+    CREATE_TRIGGER_ALTERACAO_SESSAO_UPDATE,
+    CREATE_TRIGGER_ALTERACAO_SESSAO_DELETE,
+    CREATE_INDEX_PRODUTO_CATEGORIA_PRECO,
+    CREATE_TABLE_CATEGORIA_AGREGADO,
+    CREATE_TRIGGER_CATEGORIA_AGREGADO_INSERT,
+    CREATE_TRIGGER_PRODUTO_AGREGADO_INSERT,
+    CREATE_TRIGGER_PRODUTO_AGREGADO_UPDATE,
+    CREATE_TRIGGER_PRODUTO_AGREGADO_ESTOQUE,
+    CREATE_TRIGGER_PRODUTO_AGREGADO_DELETE,
+    POPULAR_CATEGORIA_AGREGADO_SE_VAZIA,
+    CREATE_TABLE_PRODUTO_ESTATISTICA,
+    CREATE_INDEX_PRODUTO_ESTATISTICA_VISUALIZACOES,
+]
+
+# Tabelas com dados iniciais e seus arquivos SQL, na ordem exigida pelas chaves estrangeiras
+DADOS_INICIAIS = [
+    ("Usuario", "insert_usuarios.sql"),
+    ("Endereco", "insert_enderecos.sql"),
+    ("Categoria", "insert_categorias.sql"),
+    ("Produto", "insert_produtos.sql"),
+]
+
+def inicializar_banco(inserir_dados: bool = True) -> None:
+    # Marca o início para registrar a duração da inicialização
+    inicio = time.perf_counter()
+    # Obtém uma única conexão para toda a inicialização
     conexao = obter_conexao()
-    # Insere dados iniciais nas tabelas usando a mesma conexão para evitar problemas de concorrência
-    usuario_repo.inserir_dados_iniciais(conexao)
-    endereco_repo.inserir_dados_iniciais(conexao)
-    categoria_repo.inserir_dados_iniciais(conexao)
-    produto_repo.inserir_dados_iniciais(conexao)
-    # Commit para garantir que as alterações sejam salvas
-    conexao.commit()
-    # Fecha a conexão após inserir os dados
-    conexao.close()
\ No newline at end of file
+    try:
+        # Verifica a versão do schema com uma única consulta
+        versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+        # Se o schema já está atualizado, não há nada a fazer
+        if versao >= VERSAO_SCHEMA:
+            logger.info(f"Schema na versão {versao}, inicialização ignorada "
+                        f"({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+            return
+        # Ativa o modo WAL (persistente no arquivo), para que leitores não bloqueiem escritores
+        conexao.execute("PRAGMA journal_mode = WAL")
+        # Inicia uma única transação de escrita para criar tudo de uma vez
+        conexao.execute("BEGIN IMMEDIATE")
+        # Outro processo (worker) pode ter atualizado o schema enquanto esta transação aguardava
+        if conexao.execute("PRAGMA user_version").fetchone()[0] >= VERSAO_SCHEMA:
+            conexao.rollback()
+            logger.info("Schema atualizado por outro processo, inicialização ignorada")
+            return
+        # Cria tabelas, índices e triggers
+        for comando in COMANDOS_SCHEMA:
+            conexao.execute(comando)
+        # Insere os dados iniciais apenas nas tabelas vazias
+        tabelas_semeadas = []
+        if inserir_dados:
+            tabelas_semeadas = inserir_dados_iniciais(conexao)
+        # Grava a nova versão do schema na mesma transação
+        conexao.execute(f"PRAGMA user_version = {VERSAO_SCHEMA}")
+        # Confirma a transação
+        conexao.commit()
+        logger.info(f"Schema atualizado da versão {versao} para {VERSAO_SCHEMA}, "
+                    f"dados iniciais em {tabelas_semeadas or 'nenhuma tabela'} "
+                    f"({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+    except Exception:
+        # Desfaz a transação em caso de erro
+        conexao.rollback()
+        raise
+    finally:
+        # Fecha a conexão utilizada na inicialização
+        conexao.close()
+
+def inserir_dados_iniciais(conexao) -> list[str]:
+    # Verifica quais tabelas já têm dados com uma única consulta
+    consulta = ", ".join(f"EXISTS (SELECT 1 FROM {tabela})" for tabela, _ in DADOS_INICIAIS)
+    preenchidas = conexao.execute(f"SELECT {consulta}").fetchone()
+    # Insere os dados iniciais de cada tabela vazia
+    tabelas_semeadas = []
+    for (tabela, arquivo), preenchida in zip(DADOS_INICIAIS, preenchidas):
+        if preenchida:
+            continue
+        # Constrói caminho para arquivo SQL com dados iniciais
+        caminho_arquivo_sql = os.path.join(os.path.dirname(__file__), '../data', arquivo)
+        # Abre arquivo SQL para leitura
+        with open(caminho_arquivo_sql, 'r', encoding='utf-8') as arquivo_sql:
+            # Executa comandos SQL de inserção
+            conexao.execute(arquivo_sql.read())
+        tabelas_semeadas.append(tabela)
+    # Retorna as tabelas que receberam dados iniciais
+    return tabelas_semeadas
@@ -0,0 +1,116 @@
+import argparse
+import time
+
+from repo import categoria_repo, produto_repo, sessao_repo
+from util import exclusao_lotes
+from util.database import LOJA_PADRAO, obter_loja, usar_loja
+
+def reconstruir_listagem(args: argparse.Namespace) -> None:
+    # Recria a tabela de listagem de produtos a partir das tabelas de origem
+    quantidade = produto_repo.reconstruir_listagem_produtos()
+    # Informa quantos produtos foram reconstruídos
+    print(f"Listagem de produtos reconstruída: {quantidade} produtos")
+
+def reconstruir_agregados(args: argparse.Namespace) -> None:
+    # Recalcula os agregados por categoria a partir da tabela de produtos
+    quantidade = categoria_repo.reconstruir_agregados_categorias()
+    # Informa quantas categorias foram recalculadas
+    print(f"Agregados de categorias reconstruídos: {quantidade} categorias")
+
+def limpar_sessoes(args: argparse.Namespace) -> None:
+    # Remove do banco as sessões vencidas (a aplicação também faz isso periodicamente)
+    quantidade = sessao_repo.excluir_sessoes_expiradas(time.time())
+    # Informa quantas sessões foram removidas
+    print(f"Sessões vencidas removidas: {quantidade}")
+
+def imprimir_exclusao(progresso: dict) -> None:
+    # Informa a situação final e as linhas tratadas em cada etapa da exclusão
+    processados = ", ".join(f"{nome}={quantidade}" for nome, quantidade in progresso["processados"].items())
+    mensagem = f"Exclusão {progresso['id']}: {progresso['situacao']} em {progresso['lotes']} lotes"
+    if processados:
+        mensagem += f" ({processados})"
+    if progresso["erro"]:
+        mensagem += f" - {progresso['erro']}"
+    print(mensagem)
+
+def excluir_categoria(args: argparse.Namespace) -> None:
+    # Move ou exclui os produtos da categoria em lotes e então exclui a categoria
+    imprimir_exclusao(exclusao_lotes.excluir_categoria(
+        args.id, args.destino, excluir_produtos=args.excluir_produtos, tamanho_lote=args.lote))
+
+def excluir_usuario(args: argparse.Namespace) -> None:
+    # Exclui as sessões e os endereços do usuário em lotes e então o usuário
+    imprimir_exclusao(exclusao_lotes.excluir_usuario(args.id, tamanho_lote=args.lote))
+
+def retomar_exclusoes(args: argparse.Namespace) -> None:
+    # Retoma as exclusões em lotes que foram interrompidas
+    resultados = exclusao_lotes.retomar_pendentes(tamanho_lote=args.lote)
+    for progresso in resultados:
+        imprimir_exclusao(progresso)
+    if not resultados:
+        print("Nenhuma exclusão pendente")
+
+def criar_parser() -> argparse.ArgumentParser:
+    # Cria o parser principal com um subcomando para cada tarefa de manutenção
+    parser = argparse.ArgumentParser(description="Tarefas de manutenção do banco de dados da loja")
+    parser.add_argument("--loja", default=LOJA_PADRAO,
+        help="Loja (nome do banco configurado em LOJAS) em que o comando é executado")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    # Subcomando para reconstruir a tabela de listagem de produtos
+    parser_listagem = subparsers.add_parser(
+        "reconstruir-listagem",
+        help="Reconstrói a tabela ProdutoListagem a partir de Produto e Categoria")
+    parser_listagem.set_defaults(funcao=reconstruir_listagem)
+    # Subcomando para reconstruir os agregados por categoria
+    parser_agregados = subparsers.add_parser(
+        "reconstruir-agregados",
+        help="Recalcula a tabela CategoriaAgregado a partir de Produto")
+    parser_agregados.set_defaults(funcao=reconstruir_agregados)
+    # Subcomando para remover as sessões vencidas
+    parser_sessoes = subparsers.add_parser(
+        "limpar-sessoes",
+        help="Remove da tabela Sessao as sessões vencidas")
+    parser_sessoes.set_defaults(funcao=limpar_sessoes)
+    # Subcomando para excluir uma categoria, movendo ou excluindo seus produtos em lotes
+    parser_categoria = subparsers.add_parser(
+        "excluir-categoria",
+        help="Exclui uma categoria, movendo (--destino) ou excluindo (--excluir-produtos) seus produtos em lotes")
+    parser_categoria.add_argument("id", type=int, help="ID da categoria")
+    grupo_produtos = parser_categoria.add_mutually_exclusive_group()
+    grupo_produtos.add_argument("--destino", type=int, help="ID da categoria que receberá os produtos")
+    grupo_produtos.add_argument("--excluir-produtos", action="store_true", help="Exclui os produtos da categoria")
+    parser_categoria.add_argument("--lote", type=int, default=exclusao_lotes.TAMANHO_LOTE,
+        help="Linhas por transação (padrão: %(default)s)")
+    parser_categoria.set_defaults(funcao=excluir_categoria)
+    # Subcomando para excluir um usuário, com suas sessões e endereços em lotes
+    parser_usuario = subparsers.add_parser(
+        "excluir-usuario",
+        help="Exclui um usuário sem pedidos, com suas sessões e endereços em lotes")
+    parser_usuario.add_argument("id", type=int, help="ID do usuário")
+    parser_usuario.add_argument("--lote", type=int, default=exclusao_lotes.TAMANHO_LOTE,
+        help="Linhas por transação (padrão: %(default)s)")
+    parser_usuario.set_defaults(funcao=excluir_usuario)
+    # Subcomando para retomar as exclusões interrompidas
+    parser_retomar = subparsers.add_parser(
+        "retomar-exclusoes",
+        help="Retoma as exclusões em lotes interrompidas, com as opções originais")
+    parser_retomar.add_argument("--lote", type=int, default=exclusao_lotes.TAMANHO_LOTE,
+        help="Linhas por transação (padrão: %(default)s)")
+    parser_retomar.set_defaults(funcao=retomar_exclusoes)
+    # Retorna o parser configurado
+    return parser
+
+def main(argv: list[str] = None) -> None:
+    # Interpreta os argumentos da linha de comando
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    try:
+        loja = obter_loja(args.loja)
+    except ValueError as e:
+        parser.error(str(e))
+    # Executa a função associada ao subcomando escolhido no banco da loja
+    with usar_loja(loja):
+        args.funcao(args)
+
+if __name__ == "__main__":
+    main()
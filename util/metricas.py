@@ -0,0 +1,245 @@
+import importlib
+import pkgutil
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+from util import rastreamento
+
+# Métricas da aplicação no formato texto do Prometheus: requisições por rota (template),
+# tempo e linhas de cada comando SQL (pelo nome da constante em sql/) e indicadores registrados
+# por outros módulos (ex.: cache de produtos). Cada processo (worker) tem suas próprias métricas.
+
+# Limites (em segundos) das faixas dos histogramas
+FAIXAS_SEGUNDOS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+class Histograma:
+    # Histograma com faixas fixas, soma e contagem
+    def __init__(self):
+        self.contagens = [0] * (len(FAIXAS_SEGUNDOS) + 1)
+        self.soma = 0.0
+        self.trava = threading.Lock()
+
+    def observar(self, valor: float) -> None:
+        with self.trava:
+            self.contagens[bisect_left(FAIXAS_SEGUNDOS, valor)] += 1
+            self.soma += valor
+
+# Requisições por (método, rota, status) e duração por (método, rota)
+_requisicoes: dict[tuple[str, str, str], int] = {}
+_duracoes_rota: dict[tuple[str, str], Histograma] = {}
+# Duração e linhas por comando SQL
+_duracoes_sql: dict[str, Histograma] = {}
+_linhas_sql: dict[str, int] = {}
+# Conexões criadas e ainda abertas
+_conexoes_criadas = 0
+_conexoes_ativas = 0
+# Indicadores registrados por outros módulos: nome -> (tipo, ajuda, função que retorna o valor, rótulo)
+_indicadores: dict[str, tuple[str, str, Callable[[], float], Optional[str]]] = {}
+# Trava das contagens simples
+_trava = threading.Lock()
+# Texto SQL -> nome da constante, montado no primeiro uso
+_nomes_sql: dict[str, str] = None
+# Início do texto das constantes com marcadores de formatação ({...}) -> nome da constante
+_prefixos_sql: dict[str, str] = {}
+# Quantidade máxima de textos SQL distintos memorizados
+LIMITE_NOMES_SQL = 10000
+
+def registrar_indicador(nome: str, tipo: str, ajuda: str, funcao: Callable[[], float], rotulo: str = None) -> None:
+    # Registra um indicador (gauge ou counter) calculado no momento da coleta.
+    # Com rótulo, a função retorna um dicionário {valor do rótulo: valor do indicador}.
+    _indicadores[nome] = (tipo, ajuda, funcao, rotulo)
+
+def nome_consulta(sql: str) -> str:
+    global _nomes_sql
+    # Mapeia cada constante SQL dos módulos do pacote sql para o seu nome
+    if _nomes_sql is None:
+        import sql as pacote_sql
+        nomes = {}
+        for modulo in pkgutil.iter_modules(pacote_sql.__path__):
+            for nome, valor in vars(importlib.import_module(f"sql.{modulo.name}")).items():
+                if nome.isupper() and isinstance(valor, str):
+                    nomes[valor] = nome
+                    # Constantes com .format (ex.: lista de marcadores) são reconhecidas pelo início do texto
+                    if "{" in valor and valor[:valor.index("{")].strip():
+                        _prefixos_sql[valor[:valor.index("{")]] = nome
+        _nomes_sql = nomes
+    nome = _nomes_sql.get(sql)
+    if nome is None:
+        # Comandos montados dinamicamente usam o nome da constante de origem; os demais ficam em "outros"
+        nome = next((nome for prefixo, nome in _prefixos_sql.items() if sql.startswith(prefixo)), "outros")
+        if len(_nomes_sql) < LIMITE_NOMES_SQL:
+            _nomes_sql[sql] = nome
+    return nome
+
+def registrar_requisicao(metodo: str, rota: str, status: int, duracao: float) -> None:
+    chave = (metodo, rota)
+    # Cria o histograma da rota na primeira requisição
+    histograma = _duracoes_rota.get(chave)
+    if histograma is None:
+        histograma = _duracoes_rota.setdefault(chave, Histograma())
+    histograma.observar(duracao)
+    with _trava:
+        chave_status = (metodo, rota, str(status))
+        _requisicoes[chave_status] = _requisicoes.get(chave_status, 0) + 1
+
+def registrar_consulta(nome: str, duracao: float) -> None:
+    # Cria o histograma do comando na primeira execução
+    histograma = _duracoes_sql.get(nome)
+    if histograma is None:
+        histograma = _duracoes_sql.setdefault(nome, Histograma())
+    histograma.observar(duracao)
+
+def registrar_linhas(nome: str, linhas: int) -> None:
+    with _trava:
+        _linhas_sql[nome] = _linhas_sql.get(nome, 0) + linhas
+
+class CursorInstrumentado(sqlite3.Cursor):
+    # Cursor que mede o tempo de cada comando e conta as linhas lidas ou alteradas
+    _consulta = "outros"
+
+    def execute(self, sql, parametros=()):
+        self._consulta = nome_consulta(sql)
+        rastreamento.iniciar_chamada()
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            registrar_consulta(self._consulta, time.perf_counter() - inicio)
+            rastreamento.finalizar_chamada()
+            # Em INSERT/UPDATE/DELETE, rowcount é a quantidade de linhas alteradas
+            if self.rowcount > 0:
+                registrar_linhas(self._consulta, self.rowcount)
+
+    def executemany(self, sql, parametros):
+        self._consulta = nome_consulta(sql)
+        rastreamento.iniciar_chamada()
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            registrar_consulta(self._consulta, time.perf_counter() - inicio)
+            rastreamento.finalizar_chamada()
+            if self.rowcount > 0:
+                registrar_linhas(self._consulta, self.rowcount)
+
+    def fetchone(self):
+        linha = super().fetchone()
+        if linha is not None:
+            registrar_linhas(self._consulta, 1)
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = super().fetchmany(self.arraysize if size is None else size)
+        registrar_linhas(self._consulta, len(linhas))
+        return linhas
+
+    def fetchall(self):
+        linhas = super().fetchall()
+        registrar_linhas(self._consulta, len(linhas))
+        return linhas
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    # Conexão cujos cursores (inclusive os de conexao.execute) são instrumentados
+    def __init__(self, *args, **kwargs):
+        global _conexoes_criadas, _conexoes_ativas
+        super().__init__(*args, **kwargs)
+        with _trava:
+            _conexoes_criadas += 1
+            _conexoes_ativas += 1
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    # conexao.execute/executemany não passam por cursor(), então são redirecionados para ele
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def __del__(self):
+        global _conexoes_ativas
+        with _trava:
+            _conexoes_ativas -= 1
+
+def _rotulos(**rotulos) -> str:
+    # Formata os rótulos escapando barras, aspas e quebras de linha
+    def escapar(valor: str) -> str:
+        return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{nome}="{escapar(valor)}"' for nome, valor in rotulos.items()) + "}"
+
+def _formatar_histograma(linhas: list[str], nome: str, histograma: Histograma, **rotulos) -> None:
+    # Escreve as faixas acumuladas, a soma e a contagem de um histograma
+    with histograma.trava:
+        contagens = list(histograma.contagens)
+        soma = histograma.soma
+    acumulado = 0
+    for limite, contagem in zip(FAIXAS_SEGUNDOS, contagens):
+        acumulado += contagem
+        linhas.append(f"{nome}_bucket{_rotulos(**rotulos, le=limite)} {acumulado}")
+    acumulado += contagens[-1]
+    linhas.append(f"{nome}_bucket{_rotulos(**rotulos, le='+Inf')} {acumulado}")
+    linhas.append(f"{nome}_sum{_rotulos(**rotulos)} {soma}")
+    linhas.append(f"{nome}_count{_rotulos(**rotulos)} {acumulado}")
+
+def gerar_texto() -> str:
+    linhas = []
+    # Requisições HTTP
+    linhas += ["# HELP loja_requisicoes_total Requisições HTTP atendidas por rota e status",
+               "# TYPE loja_requisicoes_total counter"]
+    for (metodo, rota, status), quantidade in sorted(_requisicoes.items()):
+        linhas.append(f"loja_requisicoes_total{_rotulos(metodo=metodo, rota=rota, status=status)} {quantidade}")
+    linhas += ["# HELP loja_requisicao_duracao_segundos Duração das requisições HTTP por rota",
+               "# TYPE loja_requisicao_duracao_segundos histogram"]
+    for (metodo, rota), histograma in sorted(_duracoes_rota.items()):
+        _formatar_histograma(linhas, "loja_requisicao_duracao_segundos", histograma, metodo=metodo, rota=rota)
+    # Comandos SQL
+    linhas += ["# HELP loja_sql_duracao_segundos Duração da execução de cada comando SQL",
+               "# TYPE loja_sql_duracao_segundos histogram"]
+    for consulta, histograma in sorted(_duracoes_sql.items()):
+        _formatar_histograma(linhas, "loja_sql_duracao_segundos", histograma, consulta=consulta)
+    linhas += ["# HELP loja_sql_linhas_total Linhas lidas ou alteradas por comando SQL",
+               "# TYPE loja_sql_linhas_total counter"]
+    for consulta, quantidade in sorted(_linhas_sql.items()):
+        linhas.append(f"loja_sql_linhas_total{_rotulos(consulta=consulta)} {quantidade}")
+    # Conexões
+    linhas += ["# HELP loja_conexoes_criadas_total Conexões com o banco criadas",
+               "# TYPE loja_conexoes_criadas_total counter",
+               f"loja_conexoes_criadas_total {_conexoes_criadas}",
+               "# HELP loja_conexoes_ativas Conexões com o banco ainda abertas",
+               "# TYPE loja_conexoes_ativas gauge",
+               f"loja_conexoes_ativas {_conexoes_ativas}"]
+    # Indicadores registrados por outros módulos
+    for nome, (tipo, ajuda, funcao, rotulo) in sorted(_indicadores.items()):
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+        if rotulo is None:
+            linhas.append(f"{nome} {funcao()}")
+        else:
+            linhas += [f"{nome}{_rotulos(**{rotulo: chave})} {valor}" for chave, valor in sorted(funcao().items())]
+    return "\n".join(linhas) + "\n"
+
+class MiddlewareMetricas:
+    # Middleware ASGI que mede cada requisição HTTP pelo template da rota (ex.: /produtos/{id})
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        status = 500
+        async def enviar(mensagem):
+            nonlocal status
+            # Guarda o status enviado na resposta
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # O roteador grava a rota encontrada no próprio scope; sem rota, agrupa em um único rótulo
+            rota = scope.get("route")
+            registrar_requisicao(scope["method"], rota.path if rota else "sem_rota", status, time.perf_counter() - inicio)
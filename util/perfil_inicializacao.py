@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Mede o tempo de inicialização da aplicação em um processo Python novo (partida a frio):
+# tempo por fase (importação, inicialização do banco, primeira requisição) e por módulo importado.
+# Uso: python -m util.perfil_inicializacao --top 25
+
+# Diretório raiz do projeto, onde fica o main.py
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script executado no processo filho para medir cada fase separadamente
+SCRIPT_FASES = """
+import json, sys, time
+inicio = time.perf_counter()
+import main
+fim_importacao = time.perf_counter()
+from util import initializer
+initializer.inicializar_banco()
+fim_banco = time.perf_counter()
+modulos_carregados = sorted(sys.modules)
+from fastapi.testclient import TestClient
+cliente = TestClient(main.app)
+inicio_requisicao = time.perf_counter()
+status = cliente.get("/").status_code
+fim_requisicao = time.perf_counter()
+print(json.dumps({
+    "fases": {
+        "importacao_main": fim_importacao - inicio,
+        "inicializacao_banco": fim_banco - fim_importacao,
+        "primeira_requisicao": fim_requisicao - inicio_requisicao,
+    },
+    "status_primeira_requisicao": status,
+    "modulos_carregados": modulos_carregados,
+}))
+"""
+
+def executar_filho(argumentos: list[str], caminho_banco: str) -> subprocess.CompletedProcess:
+    # Executa o Python em um processo novo, na raiz do projeto e com um banco temporário
+    ambiente = dict(os.environ, TEST_DATABASE_PATH=caminho_banco)
+    return subprocess.run([sys.executable, *argumentos], cwd=RAIZ_PROJETO, env=ambiente,
+                          capture_output=True, text=True, check=True)
+
+def medir_fases() -> dict:
+    # Mede as fases em um banco temporário novo (inclui a criação do schema e dos dados iniciais)
+    with tempfile.TemporaryDirectory() as diretorio:
+        resultado = executar_filho(["-c", SCRIPT_FASES], os.path.join(diretorio, "dados.db"))
+    # A última linha da saída padrão contém o JSON com as medições
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+def medir_importacoes() -> list[dict]:
+    # Executa "import main" com -X importtime, que escreve o tempo de cada módulo na saída de erro
+    with tempfile.TemporaryDirectory() as diretorio:
+        resultado = executar_filho(["-X", "importtime", "-c", "import main"], os.path.join(diretorio, "dados.db"))
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        # Formato: "import time: <próprio us> | <acumulado us> | <indentação><módulo>"
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        modulos.append({
+            "modulo": nome.strip(),
+            "proprio_ms": int(proprio) / 1000,
+            "acumulado_ms": int(acumulado) / 1000,
+            "nivel": (len(nome) - len(nome.lstrip())) // 2,
+        })
+    return modulos
+
+def agrupar_por_pacote(modulos: list[dict]) -> dict[str, float]:
+    # Soma o tempo próprio dos módulos de cada pacote de primeiro nível
+    pacotes: dict[str, float] = {}
+    for modulo in modulos:
+        pacote = modulo["modulo"].split(".")[0]
+        pacotes[pacote] = pacotes.get(pacote, 0.0) + modulo["proprio_ms"]
+    return dict(sorted(pacotes.items(), key=lambda item: item[1], reverse=True))
+
+def gerar_relatorio(top: int = 20) -> dict:
+    # Reúne as medições de fases e de importações em um único relatório
+    fases = medir_fases()
+    modulos = medir_importacoes()
+    return {
+        "fases_ms": {fase: segundos * 1000 for fase, segundos in fases["fases"].items()},
+        "pacotes_ms": agrupar_por_pacote(modulos),
+        "modulos_mais_lentos": sorted(modulos, key=lambda m: m["proprio_ms"], reverse=True)[:top],
+        "modulos_carregados": fases["modulos_carregados"],
+    }
+
+def imprimir_relatorio(relatorio: dict, top: int) -> None:
+    # Imprime as fases, os pacotes e os módulos mais lentos
+    print("Fases da inicialização (ms):")
+    for fase, ms in relatorio["fases_ms"].items():
+        print(f"  {fase:<24} {ms:9.1f}")
+    print(f"  {'total':<24} {sum(relatorio['fases_ms'].values()):9.1f}")
+    print(f"\nPacotes (tempo próprio de importação, top {top}):")
+    for pacote, ms in list(relatorio["pacotes_ms"].items())[:top]:
+        print(f"  {pacote:<32} {ms:9.1f}")
+    print(f"\nMódulos mais lentos (top {top}):")
+    for modulo in relatorio["modulos_mais_lentos"]:
+        print(f"  {modulo['modulo']:<48} próprio {modulo['proprio_ms']:8.1f} | acumulado {modulo['acumulado_ms']:8.1f}")
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Relatório de tempo de inicialização da aplicação")
+    parser.add_argument("--top", type=int, default=20, help="quantidade de pacotes e módulos listados")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório completo em JSON")
+    args = parser.parse_args(argv)
+    relatorio = gerar_relatorio(args.top)
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        imprimir_relatorio(relatorio, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi.routing import APIRoute
+
+# Perfil de uma requisição sob demanda, apenas para administradores: com o cabeçalho
+# X-Profile (ou o parâmetro ?_perfil=) igual a "cprofile" ou "amostragem", a rota é executada
+# sob o cProfile (arquivo .prof, para pstats/snakeviz) ou sob um perfilador por amostragem
+# (arquivo .folded, para flamegraph.pl/speedscope). O arquivo é gravado em PERFIL_DIRETORIO
+# com a rota e o horário no nome, e o cabeçalho X-Profile-File da resposta informa o nome.
+
+logger = logging.getLogger(__name__)
+
+# Diretório onde os perfis são gravados
+DIRETORIO = os.environ.get('PERFIL_DIRETORIO', 'perfis')
+# Intervalo mínimo, em segundos, entre dois perfis no mesmo processo
+INTERVALO_MINIMO = float(os.environ.get('PERFIL_INTERVALO_MINIMO', '30'))
+# Intervalo entre as amostras do perfilador por amostragem
+INTERVALO_AMOSTRAGEM = float(os.environ.get('PERFIL_INTERVALO_AMOSTRAGEM_MS', '1')) / 1000
+MODOS = ("cprofile", "amostragem")
+
+class Perfil:
+    # Perfil de uma requisição, iniciado e parado na thread que executa a rota
+    def __init__(self, modo: str):
+        self.modo = modo
+        self.perfilador: Optional[cProfile.Profile] = None
+        self.pilhas: Counter = Counter()
+        self._thread_alvo: Optional[int] = None
+        self._parar = threading.Event()
+        self._amostrador: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self.modo == "cprofile":
+            self.perfilador = cProfile.Profile()
+            self.perfilador.enable()
+            return
+        # Na amostragem, uma thread auxiliar lê a pilha da thread da rota em intervalos regulares
+        self._thread_alvo = threading.get_ident()
+        self._amostrador = threading.Thread(target=self._amostrar, daemon=True)
+        self._amostrador.start()
+
+    def parar(self) -> None:
+        if self.perfilador is not None:
+            self.perfilador.disable()
+            return
+        self._parar.set()
+        if self._amostrador is not None:
+            self._amostrador.join()
+
+    def _amostrar(self) -> None:
+        while not self._parar.wait(INTERVALO_AMOSTRAGEM):
+            quadro = sys._current_frames().get(self._thread_alvo)
+            # Monta a pilha da raiz para o topo, no formato "arquivo:função;arquivo:função"
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                quadro = quadro.f_back
+            if pilha:
+                self.pilhas[";".join(reversed(pilha))] += 1
+
+    def gravar(self, rota: str) -> str:
+        # Monta o nome do arquivo com o horário e a rota (ex.: 20250101_120000_GET_produtos_id.prof)
+        os.makedirs(DIRETORIO, exist_ok=True)
+        nome_rota = re.sub(r"[^A-Za-z0-9]+", "_", rota).strip("_") or "raiz"
+        extensao = "prof" if self.modo == "cprofile" else "folded"
+        caminho = os.path.join(DIRETORIO, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{nome_rota}.{extensao}")
+        if self.perfilador is not None:
+            self.perfilador.dump_stats(caminho)
+        else:
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                for pilha, amostras in self.pilhas.most_common():
+                    arquivo.write(f"{pilha} {amostras}\n")
+        return caminho
+
+# Perfil da requisição corrente (copiado para a thread que executa as rotas síncronas)
+_perfil: ContextVar[Optional[Perfil]] = ContextVar("perfil_requisicao", default=None)
+# Controle do limite de frequência: um perfil por vez e no máximo um a cada INTERVALO_MINIMO
+_trava = threading.Lock()
+_ultimo_perfil: Optional[float] = None
+
+def envolver_rota(funcao):
+    # Executa a função da rota sob o perfil da requisição, se houver, na própria thread da rota
+    if inspect.iscoroutinefunction(funcao):
+        @functools.wraps(funcao)
+        async def rota_assincrona(*args, **kwargs):
+            perfil = _perfil.get()
+            if perfil is None:
+                return await funcao(*args, **kwargs)
+            perfil.iniciar()
+            try:
+                return await funcao(*args, **kwargs)
+            finally:
+                perfil.parar()
+        return rota_assincrona
+    @functools.wraps(funcao)
+    def rota_sincrona(*args, **kwargs):
+        perfil = _perfil.get()
+        if perfil is None:
+            return funcao(*args, **kwargs)
+        perfil.iniciar()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            perfil.parar()
+    return rota_sincrona
+
+class RotaPerfilavel(APIRoute):
+    # Classe de rota que permite perfilar a função da rota na thread em que ela roda
+    def get_route_handler(self):
+        self.dependant.call = envolver_rota(self.dependant.call)
+        return super().get_route_handler()
+
+def modo_solicitado(scope) -> Optional[str]:
+    # Lê o modo pedido no cabeçalho X-Profile ou no parâmetro _perfil da URL
+    for nome, valor in scope["headers"]:
+        if nome == b"x-profile":
+            return valor.decode("latin-1").strip().lower()
+    valores = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("_perfil")
+    return valores[0].strip().lower() if valores else None
+
+def reservar() -> bool:
+    global _ultimo_perfil
+    # Permite um perfil por vez e respeita o intervalo mínimo entre perfis
+    if not _trava.acquire(blocking=False):
+        return False
+    if _ultimo_perfil is not None and time.monotonic() - _ultimo_perfil < INTERVALO_MINIMO:
+        _trava.release()
+        return False
+    _ultimo_perfil = time.monotonic()
+    return True
+
+class MiddlewarePerfil:
+    # Middleware ASGI que ativa o perfil quando pedido por um administrador (precisa da sessão no scope)
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        modo = modo_solicitado(scope) if scope["type"] == "http" else None
+        if modo is None:
+            await self.app(scope, receive, send)
+            return
+        usuario = scope.get("session", {}).get("usuario")
+        # Pedidos de quem não é administrador, de modo desconhecido ou acima do limite seguem sem perfil
+        if modo not in MODOS or not usuario or usuario.get("tipo") != "admin":
+            situacao = "negado"
+        elif not reservar():
+            situacao = "limitado"
+        else:
+            situacao = None
+        if situacao:
+            await self.app(scope, receive, self._com_cabecalhos(send, [(b"x-profile-status", situacao.encode())]))
+            return
+        perfil = Perfil(modo)
+        token = _perfil.set(perfil)
+        try:
+            async def enviar(mensagem):
+                # A rota já terminou quando a resposta começa: grava o perfil e informa o arquivo
+                if mensagem["type"] == "http.response.start":
+                    rota = scope.get("route")
+                    caminho = perfil.gravar(f"{scope['method']} {rota.path if rota else scope['path']}")
+                    logger.info(f"Perfil ({modo}) gravado em {caminho}")
+                    mensagem["headers"] = list(mensagem.get("headers", [])) + [
+                        (b"x-profile-status", b"gravado"), (b"x-profile-file", os.path.basename(caminho).encode())]
+                await send(mensagem)
+            await self.app(scope, receive, enviar)
+        finally:
+            _perfil.reset(token)
+            _trava.release()
+
+    @staticmethod
+    def _com_cabecalhos(send, cabecalhos):
+        # Acrescenta cabeçalhos ao início da resposta
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem["headers"] = list(mensagem.get("headers", [])) + cabecalhos
+            await send(mensagem)
+        return enviar
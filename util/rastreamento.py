@@ -0,0 +1,108 @@
+import contextvars
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+# Rastreamento de SQL por requisição (opcional, ativado com RASTREAMENTO_SQL=1).
+# As conexões recebem um set_trace_callback que registra cada comando executado pelo SQLite
+# (já com os valores dos parâmetros) na requisição corrente. Ao final da requisição, a quantidade
+# de comandos vai no cabeçalho X-Query-Count, comandos lentos são registrados no log e comandos
+# repetidos muitas vezes (padrão N+1) geram um aviso.
+
+logger = logging.getLogger(__name__)
+
+# Ativa o rastreamento (tem custo: cada comando passa por uma função Python)
+ATIVO = os.environ.get('RASTREAMENTO_SQL', '0') == '1'
+# Duração a partir da qual um comando é registrado como lento
+LIMITE_LENTO_MS = float(os.environ.get('RASTREAMENTO_SQL_LENTO_MS', '100'))
+# Quantidade de execuções do mesmo comando (com parâmetros diferentes) que caracteriza N+1
+LIMITE_N_MAIS_1 = int(os.environ.get('RASTREAMENTO_SQL_N_MAIS_1', '10'))
+# Quantidade máxima de comandos guardados por requisição
+LIMITE_COMANDOS = 1000
+
+# Literais de texto e números, substituídos por ? para agrupar comandos iguais
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+class Rastro:
+    # Comandos executados durante uma requisição
+    def __init__(self):
+        # Cada comando: [chamada, texto, início, duração]
+        self.comandos: list[list] = []
+        self.total = 0
+        # Identificador da chamada execute/executemany em andamento
+        self.chamada = 0
+
+_rastro: contextvars.ContextVar[Optional[Rastro]] = contextvars.ContextVar("rastro_sql", default=None)
+
+def registrar_comando(texto: str) -> None:
+    # Callback do set_trace_callback: chamado pelo SQLite a cada comando (inclusive BEGIN e triggers)
+    rastro = _rastro.get()
+    if rastro is None:
+        return
+    agora = time.perf_counter()
+    rastro.total += 1
+    # A duração do comando anterior da mesma chamada vai até o início deste
+    if rastro.comandos and rastro.comandos[-1][3] is None:
+        rastro.comandos[-1][3] = agora - rastro.comandos[-1][2]
+    if len(rastro.comandos) < LIMITE_COMANDOS:
+        rastro.comandos.append([rastro.chamada, texto, agora, None])
+
+def iniciar_chamada() -> None:
+    # Marca o início de um execute/executemany (os comandos de um executemany contam como uma chamada)
+    rastro = _rastro.get()
+    if rastro is not None:
+        rastro.chamada += 1
+
+def finalizar_chamada() -> None:
+    # Fecha a duração do último comando da chamada
+    rastro = _rastro.get()
+    if rastro is not None and rastro.comandos and rastro.comandos[-1][3] is None:
+        rastro.comandos[-1][3] = time.perf_counter() - rastro.comandos[-1][2]
+
+def normalizar(texto: str) -> str:
+    # Remove os valores literais para que o mesmo comando com parâmetros diferentes seja agrupado
+    return _LITERAIS.sub("?", texto)
+
+def analisar(rastro: Rastro, rota: str) -> None:
+    # Registra os comandos lentos
+    for _, texto, _, duracao in rastro.comandos:
+        if duracao is not None and duracao * 1000 >= LIMITE_LENTO_MS:
+            logger.warning(f"Comando lento ({duracao * 1000:.1f} ms) em {rota}: {texto.strip()}")
+    # Conta em quantas chamadas diferentes cada comando normalizado foi executado
+    chamadas: dict[str, set[int]] = {}
+    for chamada, texto, _, _ in rastro.comandos:
+        chamadas.setdefault(normalizar(texto), set()).add(chamada)
+    for texto, ids in chamadas.items():
+        if len(ids) >= LIMITE_N_MAIS_1:
+            logger.warning(f"Possível N+1 em {rota}: comando executado {len(ids)} vezes: {texto.strip()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for _, texto, _, duracao in rastro.comandos:
+            logger.debug(f"{rota} {(duracao or 0) * 1000:8.3f} ms {texto.strip()}")
+
+class MiddlewareRastreamento:
+    # Middleware ASGI que cria o rastro de cada requisição e informa a quantidade de comandos
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rastro = Rastro()
+        token = _rastro.set(rastro)
+        async def enviar(mensagem):
+            # Adiciona a quantidade e o tempo total dos comandos ao cabeçalho da resposta
+            if mensagem["type"] == "http.response.start":
+                tempo_ms = sum(comando[3] or 0 for comando in rastro.comandos) * 1000
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [
+                    (b"x-query-count", str(rastro.total).encode()),
+                    (b"x-query-time-ms", f"{tempo_ms:.3f}".encode())]
+            await send(mensagem)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _rastro.reset(token)
+            rota = scope.get("route")
+            analisar(rastro, f"{scope['method']} {rota.path if rota else scope['path']}")
@@ -0,0 +1,285 @@
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import cookie_parser
+from models.sessao import Sessao
+from repo import sessao_repo
+from util import metricas, sincronizacao
+from util.database import LOJA_PADRAO, loja_atual
+
+# Sessões no servidor: o cookie leva só um identificador opaco e os dados ficam no banco (tabela Sessao),
+# com um cache LRU em memória por processo. Assim cada requisição carrega um cookie pequeno, a leitura
+# da sessão é um acesso a dicionário e as sessões de um usuário podem ser revogadas no servidor.
+# Cada loja guarda as sessões no próprio banco e usa um cookie próprio; o cache é indexado pela loja.
+
+logger = logging.getLogger(__name__)
+
+# Nome do cookie com o identificador da sessão (as demais lojas usam "sessao_<loja>")
+NOME_COOKIE = "sessao"
+# Duração da sessão em segundos (renovada com o uso; padrão: 14 dias)
+DURACAO = int(os.environ.get('SESSAO_DURACAO', str(14 * 24 * 3600)))
+# Quantidade máxima de sessões mantidas no cache de cada processo
+LIMITE_CACHE = int(os.environ.get('SESSAO_CACHE_MAX', '10000'))
+# Intervalo (em segundos) entre as remoções das sessões vencidas do banco
+INTERVALO_VARREDURA = float(os.environ.get('SESSAO_INTERVALO_VARREDURA', '600'))
+# Envia o cookie apenas por HTTPS (SESSAO_COOKIE_SEGURO=1 em produção)
+COOKIE_SEGURO = os.environ.get('SESSAO_COOKIE_SEGURO') == "1"
+
+# Cache LRU de sessões indexado pela loja e pelo hash do identificador, e os hashes de cada usuário
+# de cada loja (para revogação)
+_cache: "OrderedDict[tuple[str, str], Sessao]" = OrderedDict()
+_por_usuario: dict[tuple[str, int], set[str]] = {}
+# Trava do cache (a revogação é chamada pelos repositórios, em threads do threadpool)
+_trava = threading.Lock()
+# Momento da próxima remoção das sessões vencidas de cada loja
+_proxima_varredura: dict[str, float] = {}
+# Contadores de acertos e falhas para acompanhamento do cache
+_acertos = 0
+_falhas = 0
+
+class DadosSessao(dict):
+    # Dicionário da sessão exposto em request.session, que registra se foi alterado pela rota
+    def __init__(self, dados: dict = None):
+        super().__init__(dados or {})
+        self.modificada = False
+        self.regenerada = False
+
+    def __setitem__(self, chave, valor):
+        self.modificada = True
+        super().__setitem__(chave, valor)
+
+    def __delitem__(self, chave):
+        self.modificada = True
+        super().__delitem__(chave)
+
+    def clear(self):
+        self.modificada = True
+        super().clear()
+
+    def pop(self, *args):
+        self.modificada = True
+        return super().pop(*args)
+
+    def setdefault(self, chave, valor=None):
+        self.modificada = chave not in self or self.modificada
+        return super().setdefault(chave, valor)
+
+    def update(self, *args, **kwargs):
+        self.modificada = True
+        super().update(*args, **kwargs)
+
+    def regenerar(self) -> None:
+        # Pede um novo identificador para a sessão, mantendo os dados (ex.: após revogar as sessões do usuário)
+        self.regenerada = True
+        self.modificada = True
+
+def _hash(token: str) -> str:
+    # O banco e o cache guardam apenas o hash do identificador enviado no cookie
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def nome_cookie() -> str:
+    # Cookie da loja corrente; lojas atendidas por prefixo compartilham o host e não podem ler a sessão das outras
+    loja = loja_atual()
+    return NOME_COOKIE if loja == LOJA_PADRAO else f"{NOME_COOKIE}_{loja}"
+
+def _id_usuario(dados: dict) -> Optional[int]:
+    # Extrai o ID do usuário logado dos dados da sessão
+    usuario = dados.get("usuario")
+    return usuario.get("id") if isinstance(usuario, dict) else None
+
+def _guardar(sessao: Sessao) -> None:
+    loja = loja_atual()
+    with _trava:
+        # Coloca a sessão no fim do LRU e a associa ao usuário
+        _cache[(loja, sessao.id)] = sessao
+        _cache.move_to_end((loja, sessao.id))
+        if sessao.id_usuario is not None:
+            _por_usuario.setdefault((loja, sessao.id_usuario), set()).add(sessao.id)
+        # Remove as sessões menos usadas quando o limite é ultrapassado
+        while len(_cache) > LIMITE_CACHE:
+            (loja_removida, _), removida = _cache.popitem(last=False)
+            _desassociar(loja_removida, removida)
+
+def _desassociar(loja: str, sessao: Sessao) -> None:
+    # Remove a sessão do conjunto de sessões do usuário (chamada com a trava adquirida)
+    ids = _por_usuario.get((loja, sessao.id_usuario))
+    if ids is not None:
+        ids.discard(sessao.id)
+        if not ids:
+            del _por_usuario[(loja, sessao.id_usuario)]
+
+def _descartar(id: str) -> None:
+    loja = loja_atual()
+    with _trava:
+        # Remove a sessão do cache deste processo
+        sessao = _cache.pop((loja, id), None)
+        if sessao is not None:
+            _desassociar(loja, sessao)
+
+def revogar_cache_usuario(id_usuario: int) -> None:
+    loja = loja_atual()
+    with _trava:
+        # Remove do cache deste processo todas as sessões do usuário na loja corrente
+        for id in _por_usuario.pop((loja, id_usuario), ()):
+            _cache.pop((loja, id), None)
+
+def limpar() -> None:
+    loja = loja_atual()
+    with _trava:
+        # Remove do cache deste processo todas as sessões da loja corrente
+        for chave in [chave for chave in _cache if chave[0] == loja]:
+            del _cache[chave]
+        for chave in [chave for chave in _por_usuario if chave[0] == loja]:
+            del _por_usuario[chave]
+
+def aplicar_alteracoes(ids_usuario: Optional[set[int]]) -> None:
+    # Aplica as revogações e logouts feitos por outros processos (None descarta tudo)
+    if ids_usuario is None:
+        limpar()
+        return
+    for id_usuario in ids_usuario:
+        revogar_cache_usuario(id_usuario)
+
+def buscar_no_cache(token: str, agora: float) -> Optional[Sessao]:
+    global _acertos, _falhas
+    chave = (loja_atual(), _hash(token))
+    # Busca a sessão no cache, marcando-a como usada recentemente
+    with _trava:
+        sessao = _cache.get(chave)
+        if sessao is not None:
+            _cache.move_to_end(chave)
+    if sessao is not None and sessao.expira_em > agora:
+        _acertos += 1
+        return sessao
+    _falhas += 1
+    # Sessão vencida no cache ou ausente: será procurada no banco (que pode ter uma expiração renovada)
+    if sessao is not None:
+        _descartar(sessao.id)
+    return None
+
+def carregar_do_banco(token: str, agora: float) -> Optional[Sessao]:
+    # Lê a sessão do banco e a coloca no cache
+    sessao = sessao_repo.obter_sessao(_hash(token), agora)
+    if sessao is not None:
+        _guardar(sessao)
+    return sessao
+
+def carregar(token: str, agora: float) -> Optional[Sessao]:
+    # Carrega a sessão do cache ou, se ausente ou vencida no cache, do banco
+    return buscar_no_cache(token, agora) or carregar_do_banco(token, agora)
+
+def precisa_salvar(token: Optional[str], sessao: Optional[Sessao], dados: DadosSessao, agora: float) -> bool:
+    # Indica se salvar() vai gravar no banco ou enviar um cookie (a maioria das requisições não precisa)
+    if not dados:
+        return sessao is not None or bool(token)
+    return (sessao is None or dados.regenerada or dados.modificada or _id_usuario(dados) != sessao.id_usuario
+        or sessao.expira_em - agora < DURACAO / 2)
+
+def salvar(token: Optional[str], sessao: Optional[Sessao], dados: DadosSessao, agora: float) -> Optional[str]:
+    # Persiste as mudanças feitas pela rota e retorna o cabeçalho Set-Cookie, se for preciso enviá-lo
+    if not precisa_salvar(token, sessao, dados, agora):
+        return None
+    if not dados:
+        # Sessão esvaziada (logout): remove do banco e do cache e apaga o cookie
+        if sessao is not None:
+            sessao_repo.excluir_sessao(sessao.id)
+            _descartar(sessao.id)
+        return cabecalho_cookie("", 0) if token else None
+    id_usuario = _id_usuario(dados)
+    expira_em = agora + DURACAO
+    if sessao is None or dados.regenerada or id_usuario != sessao.id_usuario:
+        # Sessão nova, regenerada ou de outro usuário (login): novo identificador, contra fixação de sessão
+        if sessao is not None:
+            sessao_repo.excluir_sessao(sessao.id)
+            _descartar(sessao.id)
+        token = secrets.token_urlsafe(32)
+        sessao = Sessao(_hash(token), id_usuario, dict(dados), expira_em)
+    elif dados.modificada:
+        # Dados alterados pela rota: grava uma cópia nova (a do cache pode estar em uso por outra requisição)
+        sessao = replace(sessao, dados=dict(dados), expira_em=expira_em)
+    elif sessao.expira_em - agora < DURACAO / 2:
+        # Sem alterações, mas com menos da metade da duração restante: renova a expiração
+        sessao = replace(sessao, expira_em=expira_em)
+    else:
+        return None
+    sessao_repo.gravar_sessao(sessao)
+    _guardar(sessao)
+    return cabecalho_cookie(token, DURACAO)
+
+def cabecalho_cookie(token: str, duracao: int) -> str:
+    # Monta o Set-Cookie (duração 0 apaga o cookie no navegador)
+    cabecalho = f"{nome_cookie()}={token}; Path=/; Max-Age={duracao}; HttpOnly; SameSite=Lax"
+    return cabecalho + "; Secure" if COOKIE_SEGURO else cabecalho
+
+def precisa_varrer(agora: float) -> bool:
+    # Indica se já passou o intervalo desde a última remoção das sessões vencidas da loja
+    return agora >= _proxima_varredura.get(loja_atual(), 0.0)
+
+def varrer_se_preciso(agora: float) -> int:
+    # Remove do banco da loja as sessões vencidas, no máximo uma vez por intervalo
+    loja = loja_atual()
+    if not precisa_varrer(agora):
+        return 0
+    _proxima_varredura[loja] = agora + INTERVALO_VARREDURA
+    try:
+        removidas = sessao_repo.excluir_sessoes_expiradas(agora)
+    except Exception as e:
+        # Banco ocupado ou sem a tabela: tenta novamente no próximo intervalo
+        logger.warning(f"Falha ao remover sessões vencidas: {e}")
+        return 0
+    if removidas:
+        logger.info(f"{removidas} sessões vencidas removidas")
+    return removidas
+
+class MiddlewareSessao:
+    # Middleware ASGI que carrega a sessão do cookie em scope["session"] e grava as alterações da rota
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        agora = time.time()
+        # As operações no banco (escritas com fsync, que podem esperar pelo lock) rodam no threadpool,
+        # para não parar o loop de eventos; os acessos ao cache continuam no próprio loop
+        if precisa_varrer(agora):
+            await run_in_threadpool(varrer_se_preciso, agora)
+        # Localiza o identificador no cabeçalho Cookie e carrega a sessão (cache ou banco)
+        token = None
+        for nome, valor in scope["headers"]:
+            if nome == b"cookie":
+                token = cookie_parser(valor.decode("latin-1")).get(nome_cookie())
+                break
+        sessao = buscar_no_cache(token, agora) if token else None
+        if token and sessao is None:
+            sessao = await run_in_threadpool(carregar_do_banco, token, agora)
+        dados = DadosSessao(sessao.dados if sessao else None)
+        scope["session"] = dados
+
+        async def enviar(mensagem):
+            # A rota já terminou quando a resposta começa: grava a sessão e envia o cookie, se preciso
+            if mensagem["type"] == "http.response.start" and precisa_salvar(token, sessao, dados, agora):
+                cabecalho = await run_in_threadpool(salvar, token, sessao, dados, agora)
+                if cabecalho:
+                    mensagem["headers"] = list(mensagem.get("headers", [])) + [(b"set-cookie", cabecalho.encode("latin-1"))]
+            await send(mensagem)
+        await self.app(scope, receive, enviar)
+
+# Revogações e logouts feitos em outros processos chegam pelo registro de alterações
+sincronizacao.registrar("sessao", aplicar_alteracoes)
+
+# Expõe o tamanho e a eficiência do cache de sessões no endpoint de métricas
+metricas.registrar_indicador("loja_sessoes_cache_entradas", "gauge",
+    "Sessões no cache deste processo", lambda: len(_cache))
+metricas.registrar_indicador("loja_sessoes_cache_acertos_total", "counter",
+    "Sessões lidas do cache", lambda: _acertos)
+metricas.registrar_indicador("loja_sessoes_cache_falhas_total", "counter",
+    "Sessões procuradas no banco", lambda: _falhas)
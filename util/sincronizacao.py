@@ -0,0 +1,102 @@
+import logging
+import sqlite3
+import threading
+from typing import Callable, Optional
+from starlette.concurrency import run_in_threadpool
+from util.database import obter_caminho_banco
+from sql.alteracao_sql import GET_ALTERACOES_APOS, GET_ULTIMA_ALTERACAO
+
+# Mantém os caches em memória de cada processo (worker) coerentes com o banco.
+# Os triggers gravam cada alteração do catálogo na tabela Alteracao; antes de cada requisição,
+# o processo consulta PRAGMA data_version (que muda quando outra conexão confirma uma escrita)
+# e só então lê as alterações novas, repassando-as aos callbacks registrados por escopo.
+# Cada loja (banco) tem o seu próprio acompanhamento; os callbacks rodam no contexto da loja sincronizada.
+
+logger = logging.getLogger(__name__)
+
+# Escopo especial que invalida todos os caches (ex.: após cargas em lote)
+ESCOPO_TUDO = "tudo"
+
+# Callbacks por escopo; recebem o conjunto de chaves alteradas ou None para descartar tudo
+_callbacks: dict[str, list[Callable[[Optional[set[int]]], None]]] = {}
+# Acompanhamento de cada banco, indexado pelo caminho
+_estados: dict[str, "_Estado"] = {}
+# Trava que serializa as verificações feitas por threads diferentes
+_trava = threading.Lock()
+
+class _Estado:
+    # Conexão persistente usada apenas para leitura, com o último data_version observado
+    # e a última alteração já aplicada por este processo
+    def __init__(self, caminho: str):
+        # Abre a conexão persistente; ela nunca escreve, então data_version reflete só as escritas dos outros
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        # Parte do estado atual: alterações anteriores já estão refletidas em caches vazios
+        self.versao_dados = self.conexao.execute("PRAGMA data_version").fetchone()[0]
+        self.ultima_sequencia = self.conexao.execute(GET_ULTIMA_ALTERACAO).fetchone()[0]
+
+def registrar(escopo: str, callback: Callable[[Optional[set[int]]], None]) -> None:
+    # Registra a função chamada quando houver alterações no escopo
+    _callbacks.setdefault(escopo, []).append(callback)
+
+def sincronizar() -> int:
+    caminho = obter_caminho_banco()
+    with _trava:
+        try:
+            # Na primeira chamada para o banco, apenas registra o ponto de partida
+            estado = _estados.get(caminho)
+            if estado is None:
+                _estados[caminho] = _Estado(caminho)
+                return 0
+            # Verificação barata: se nenhuma outra conexão confirmou escritas, não há o que ler
+            versao_dados = estado.conexao.execute("PRAGMA data_version").fetchone()[0]
+            if versao_dados == estado.versao_dados:
+                return 0
+            estado.versao_dados = versao_dados
+            # Lê as alterações confirmadas desde a última sincronização
+            linhas = estado.conexao.execute(GET_ALTERACOES_APOS, (estado.ultima_sequencia,)).fetchall()
+        except sqlite3.OperationalError as e:
+            # Banco ainda sem a tabela Alteracao (schema não inicializado)
+            logger.debug(f"Sincronização ignorada: {e}")
+            return 0
+        if not linhas:
+            return 0
+        # Se a primeira alteração nova não é a seguinte à última lida, houve poda e algo se perdeu
+        perdeu_alteracoes = linhas[0][0] != estado.ultima_sequencia + 1
+        estado.ultima_sequencia = linhas[-1][0]
+    # Agrupa as chaves alteradas por escopo (None significa descartar tudo do escopo)
+    alteracoes: dict[str, Optional[set[int]]] = {}
+    for _, escopo, chave in linhas:
+        if escopo == ESCOPO_TUDO or perdeu_alteracoes:
+            alteracoes = {escopo_registrado: None for escopo_registrado in _callbacks}
+            break
+        if chave is None:
+            alteracoes[escopo] = None
+        elif alteracoes.setdefault(escopo, set()) is not None:
+            alteracoes[escopo].add(chave)
+    if perdeu_alteracoes:
+        logger.warning("Alterações podadas antes de serem lidas; todos os caches foram descartados")
+    # Repassa as alterações aos callbacks, fora da trava
+    for escopo, chaves in alteracoes.items():
+        for callback in _callbacks.get(escopo, []):
+            callback(chaves)
+    # Retorna a quantidade de alterações processadas
+    return len(linhas)
+
+def fechar() -> None:
+    with _trava:
+        # Fecha as conexões persistentes de todos os bancos (ex.: no encerramento do worker)
+        for estado in _estados.values():
+            estado.conexao.close()
+        _estados.clear()
+
+class MiddlewareSincronizacao:
+    # Middleware ASGI que aplica as alterações feitas por outros processos antes de cada requisição
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            # No threadpool: a leitura das alterações espera a trava e os callbacks podem reconstruir caches
+            # inteiros (ex.: o índice de autocompletar após uma carga em lote), o que travaria o loop de eventos
+            await run_in_threadpool(sincronizar)
+        await self.app(scope, receive, send)
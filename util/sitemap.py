@@ -0,0 +1,237 @@
+import logging
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from typing import Iterator, Optional, TextIO
+from xml.sax.saxutils import escape
+from models.produto import Produto
+from repo import produto_repo
+from util import metricas
+from util.database import loja_atual, obter_loja, usar_loja
+
+# Sitemap e feed de produtos gerados a partir de um único cursor (lido em partes) e gravados em disco,
+# um diretório por versão do catálogo (última alteração de produtos ou categorias). Enquanto a versão não
+# muda, as requisições apenas leem os arquivos; memória e tempo de geração não dependem do tamanho do catálogo.
+# Os arquivos guardam um marcador no lugar do endereço do site, trocado pelo endereço da requisição na leitura,
+# para que hosts diferentes (ou um Host forjado) não provoquem novas gerações.
+
+logger = logging.getLogger(__name__)
+
+# Com uma versão anterior em disco, a nova é gerada em uma thread em segundo plano enquanto a anterior
+# continua sendo servida; a requisição só espera a geração quando a loja ainda não tem nenhuma versão.
+
+# Diretório dos arquivos gerados (um subdiretório por loja e, dentro dele, por versão do catálogo)
+DIRETORIO = os.environ.get('SITEMAP_DIRETORIO', 'sitemaps')
+# URLs por arquivo de sitemap (limite do protocolo: 50.000); acima disso, sitemap.xml vira um índice
+URLS_POR_ARQUIVO = int(os.environ.get('SITEMAP_URLS_POR_ARQUIVO', '50000'))
+# Tempo mínimo (em segundos) entre gerações: catálogos alterados a todo momento (ex.: estoque a cada pedido)
+# só disparam uma nova geração quando a versão servida tiver essa idade
+INTERVALO_MINIMO = float(os.environ.get('SITEMAP_INTERVALO_MINIMO', '300'))
+# Produtos lidos do cursor por vez
+TAMANHO_LOTE = 1000
+# Tamanho aproximado dos blocos enviados na resposta
+TAMANHO_BLOCO = 64 * 1024
+
+# Nomes dos arquivos servidos
+ARQUIVO_SITEMAP = "sitemap.xml"
+ARQUIVO_FEED = "produtos.xml"
+FORMATO_PARTE = re.compile(r"^sitemap-\d+\.xml$")
+# Marcador do endereço do site; o texto escapado dos produtos nunca contém "<"
+MARCADOR_URL = "<!--url-->"
+# Caracteres de controle não permitidos em XML, removidos dos textos dos produtos
+CARACTERES_INVALIDOS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Páginas fixas incluídas no sitemap, antes dos produtos (as listagens são administrativas)
+PAGINAS = [""]
+
+# Trava que impede duas gerações simultâneas no mesmo processo
+_trava = threading.Lock()
+# Thread da última geração em segundo plano
+_thread: Optional[threading.Thread] = None
+# Quantidade de gerações feitas por este processo
+_geracoes = 0
+
+class _EscritorSitemap:
+    # Grava as URLs em arquivos sitemap-N.xml, abrindo um novo arquivo a cada URLS_POR_ARQUIVO URLs
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self.partes = 0
+        self.urls = 0
+        self.arquivo: Optional[TextIO] = None
+
+    def adicionar(self, caminho: str) -> None:
+        if self.arquivo is None or self.urls % URLS_POR_ARQUIVO == 0:
+            self._abrir_parte()
+        self.arquivo.write(f"<url><loc>{MARCADOR_URL}{caminho}</loc></url>\n")
+        self.urls += 1
+
+    def _abrir_parte(self) -> None:
+        self._fechar_parte()
+        self.partes += 1
+        self.arquivo = open(os.path.join(self.diretorio, f"sitemap-{self.partes}.xml"), "w", encoding="utf-8")
+        self.arquivo.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+    def _fechar_parte(self) -> None:
+        if self.arquivo is not None:
+            self.arquivo.write("</urlset>\n")
+            self.arquivo.close()
+            self.arquivo = None
+
+    def concluir(self) -> None:
+        self._fechar_parte()
+        caminho = os.path.join(self.diretorio, ARQUIVO_SITEMAP)
+        # Com uma única parte, ela mesma é o sitemap; com várias, sitemap.xml é o índice das partes
+        if self.partes == 1:
+            os.replace(os.path.join(self.diretorio, "sitemap-1.xml"), caminho)
+            return
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for parte in range(1, self.partes + 1):
+                arquivo.write(f"<sitemap><loc>{MARCADOR_URL}sitemaps/sitemap-{parte}.xml</loc></sitemap>\n")
+            arquivo.write("</sitemapindex>\n")
+
+def _texto(valor: str) -> str:
+    # Texto seguro para o conteúdo de um elemento XML
+    return escape(CARACTERES_INVALIDOS.sub("", valor))
+
+def _item_feed(produto: Produto) -> str:
+    # Item do feed no formato RSS 2.0 com os campos do Google Merchant Center (namespace g:)
+    imagem = _texto(produto.imagem)
+    if "://" not in produto.imagem:
+        imagem = MARCADOR_URL + imagem.lstrip("/")
+    disponibilidade = "in_stock" if produto.estoque > 0 else "out_of_stock"
+    categoria = _texto(produto.categoria.nome) if produto.categoria else ""
+    return (f"<item><g:id>{produto.id}</g:id><title>{_texto(produto.nome)}</title>"
+        f"<description>{_texto(produto.descricao)}</description>"
+        f"<link>{MARCADOR_URL}produtos/{produto.id}</link><g:image_link>{imagem}</g:image_link>"
+        f"<g:price>{produto.preco:.2f} BRL</g:price><g:availability>{disponibilidade}</g:availability>"
+        f"<g:condition>new</g:condition><g:product_type>{categoria}</g:product_type></item>\n")
+
+def gerar(diretorio: str) -> dict:
+    # Percorre o catálogo uma única vez, gravando o sitemap e o feed ao mesmo tempo
+    inicio = time.perf_counter()
+    os.makedirs(diretorio)
+    sitemap = _EscritorSitemap(diretorio)
+    for pagina in PAGINAS:
+        sitemap.adicionar(pagina)
+    produtos = 0
+    with open(os.path.join(diretorio, ARQUIVO_FEED), "w", encoding="utf-8") as feed:
+        feed.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0"><channel>\n'
+            f"<title>Produtos</title><link>{MARCADOR_URL}</link><description>Catálogo de produtos</description>\n")
+        for produto in produto_repo.iterar_produtos_feed(TAMANHO_LOTE):
+            sitemap.adicionar(f"produtos/{produto.id}")
+            feed.write(_item_feed(produto))
+            produtos += 1
+        feed.write("</channel></rss>\n")
+    sitemap.concluir()
+    # Retorna o resumo da geração
+    return {"produtos": produtos, "partes": sitemap.partes, "duracao": time.perf_counter() - inicio}
+
+def _versoes(diretorio: str) -> list[str]:
+    # Diretórios das versões já geradas (nomes numéricos), da geração mais recente para a mais antiga
+    if not os.path.isdir(diretorio):
+        return []
+    caminhos = [os.path.join(diretorio, nome) for nome in os.listdir(diretorio) if nome.isdigit()]
+    return sorted(caminhos, key=os.path.getmtime, reverse=True)
+
+def _gerar_versao(diretorio: str, versao: int) -> None:
+    global _geracoes
+    # Chamada com a trava obtida; outra thread pode ter gerado a versão enquanto esta esperava
+    destino = os.path.join(diretorio, str(versao))
+    if os.path.isdir(destino):
+        return
+    # Gera em um diretório temporário e o renomeia de uma vez; se outro processo chegou antes, usa o dele
+    temporario = os.path.join(diretorio, f".{versao}-{secrets.token_hex(4)}")
+    try:
+        resumo = gerar(temporario)
+        os.rename(temporario, destino)
+    except OSError:
+        if not os.path.isdir(destino):
+            raise
+        logger.info(f"Sitemap da versão {versao} gerado por outro processo")
+    else:
+        _geracoes += 1
+        logger.info(f"Sitemap e feed da versão {versao} gerados: {resumo['produtos']} produtos, "
+            f"{resumo['partes']} partes, {resumo['duracao']:.1f} s")
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    # Remove as versões antigas, mantendo a anterior (pode estar sendo enviada a alguém)
+    for antiga in _versoes(diretorio)[2:]:
+        shutil.rmtree(antiga, ignore_errors=True)
+
+def _gerar_em_segundo_plano(diretorio: str, versao: int) -> None:
+    global _thread
+    # Se já há uma geração em andamento, a próxima requisição após ela verifica de novo
+    if not _trava.acquire(blocking=False):
+        return
+    loja = obter_loja(loja_atual())
+    def executar() -> None:
+        # Gera no banco da loja que disparou a geração e libera a trava ao terminar
+        try:
+            with usar_loja(loja):
+                _gerar_versao(diretorio, versao)
+        except Exception:
+            logger.exception(f"Falha ao gerar o sitemap da versão {versao}")
+        finally:
+            _trava.release()
+    _thread = threading.Thread(target=executar, name="sitemap", daemon=True)
+    _thread.start()
+
+def preparar() -> str:
+    # Diretório da versão atual do catálogo da loja corrente, gerado se ainda não existir
+    diretorio = os.path.join(DIRETORIO, loja_atual())
+    versao = produto_repo.obter_versao_catalogo()
+    destino = os.path.join(diretorio, str(versao))
+    if os.path.isdir(destino):
+        return destino
+    # Com uma versão anterior, continua servindo-a e, se ela já tem a idade mínima, gera a nova em segundo plano
+    versoes = _versoes(diretorio)
+    if versoes:
+        if time.time() - os.path.getmtime(versoes[0]) >= INTERVALO_MINIMO:
+            _gerar_em_segundo_plano(diretorio, versao)
+        return versoes[0]
+    # Nenhuma versão gerada ainda: a requisição espera a geração
+    with _trava:
+        _gerar_versao(diretorio, versao)
+    # Retorna o diretório com os arquivos da versão
+    return destino
+
+def aguardar() -> None:
+    # Espera a geração em segundo plano em andamento, se houver (ex.: testes e encerramento)
+    if _thread is not None:
+        _thread.join()
+
+def obter_caminho(nome: str) -> Optional[str]:
+    # Caminho do arquivo na versão atual; None se o arquivo não existe (ex.: parte além da última)
+    if nome not in (ARQUIVO_SITEMAP, ARQUIVO_FEED) and not FORMATO_PARTE.match(nome):
+        return None
+    caminho = os.path.join(preparar(), nome)
+    return caminho if os.path.exists(caminho) else None
+
+def ler(caminho: str, url_base: str) -> Iterator[bytes]:
+    # Abre o arquivo já na chamada: ele continua legível mesmo que a versão seja removida durante o envio
+    arquivo = open(caminho, encoding="utf-8")
+    return _blocos(arquivo, escape(url_base))
+
+def _blocos(arquivo: TextIO, url_base: str) -> Iterator[bytes]:
+    # Lê o arquivo linha a linha trocando o marcador pelo endereço do site, em blocos de TAMANHO_BLOCO
+    bloco, tamanho = [], 0
+    with arquivo:
+        for linha in arquivo:
+            linha = linha.replace(MARCADOR_URL, url_base).encode("utf-8")
+            bloco.append(linha)
+            tamanho += len(linha)
+            if tamanho >= TAMANHO_BLOCO:
+                yield b"".join(bloco)
+                bloco, tamanho = [], 0
+    if bloco:
+        yield b"".join(bloco)
+
+# Expõe as gerações no endpoint de métricas
+metricas.registrar_indicador("loja_sitemap_geracoes_total", "counter",
+    "Gerações do sitemap e do feed de produtos", lambda: _geracoes)
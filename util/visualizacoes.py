@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from models.produto_resumo import ProdutoResumo
+from repo import produto_repo
+from util import metricas, sincronizacao
+from util.database import loja_atual, obter_loja, usar_loja
+
+# Contadores de visualizações de produtos com gravação adiada (write-behind): cada acesso a /produtos/{id}
+# apenas incrementa um dicionário em memória, e uma thread grava as somas em lote no banco a cada intervalo.
+# O ranking dos mais vistos fica em memória e é relido do banco após as gravações.
+# Contadores e rankings são separados por loja, e cada descarga grava no banco de cada uma.
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (em segundos) entre as gravações dos contadores no banco
+INTERVALO = float(os.environ.get('VISUALIZACOES_INTERVALO', '10'))
+# Quantidade de produtos mantidos no ranking em memória
+TAMANHO_RANKING = int(os.environ.get('VISUALIZACOES_RANKING', '100'))
+
+# Visualizações ainda não gravadas, por loja e por ID do produto
+_pendentes: dict[str, dict[int, int]] = {}
+# Trava dos contadores pendentes (incrementados pelas threads do threadpool)
+_trava = threading.Lock()
+# Ranking em memória de cada loja e o momento (monotônico) da última leitura; sem momento, força a releitura
+_ranking: dict[str, list[ProdutoResumo]] = {}
+_ranking_lido_em: dict[str, float] = {}
+# Thread de gravação periódica, iniciada na primeira visualização
+_thread: Optional[threading.Thread] = None
+_parar = threading.Event()
+# Quantidade de gravações em lote feitas por este processo
+_gravacoes = 0
+
+def registrar(id: int) -> None:
+    loja = loja_atual()
+    with _trava:
+        # Apenas soma a visualização em memória; a gravação fica para a próxima descarga
+        contagens = _pendentes.setdefault(loja, {})
+        contagens[id] = contagens.get(id, 0) + 1
+    # Inicia a thread de gravação na primeira visualização
+    if _thread is None:
+        _iniciar()
+
+def _iniciar() -> None:
+    global _thread
+    with _trava:
+        if _thread is not None:
+            return
+        _parar.clear()
+        _thread = threading.Thread(target=_executar, name="visualizacoes", daemon=True)
+        _thread.start()
+
+def _executar() -> None:
+    # Grava os contadores a cada intervalo até o encerramento da aplicação
+    while not _parar.wait(INTERVALO):
+        descarregar()
+
+def descarregar() -> int:
+    global _pendentes, _gravacoes
+    # Troca o dicionário inteiro, para que novas visualizações não esperem pela gravação
+    with _trava:
+        por_loja, _pendentes = _pendentes, {}
+    gravados = 0
+    for loja, contagens in por_loja.items():
+        if not contagens:
+            continue
+        try:
+            # Grava todas as somas da loja em uma única transação, no banco da loja
+            with usar_loja(obter_loja(loja)):
+                produto_repo.registrar_visualizacoes(contagens)
+        except Exception as e:
+            # Banco ocupado: devolve as contagens para a próxima tentativa, sem perder visualizações
+            with _trava:
+                pendentes = _pendentes.setdefault(loja, {})
+                for id, quantidade in contagens.items():
+                    pendentes[id] = pendentes.get(id, 0) + quantidade
+            logger.warning(f"Falha ao gravar visualizações de {len(contagens)} produtos da loja {loja}: {e}")
+            continue
+        _gravacoes += 1
+        gravados += len(contagens)
+        # O ranking mudou: será relido na próxima consulta
+        _ranking_lido_em.pop(loja, None)
+    # Retorna a quantidade de produtos gravados
+    return gravados
+
+def parar() -> None:
+    global _thread
+    # Encerra a thread de gravação e grava o que ainda estiver pendente
+    _parar.set()
+    if _thread is not None:
+        _thread.join()
+        _thread = None
+    descarregar()
+
+def limpar() -> None:
+    # Descarta os contadores pendentes e o ranking em memória da loja corrente, sem gravar (ex.: testes)
+    loja = loja_atual()
+    with _trava:
+        _pendentes.pop(loja, None)
+    _ranking.pop(loja, None)
+    _ranking_lido_em.pop(loja, None)
+
+def mais_vistos(quantidade: int) -> list[ProdutoResumo]:
+    # Rankings maiores que o mantido em memória são lidos direto do banco
+    if quantidade > TAMANHO_RANKING:
+        return produto_repo.obter_mais_vistos(quantidade)
+    # Relê o ranking após gravações deste processo ou, no máximo, a cada intervalo (gravações de outros processos)
+    loja = loja_atual()
+    agora = time.monotonic()
+    lido_em = _ranking_lido_em.get(loja)
+    if lido_em is None or agora - lido_em > INTERVALO:
+        _ranking[loja] = produto_repo.obter_mais_vistos(TAMANHO_RANKING)
+        _ranking_lido_em[loja] = agora
+    # Retorna os primeiros produtos do ranking
+    return _ranking[loja][:quantidade]
+
+def aplicar_alteracoes(ids: Optional[set[int]]) -> None:
+    # Produtos do ranking alterados ou excluídos (ou alterações em lote): relê o ranking na próxima consulta
+    loja = loja_atual()
+    if ids is None or any(produto.id in ids for produto in _ranking.get(loja, [])):
+        _ranking_lido_em.pop(loja, None)
+
+# Mantém nomes, preços e estoques do ranking coerentes com as alterações de produtos
+sincronizacao.registrar("produto", aplicar_alteracoes)
+sincronizacao.registrar("categoria", lambda ids: aplicar_alteracoes(None))
+
+# Expõe os contadores pendentes e as gravações no endpoint de métricas
+metricas.registrar_indicador("loja_visualizacoes_pendentes", "gauge",
+    "Produtos com visualizações ainda não gravadas", lambda: sum(len(contagens) for contagens in list(_pendentes.values())))
+metricas.registrar_indicador("loja_visualizacoes_gravacoes_total", "counter",
+    "Gravações em lote dos contadores de visualizações", lambda: _gravacoes)